@@ -0,0 +1,179 @@
+"""
+AgenticNumerix simulation and optimization engine.
+
+Importable building blocks behind `multi_asset_hedging_sagemaker.ipynb`.
+"""
+
+from .aggregation import ResultAggregator
+from .checkpoint import OptimizationCheckpoint
+from .compaction import ContextCompactor, compact_json
+from .history import OptimizationHistory
+from .hybrid import HYBRID_PARAMETERS, HestonHybridSimulator, batch_member
+from .instrumentation import Span, Tracer, tracer
+from .interchange import (
+    TABLE_SUFFIX,
+    LocalStore,
+    S3Store,
+    decode_table,
+    encode_table,
+    read_portfolio,
+    read_scenarios,
+    read_table,
+    write_portfolio,
+    write_scenarios,
+    write_table,
+)
+from .llm_cache import PROMPT_FORMAT_VERSION, LLMCache, cached_invoke, normalize_prompt, prompt_key
+from .orchestration import HEDGING_WORKFLOW, ConcurrentAgentRunner, RateLimitError, StubLLM
+from .parallel import ParallelOptimizer, best_configuration
+from .path_cache import PathStore
+from .qmc import SOBOL_MAX_DIMS, brownian_bridge, norm_ppf, sobol_points
+from .reduction import reduce_scenarios, reduction_report, stress_index, weighted_var_cvar
+from .result_cache import EvaluationCache, evaluation_key
+from .robust import (
+    ROBUST_OBJECTIVES,
+    ROBUST_SCENARIO,
+    evaluate_robust,
+    regime_weights,
+    robust_metrics,
+)
+from .scenarios import ScenarioSet, generate_scenario_set, latin_hypercube
+from .search import SuccessiveHalvingSearch
+from .search_space import (
+    default_configuration,
+    grid_configurations,
+    sample_configuration,
+    sample_configurations,
+)
+from .sharding import (
+    assign_shards,
+    process_shards,
+    read_manifest,
+    run_local_instances,
+    sagemaker_instance,
+    shard_of,
+    write_scenario_shards,
+)
+from .simulation import (
+    DEFAULT_REPLICATES,
+    ENGINE_VERSION,
+    SAMPLING_METHODS,
+    GBMPathSimulator,
+    horizon_steps,
+    make_rng,
+)
+from .stopping import NoImprovementStopping, SharpeConfidenceStopping, StoppingRule
+from .strategy import (
+    METRIC_NAMES,
+    REBALANCE_INTERVALS,
+    STANDARD_ERROR_NAMES,
+    MetricsAccumulator,
+    PortfolioScan,
+    SparsePortfolioScan,
+    StrategyEvaluator,
+    calculate_equity_weight,
+    calculate_equity_weights_batch,
+    calculate_max_drawdown,
+    control_variate_adjust,
+    evaluate_paths_batch,
+    evaluate_regimes_batch,
+    rebalance_interval,
+)
+from .streaming import FakeBedrockClient, ResponseStream
+from .tail import TailSketch, merge_sketches
+from .volatility import window_realized_vol
+
+__all__ = [
+    "ConcurrentAgentRunner",
+    "ContextCompactor",
+    "DEFAULT_REPLICATES",
+    "ENGINE_VERSION",
+    "EvaluationCache",
+    "FakeBedrockClient",
+    "GBMPathSimulator",
+    "HEDGING_WORKFLOW",
+    "HYBRID_PARAMETERS",
+    "HestonHybridSimulator",
+    "LLMCache",
+    "LocalStore",
+    "METRIC_NAMES",
+    "MetricsAccumulator",
+    "NoImprovementStopping",
+    "OptimizationCheckpoint",
+    "OptimizationHistory",
+    "PROMPT_FORMAT_VERSION",
+    "ParallelOptimizer",
+    "PathStore",
+    "PortfolioScan",
+    "REBALANCE_INTERVALS",
+    "ROBUST_OBJECTIVES",
+    "ROBUST_SCENARIO",
+    "RateLimitError",
+    "ResponseStream",
+    "ResultAggregator",
+    "S3Store",
+    "SAMPLING_METHODS",
+    "SOBOL_MAX_DIMS",
+    "STANDARD_ERROR_NAMES",
+    "ScenarioSet",
+    "SharpeConfidenceStopping",
+    "Span",
+    "SparsePortfolioScan",
+    "StoppingRule",
+    "StrategyEvaluator",
+    "StubLLM",
+    "SuccessiveHalvingSearch",
+    "TABLE_SUFFIX",
+    "TailSketch",
+    "Tracer",
+    "assign_shards",
+    "batch_member",
+    "best_configuration",
+    "brownian_bridge",
+    "cached_invoke",
+    "calculate_equity_weight",
+    "calculate_equity_weights_batch",
+    "calculate_max_drawdown",
+    "compact_json",
+    "control_variate_adjust",
+    "decode_table",
+    "default_configuration",
+    "encode_table",
+    "evaluate_paths_batch",
+    "evaluate_regimes_batch",
+    "evaluate_robust",
+    "evaluation_key",
+    "generate_scenario_set",
+    "grid_configurations",
+    "horizon_steps",
+    "latin_hypercube",
+    "make_rng",
+    "merge_sketches",
+    "norm_ppf",
+    "normalize_prompt",
+    "process_shards",
+    "prompt_key",
+    "read_manifest",
+    "read_portfolio",
+    "read_scenarios",
+    "read_table",
+    "rebalance_interval",
+    "reduce_scenarios",
+    "reduction_report",
+    "regime_weights",
+    "robust_metrics",
+    "run_local_instances",
+    "sagemaker_instance",
+    "sample_configuration",
+    "sample_configurations",
+    "shard_of",
+    "sobol_points",
+    "stress_index",
+    "tracer",
+    "weighted_var_cvar",
+    "window_realized_vol",
+    "write_portfolio",
+    "write_scenario_shards",
+    "write_scenarios",
+    "write_table",
+]
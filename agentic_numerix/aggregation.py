@@ -0,0 +1,126 @@
+"""
+Concurrent, streaming aggregation of per-shard result tables.
+
+`ResultAggregator` pages through every key under a prefix (past S3's 1,000-key
+`list_objects_v2` page), fetches result tables through a bounded thread pool
+and folds each one into running summaries as soon as it arrives: a
+`TailSketch` per requested column (count, mean, std, min, max, exact lower
+tail and log-bucketed remainder for quantiles), the merged `*_sketch` entries
+of the table metadata and a bounded row sample for plots. Nothing is held per
+result beyond the tables currently in flight, so memory stays flat as the
+number of shards grows.
+"""
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List
+
+import numpy as np
+
+from .instrumentation import tracer
+from .interchange import TABLE_SUFFIX, LocalStore, Store, read_table
+from .tail import TailSketch
+
+
+class ResultAggregator:
+    """Running summary statistics over result tables fetched concurrently from a store"""
+
+    def __init__(self,
+                 store: Store,
+                 columns: List[str],
+                 max_workers: int = 16,
+                 sample_size: int = 100000,
+                 sketch_capacity: int = 16384):
+        self.store = store
+        self.columns = list(columns)
+        self.max_workers = max_workers
+        self.sample_size = sample_size
+        self.sketch_capacity = sketch_capacity
+        self.reset()
+
+    def reset(self) -> None:
+        self.num_tables = 0
+        self.num_results = 0
+        self.column_sketches = {name: TailSketch(self.sketch_capacity) for name in self.columns}
+        self.metadata_sketches: Dict[str, TailSketch] = {}
+        self._sample_parts: Dict[str, List[np.ndarray]] = {name: [] for name in self.columns}
+        self._sample_rows = 0
+
+    @tracer.traced("aggregate.load_table")
+    def _load(self, key: str) -> Dict:
+        """Fetch and summarize one table (runs on a pool thread)"""
+        table = read_table(self.store, key, columns=self.columns, mmap=isinstance(self.store, LocalStore))
+        columns = table["columns"]
+        return {
+            "num_rows": len(columns[self.columns[0]]) if self.columns else 0,
+            "sketches": {name: TailSketch.from_values(values, self.sketch_capacity)
+                         for name, values in columns.items()},
+            "metadata_sketches": {name: TailSketch.from_dict(value) for name, value in table["metadata"].items()
+                                  if name.endswith("_sketch") and isinstance(value, dict)},
+            # Copy the sample rows out so the table's buffer can be released
+            "sample": {name: np.array(values[:self.sample_size]) for name, values in columns.items()}
+        }
+
+    def _merge(self, part: Dict) -> None:
+        tracer.count("aggregate.tables")
+        self.num_tables += 1
+        self.num_results += part["num_rows"]
+        for name, sketch in part["sketches"].items():
+            self.column_sketches[name].merge(sketch)
+        for name, sketch in part["metadata_sketches"].items():
+            if name in self.metadata_sketches:
+                self.metadata_sketches[name].merge(sketch)
+            else:
+                self.metadata_sketches[name] = sketch
+        take = min(part["num_rows"], self.sample_size - self._sample_rows)
+        if take > 0:
+            for name, values in part["sample"].items():
+                self._sample_parts[name].append(values[:take])
+            self._sample_rows += take
+
+    def aggregate(self, prefix: str, suffix: str = TABLE_SUFFIX) -> Dict:
+        """
+        Fold every `suffix` table under `prefix` into the running summaries, with
+        at most 2 x `max_workers` tables in flight, and return `summary()`.
+        """
+        started = time.time()
+        keys = (key for key in self.store.list_keys(prefix) if key.endswith(suffix))
+        max_in_flight = 2 * self.max_workers
+        with tracer.span("aggregate", prefix=prefix), ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = set()
+            for key in keys:
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._merge(future.result())
+                # Run in a copy of this context so the table spans nest under `aggregate`
+                pending.add(pool.submit(contextvars.copy_context().run, self._load, key))
+            for future in pending:
+                self._merge(future.result())
+        summary = self.summary()
+        summary["elapsed_seconds"] = time.time() - started
+        return summary
+
+    def sample(self) -> Dict[str, np.ndarray]:
+        """Up to `sample_size` result rows (from the first tables to arrive) for plotting"""
+        return {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in self._sample_parts.items()}
+
+    def column_summary(self, name: str) -> Dict:
+        """mean / median / std / min / max of a column; the median is exact while it fits the sketch's tail buffer"""
+        sketch = self.column_sketches[name]
+        return {
+            "mean": sketch.mean,
+            "median": sketch.quantile(0.5),
+            "std": sketch.std,
+            "min": sketch.min,
+            "max": sketch.max
+        }
+
+    def summary(self) -> Dict:
+        return {
+            "num_tables": self.num_tables,
+            "num_results": self.num_results,
+            "columns": {name: self.column_summary(name) for name in self.columns},
+            "sketches": dict(self.metadata_sketches)
+        }
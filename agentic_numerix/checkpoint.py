@@ -0,0 +1,106 @@
+"""
+Append-only checkpoints for resumable optimization runs.
+
+An `OptimizationCheckpoint` is a JSON-lines file: a header line describing the
+run, then one line per completed unit of work (a batch of configs or a
+parallel task) holding its history entries and the state to resume from - the
+sampler's RNG state, the next iteration, the task id. Each line is flushed and
+fsynced as it is written, so a killed kernel or job loses at most the unit in
+progress; a torn last line is ignored on load and cut off before the next
+append. Resuming from the last state replays exactly the same configs a single
+uninterrupted run would have produced.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_TAIL_BLOCK = 64 * 1024  # Bytes read per step when looking for the end of the last complete line
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot checkpoint {type(value).__name__}")
+
+
+class OptimizationCheckpoint:
+    """Append-only JSON-lines log of history entries and sampler state"""
+
+    def __init__(self, path: str, run_info: Dict):
+        self.path = path
+        self.run_info = json.loads(json.dumps(run_info, default=_json_default))
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def load(self) -> List[Dict]:
+        """
+        Committed units in write order: [{'entries': [...], 'state': {...}}].
+        Raises ValueError if the file was written by a run with different `run_info`.
+        """
+        if not self.exists():
+            return []
+        units = []
+        with open(self.path) as f:
+            for number, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Torn write at the end of the file
+                if number == 0:
+                    if record.get("run") != self.run_info:
+                        raise ValueError(f"Checkpoint {self.path} belongs to a different run: {record.get('run')}")
+                else:
+                    units.append(record)
+        return units
+
+    def latest_state(self) -> Optional[Dict]:
+        units = self.load()
+        return units[-1]["state"] if units else None
+
+    def append(self, entries: List[Dict], state: Dict) -> None:
+        """Durably append one unit of work (its history entries and the state after it) as one line"""
+        if self.exists():
+            self._truncate_torn_tail()
+        lines = [] if self.exists() else [{"run": self.run_info}]
+        lines.append({"entries": entries, "state": state})
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(line, default=_json_default) + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _truncate_torn_tail(self) -> None:
+        """Drop a partial last line left by a crash so new records start on a fresh line"""
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            # Scan back block by block to the end of the last complete line
+            position = end
+            while position > 0:
+                start = max(0, position - _TAIL_BLOCK)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                position = start
+            f.truncate(0)
+
+    def history(self) -> List[Dict]:
+        """All committed history entries, in write order"""
+        return [entry for unit in self.load() for entry in unit["entries"]]
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,135 @@
+"""
+Compact prompt context for the hedging agents and the executive summary.
+
+The orchestration context used to embed `json.dumps(..., indent=2)` of the
+portfolio, liabilities, scenario statistics and objectives: mostly braces,
+quotes and indentation. `compact_json` renders the same data as `key=value`
+lines, and groups of like-shaped dicts (per-factor statistics) as
+pipe-separated tables, with 4 significant digits.
+`ContextCompactor` goes further for blocks over `inline_chars`: the full JSON is
+written to an artifact store under a content-hash key and the prompt keeps the
+first rows plus a reference to the artifact.
+"""
+
+import hashlib
+import json
+import re
+from numbers import Number
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .interchange import Store
+
+
+def _format_value(value) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return "yes" if value else "no"
+    if isinstance(value, Number):
+        return f"{float(value):.4g}" if isinstance(value, (float, np.floating)) else str(value)
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_format_value(v) for v in value)
+    return str(value)
+
+
+def flatten(value: Dict, prefix: str = "") -> Dict[str, object]:
+    """Nested dict as {dotted.key: leaf}"""
+    flat = {}
+    for key, item in value.items():
+        name = f"{prefix}{key}"
+        if isinstance(item, dict) and item:
+            flat.update(flatten(item, name + "."))
+        else:
+            flat[name] = item
+    return flat
+
+
+def format_table(rows: Dict[str, Dict]) -> str:
+    """{row: {column: value}} as a pipe-separated table; columns in first-seen order"""
+    columns: List[str] = []
+    flat_rows = {name: flatten(row) for name, row in rows.items()}
+    for row in flat_rows.values():
+        columns.extend(column for column in row if column not in columns)
+    lines = [" | ".join(["name"] + columns)]
+    for name, row in flat_rows.items():
+        lines.append(" | ".join([name] + [_format_value(row[c]) if c in row else "-" for c in columns]))
+    return "\n".join(lines)
+
+
+def _table_rows(value: Dict) -> List[str]:
+    """Keys of the largest group (two or more) of dict items sharing the same flattened fields"""
+    groups: Dict[tuple, List[str]] = {}
+    for key, item in value.items():
+        if isinstance(item, dict) and item:
+            groups.setdefault(tuple(flatten(item)), []).append(key)
+    rows = max(groups.values(), key=len, default=[])
+    return rows if len(rows) >= 2 else []
+
+
+def compact_json(value) -> str:
+    """
+    Compact text form of a JSON-like value: like-shaped dict items as one table,
+    scalars and the remaining dicts as `key=value` lines (nested keys dotted).
+    """
+    if not isinstance(value, dict):
+        return _format_value(value)
+    rows = _table_rows(value)
+    lines = []
+    scalars = {key: item for key, item in value.items() if not isinstance(item, dict)}
+    if scalars:
+        lines.append("; ".join(f"{key}={_format_value(item)}" for key, item in scalars.items()))
+    if rows:
+        lines.append(format_table({key: value[key] for key in rows}))
+    # No indentation: prompts are whitespace-normalized, so nesting is spelled out with dotted keys
+    for key, item in value.items():
+        if isinstance(item, dict) and key not in rows:
+            if _table_rows(item):
+                lines.append(f"{key}:\n{compact_json(item)}")
+            else:
+                lines.append(f"{key}: " + "; ".join(f"{k}={_format_value(v)}" for k, v in flatten(item).items()))
+    return "\n".join(lines)
+
+
+class ContextCompactor:
+    """Renders named context blocks compactly, offloading large ones to an artifact store"""
+
+    def __init__(self, store: Optional[Store] = None, prefix: str = "context", inline_chars: int = 1500):
+        self.store = store
+        self.prefix = prefix
+        self.inline_chars = inline_chars
+        self.original_chars = 0
+        self.compact_chars = 0
+        self.artifacts: Dict[str, str] = {}
+
+    def block(self, name: str, value) -> str:
+        """`name:` followed by the compact form of `value` (or its first rows and an artifact reference)"""
+        original = json.dumps(value, indent=2, default=_format_value)
+        text = compact_json(value)
+        if self.store is not None and len(text) > self.inline_chars:
+            data = json.dumps(value, sort_keys=True, default=_format_value).encode()
+            digest = hashlib.sha256(data).hexdigest()
+            key = f"{self.prefix}/{re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')}-{digest[:16]}.json"
+            self.store.put_bytes(key, data)
+            uri = self.store.uri(key)
+            self.artifacts[name] = uri
+            kept, size = [], 0
+            for line in text.splitlines():
+                if size + len(line) > self.inline_chars:
+                    break
+                kept.append(line)
+                size += len(line) + 1
+            omitted = len(text.splitlines()) - len(kept)
+            text = "\n".join(kept) + f"\n... {omitted} more lines in {uri} ({len(data):,} bytes JSON)"
+        rendered = f"{name}:\n{text}"
+        self.original_chars += len(name) + 2 + len(original)
+        self.compact_chars += len(rendered)
+        return rendered
+
+    def stats(self) -> Dict:
+        """Characters before and after compaction and the artifacts written"""
+        return {
+            "original_chars": self.original_chars,
+            "compact_chars": self.compact_chars,
+            "reduction": 1 - self.compact_chars / self.original_chars if self.original_chars else 0.0,
+            "artifacts": dict(self.artifacts)
+        }
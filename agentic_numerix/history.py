@@ -0,0 +1,253 @@
+"""
+Columnar optimization history.
+
+`OptimizationHistory` replaces the `optimization_history` list of
+`{'config': {...}, 'metrics': {...}, 'market_scenario': ...}` entries. It
+appends, extends, slices and iterates like that list, and keeps the entries
+for checkpoints and stopping rules. As entries arrive, every scalar config
+field and metric, and the market scenario, is also written to a typed column.
+Columns are numpy float or int arrays, or category codes for strings, and
+their capacity doubles as they grow. Dashboards therefore read whole columns
+instead of re-walking the dicts. Grouped count / mean / std / max by any column
+(`group_stats`), per-group row indices (`group_rows`) and running-best series
+(`cumulative_best`) take a few whole-array operations, even at 100k+ entries.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+_MISSING = object()
+_DTYPES = {"float": np.float64, "int": np.int64, "category": np.int32}
+_NULLS = {"float": np.nan, "category": -1}
+_SCALARS = (str, int, float, np.number, np.bool_)
+
+
+def _fields(entry: Dict) -> Dict[str, object]:
+    """Scalar fields of one history entry by column name: market scenario, config fields, metrics"""
+    config, metrics = entry.get("config", {}), entry.get("metrics", {})
+    fields = {"market_scenario": entry.get("market_scenario"), **config, **metrics}
+    if len(fields) != 1 + len(config) + len(metrics):
+        raise ValueError(f"History entry fields overlap: {sorted(set(config) & set(metrics))}")
+    return {name: value for name, value in fields.items() if isinstance(value, _SCALARS)}
+
+
+def _encode(name: str, values: List) -> Tuple[str, np.ndarray, Optional[List[str]]]:
+    """Column kind, values and (for strings) categories of one column's new values"""
+    present = [value for value in values if value is not _MISSING]
+    if isinstance(present[0], str):
+        if not all(isinstance(value, str) for value in present):
+            raise ValueError(f"History column '{name}' mixes strings and numbers")
+        categories = list(dict.fromkeys(present))
+        index = {category: code for code, category in enumerate(categories)}
+        codes = np.array([-1 if value is _MISSING else index[value] for value in values], dtype=np.int32)
+        return "category", codes, categories
+    if len(present) == len(values) and all(isinstance(value, (int, np.integer)) for value in present):
+        return "int", np.array(values, dtype=np.int64), None
+    return "float", np.array([np.nan if value is _MISSING else value for value in values], dtype=float), None
+
+
+class OptimizationHistory:
+    """Append-only history of scored configs with typed columns for analytics"""
+
+    def __init__(self, entries: Optional[Iterable[Dict]] = None):
+        self._entries: List[Dict] = []
+        self._capacity = 0
+        self._data: Dict[str, np.ndarray] = {}
+        self._kinds: Dict[str, str] = {}  # Column -> "float", "int" or "category"
+        self._categories: Dict[str, List[str]] = {}
+        self._category_codes: Dict[str, Dict[str, int]] = {}
+        if entries is not None:
+            self.extend(entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        """One entry, or a list of entries for a slice"""
+        return self._entries[index]
+
+    def append(self, entry: Dict) -> None:
+        self.extend([entry])
+
+    def extend(self, entries: Iterable[Dict]) -> None:
+        """Append entries; another `OptimizationHistory` is appended column by column"""
+        start = len(self)
+        if isinstance(entries, OptimizationHistory):
+            stop = start + len(entries)
+            self._reserve(stop)
+            for name in dict.fromkeys(list(self._kinds) + list(entries._kinds)):
+                if name in entries._kinds:
+                    self._write(name, start, stop, entries._kinds[name], entries._data[name][:len(entries)],
+                                entries._categories.get(name))
+                else:
+                    self._write_missing(name, start, stop)
+            self._entries.extend(entries._entries)
+            return
+        entries = list(entries)
+        if not entries:
+            return
+        stop = start + len(entries)
+        rows = [_fields(entry) for entry in entries]
+        names = dict.fromkeys(self._kinds)
+        for row in rows:
+            names.update(dict.fromkeys(row))
+        self._reserve(stop)
+        for name in names:
+            values = [row.get(name, _MISSING) for row in rows]
+            if all(value is _MISSING for value in values):
+                self._write_missing(name, start, stop)
+            else:
+                self._write(name, start, stop, *_encode(name, values))
+        self._entries.extend(entries)
+
+    @classmethod
+    def concat(cls, histories: Iterable[Iterable[Dict]]) -> "OptimizationHistory":
+        """One history holding the entries of several (histories or entry lists), in order"""
+        combined = cls()
+        for history in histories:
+            combined.extend(history)
+        return combined
+
+    def _reserve(self, size: int) -> None:
+        if size <= self._capacity:
+            return
+        self._capacity = max(size, 2 * self._capacity, 1024)
+        for name, values in self._data.items():
+            grown = np.empty(self._capacity, values.dtype)
+            grown[:len(self)] = values[:len(self)]
+            self._data[name] = grown
+
+    def _write(self, name: str, start: int, stop: int, kind: str, values: np.ndarray,
+               categories: Optional[List[str]] = None) -> None:
+        """Store rows [start, stop) of a column; category values are codes into `categories` (-1 when missing)"""
+        column_kind = self._kinds.get(name)
+        if column_kind is None:
+            # Earlier entries lack the field, so an int column needs NaN for them
+            column_kind = "float" if kind == "int" and start else kind
+            self._data[name] = np.empty(self._capacity, _DTYPES[column_kind])
+            self._data[name][:start] = _NULLS.get(column_kind, 0)
+            self._kinds[name] = column_kind
+            if column_kind == "category":
+                self._categories[name], self._category_codes[name] = [], {}
+        elif (column_kind == "category") != (kind == "category"):
+            raise ValueError(f"History column '{name}' mixes strings and numbers")
+        elif column_kind == "int" and kind == "float":
+            self._data[name] = self._data[name].astype(float)
+            column_kind = self._kinds[name] = "float"
+        if column_kind == "category":
+            codes = self._category_codes[name]
+            for category in categories:
+                if category not in codes:
+                    codes[category] = len(self._categories[name])
+                    self._categories[name].append(category)
+            # Trailing -1 maps missing (-1) codes to missing
+            values = np.array([codes[category] for category in categories] + [-1], dtype=np.int32)[values]
+        self._data[name][start:stop] = values
+
+    def _write_missing(self, name: str, start: int, stop: int) -> None:
+        if self._kinds[name] == "category":
+            self._write(name, start, stop, "category", np.full(stop - start, -1, dtype=np.int32), [])
+        else:
+            self._write(name, start, stop, "float", np.full(stop - start, np.nan))
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._kinds)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Values of a column for every entry: a view for numeric columns (NaN where
+        an entry lacks the field), strings (None where missing) for string columns
+        """
+        if name not in self._kinds:
+            raise KeyError(f"No history column '{name}'")
+        values = self._data[name][:len(self)]
+        if self._kinds[name] == "category":
+            return np.array(self._categories[name] + [None], dtype=object)[values]
+        return values
+
+    def _numeric(self, name: str) -> np.ndarray:
+        if self._kinds.get(name) == "category":
+            raise ValueError(f"History column '{name}' is not numeric")
+        return self.column(name)
+
+    def to_frame(self) -> pd.DataFrame:
+        """All columns as a DataFrame (string columns as categoricals), one row per entry"""
+        size = len(self)
+        return pd.DataFrame({
+            name: pd.Categorical.from_codes(self._data[name][:size], self._categories[name])
+            if kind == "category" else self._data[name][:size]
+            for name, kind in self._kinds.items()
+        })
+
+    def _groups(self, by: str) -> Tuple[np.ndarray, List]:
+        """Group code per entry (-1 where the entry lacks `by`) and the group keys"""
+        if by not in self._kinds:
+            raise KeyError(f"No history column '{by}'")
+        values = self._data[by][:len(self)]
+        if self._kinds[by] == "category":
+            return values, list(self._categories[by])
+        present = ~np.isnan(values) if self._kinds[by] == "float" else np.ones(len(values), dtype=bool)
+        keys, inverse = np.unique(values[present], return_inverse=True)
+        codes = np.full(len(values), -1, dtype=np.intp)
+        codes[present] = inverse
+        return codes, keys.tolist()
+
+    def group_rows(self, by: str) -> Dict[object, np.ndarray]:
+        """
+        Entry indices per value of column `by`, each in entry order. Keys are in
+        first-seen order for string columns and sorted for numeric ones.
+        """
+        codes, keys = self._groups(by)
+        order = np.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        counts = np.bincount(codes[codes >= 0], minlength=len(keys))
+        rows = np.split(order, np.cumsum(counts)[:-1])
+        return {key: group for key, group, count in zip(keys, rows, counts) if count}
+
+    def group_stats(self, by: str, metric: str = "sharpe_ratio") -> pd.DataFrame:
+        """
+        Count, mean, std (population, as `np.std`) and max of `metric` per value of
+        column `by`, keyed as in `group_rows`. Entries lacking either, or with a
+        non-finite metric, are left out.
+        """
+        codes, keys = self._groups(by)
+        values = self._numeric(metric).astype(float)
+        keep = (codes >= 0) & np.isfinite(values)
+        codes, values = codes[keep], values[keep]
+        count = np.bincount(codes, minlength=len(keys))
+        seen = count > 0
+        mean = np.zeros(len(keys))
+        mean[seen] = np.bincount(codes, values, len(keys))[seen] / count[seen]
+        variance = np.bincount(codes, (values - mean[codes]) ** 2, len(keys))
+        best = np.full(len(keys), -np.inf)
+        np.maximum.at(best, codes, values)
+        return pd.DataFrame({
+            "count": count[seen],
+            "mean": mean[seen],
+            "std": np.sqrt(variance[seen] / count[seen]),
+            "max": best[seen]
+        }, index=pd.Index([key for key, s in zip(keys, seen) if s], name=by))
+
+    def cumulative_best(self, metric: str = "sharpe_ratio",
+                        by: Optional[str] = None) -> Union[np.ndarray, Dict[object, np.ndarray]]:
+        """
+        Running best `metric` in entry order (NaNs skipped), over all entries or,
+        with `by`, per group as {key: series over that group's entries}
+        """
+        values = self._numeric(metric)
+        if by is None:
+            return np.fmax.accumulate(values)
+        return {key: np.fmax.accumulate(values[rows]) for key, rows in self.group_rows(by).items()}
+
+    def best_index(self, metric: str = "sharpe_ratio", start: int = 0) -> int:
+        """Index of the first entry with the highest `metric` among entries from `start` on"""
+        values = self._numeric(metric)[start:]
+        if not len(values):
+            raise ValueError("No history entries to choose from")
+        return start + int(np.nanargmax(values))
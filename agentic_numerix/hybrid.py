@@ -0,0 +1,286 @@
+"""
+Heston stochastic-volatility equity with a correlated mean-reverting rates leg.
+
+`HestonHybridSimulator` is a drop-in replacement for `GBMPathSimulator` (same
+`simulate` / `simulate_chunks` output, `describe`, `leg_expectations`,
+sampling modes and replicates) with the dynamics the Numerix hybrid model
+will provide:
+
+* equity: d ln S = (mu - (v - theta) / 2) dt + sqrt(v) dW_S, so `equity_drift`
+  keeps its GBM meaning (expected log growth when v = theta) and the expected
+  growth is exp((mu + theta / 2) t) exactly;
+* variance: dv = kappa (theta - v) dt + xi sqrt(v) dW_v with theta =
+  `equity_vol`^2, discretized with full truncation (v+ = max(v, 0) in drift
+  and diffusion);
+* rates: Vasicek short rate r around `risk_free_rate` (exact AR(1) steps); the
+  bond leg is a constant-duration bond fund, d ln B = r dt - D dr;
+* correlation: corr(dW_S, dW_v) = `correlation_equity_vol`, corr(dW_S, dW_r) =
+  the scenario's `correlation_equity_rates` (shocks to the short rate, so the
+  equity-bond correlation has the opposite sign), corr(dW_v, dW_r) = 0.
+
+Parameters live in rows of a (sets, len(HYBRID_PARAMETERS)) array.
+`simulate_batch` runs any number of rows - every `MARKET_SCENARIOS` entry, or
+shocked copies of one - in a single pass over time: the step loop only
+advances the variance and short rate on (sets, paths) arrays, and everything
+else is whole-array NumPy. All rows use the same underlying shocks (common
+random numbers), so row p of a batch equals `simulate` of that scenario with
+the same seed.
+"""
+
+from typing import Dict, Iterator, List, Union
+
+import numpy as np
+
+from .instrumentation import tracer
+from .qmc import SOBOL_MAX_DIMS
+from .simulation import (
+    BOND_VOLATILITY,
+    DEFAULT_REPLICATES,
+    INITIAL_VALUE,
+    TRADING_DAYS_PER_YEAR,
+    GBMPathSimulator,
+    horizon_steps,
+    make_rng,
+)
+
+HYBRID_PARAMETERS = (
+    "equity_drift", "equity_vol", "risk_free_rate", "correlation_equity_rates", "initial_vol",
+    "mean_reversion", "vol_of_vol", "correlation_equity_vol", "rate_mean_reversion", "rate_vol", "bond_duration"
+)
+FACTORS = 3  # Independent shocks per step: equity, variance, short rate
+
+Scenarios = Union[np.ndarray, Dict[str, Dict], List[Dict]]
+
+
+class HestonHybridSimulator(GBMPathSimulator):
+    """
+    Simulates Heston equity and Vasicek-driven bond paths, batched over parameter sets.
+
+    Scenario dicts need the GBM keys plus `correlation_equity_rates`; any other
+    `HYBRID_PARAMETERS` key in a scenario overrides the simulator default
+    (`initial_vol` defaults to the scenario's `equity_vol`, `rate_vol` to
+    `bond_vol / bond_duration`, so the bond leg keeps the GBM bond volatility).
+    """
+
+    def __init__(self, steps_per_year: int = TRADING_DAYS_PER_YEAR, bond_vol: float = BOND_VOLATILITY,
+                 sampling: str = "pseudo", replicates: int = DEFAULT_REPLICATES, qmc_dims: int = SOBOL_MAX_DIMS,
+                 mean_reversion: float = 2.0, vol_of_vol: float = 0.3, correlation_equity_vol: float = -0.7,
+                 rate_mean_reversion: float = 0.1, bond_duration: float = 5.0):
+        super().__init__(steps_per_year, bond_vol, sampling, replicates, qmc_dims)
+        if rate_mean_reversion <= 0:
+            raise ValueError("rate_mean_reversion must be positive")
+        self.mean_reversion = mean_reversion
+        self.vol_of_vol = vol_of_vol
+        self.correlation_equity_vol = correlation_equity_vol
+        self.rate_mean_reversion = rate_mean_reversion
+        self.bond_duration = bond_duration
+
+    def describe(self) -> Dict:
+        description = super().describe()
+        description.update(mean_reversion=self.mean_reversion, vol_of_vol=self.vol_of_vol,
+                           correlation_equity_vol=self.correlation_equity_vol,
+                           rate_mean_reversion=self.rate_mean_reversion, bond_duration=self.bond_duration)
+        return description
+
+    def parameter_array(self, scenarios: Scenarios) -> np.ndarray:
+        """(sets, len(HYBRID_PARAMETERS)) array for scenario dicts (a list or {name: params}), defaults filled in"""
+        if isinstance(scenarios, np.ndarray):
+            return np.atleast_2d(scenarios).astype(float)
+        rows = []
+        for params in (scenarios.values() if isinstance(scenarios, dict) else scenarios):
+            defaults = {
+                "correlation_equity_rates": 0.0,
+                "initial_vol": params['equity_vol'],
+                "mean_reversion": self.mean_reversion,
+                "vol_of_vol": self.vol_of_vol,
+                "correlation_equity_vol": self.correlation_equity_vol,
+                "rate_mean_reversion": self.rate_mean_reversion,
+                "rate_vol": self.bond_vol / params.get('bond_duration', self.bond_duration),
+                "bond_duration": self.bond_duration
+            }
+            rows.append([params.get(name, defaults.get(name)) for name in HYBRID_PARAMETERS])
+        return np.array(rows, dtype=float)
+
+    @staticmethod
+    def correlation_factors(parameters: np.ndarray) -> np.ndarray:
+        """(sets, 3, 3) Cholesky factors of the (equity, variance, rate) shock correlations"""
+        columns = dict(zip(HYBRID_PARAMETERS, parameters.T))
+        correlation = np.tile(np.eye(FACTORS), (len(parameters), 1, 1))
+        correlation[:, 0, 1] = correlation[:, 1, 0] = columns['correlation_equity_vol']
+        correlation[:, 0, 2] = correlation[:, 2, 0] = columns['correlation_equity_rates']
+        try:
+            return np.linalg.cholesky(correlation)
+        except np.linalg.LinAlgError:
+            raise ValueError("Equity-vol and equity-rates correlations must satisfy "
+                             "correlation_equity_vol^2 + correlation_equity_rates^2 < 1") from None
+
+    def leg_expectations(self, scenario_params: Dict, n_steps: int) -> Dict[str, np.ndarray]:
+        """
+        Expected log growth and growth factor of the unmanaged legs at every step
+        t < n_steps. Exact for the discretized scheme, except equity log growth,
+        which ignores the (small) full-truncation bias of the variance.
+        """
+        return {leg: values[0] for leg, values in
+                self._leg_expectations(self.parameter_array([scenario_params]), n_steps).items()}
+
+    def _leg_expectations(self, parameters: np.ndarray, n_steps: int) -> Dict[str, np.ndarray]:
+        """`leg_expectations` for every parameter set: (sets, n_steps) arrays"""
+        p = {name: column[:, None] for name, column in zip(HYBRID_PARAMETERS, parameters.T)}
+        dt = self.dt
+        steps = np.arange(n_steps)
+        shocked = steps * dt
+        theta = p['equity_vol'] ** 2
+        # E[v_k] - theta decays geometrically: sum over the first t steps
+        decay = 1 - p['mean_reversion'] * dt
+        excess = (p['initial_vol'] ** 2 - theta) * np.concatenate(
+            [np.zeros((len(parameters), 1)), np.cumsum(decay ** steps[:-1], axis=1)], axis=1) * dt
+        # Bond log growth sum_k r_k dt - D (r_t - r_0) is Gaussian; c_m is the loading of the m-th last rate shock
+        phi = np.exp(-p['rate_mean_reversion'] * dt)
+        step_vol = p['rate_vol'] * np.sqrt((1 - phi ** 2) / (2 * p['rate_mean_reversion']))
+        lag = steps[:-1]
+        loadings = step_vol * (dt * (1 - phi ** lag) / (1 - phi) - p['bond_duration'] * phi ** lag)
+        bond_log_var = np.concatenate([np.zeros((len(parameters), 1)), np.cumsum(loadings ** 2, axis=1)], axis=1)
+        return {
+            "equity_log": p['equity_drift'] * shocked - 0.5 * excess,
+            "equity_growth": np.exp((p['equity_drift'] + 0.5 * theta) * shocked),
+            "bond_log": p['risk_free_rate'] * shocked,
+            "bond_growth": np.exp(p['risk_free_rate'] * shocked + 0.5 * bond_log_var)
+        }
+
+    def simulate_chunks(self,
+                        scenario_params: Dict,
+                        num_paths: int,
+                        horizon_years: float = 5,
+                        seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
+                        chunk_steps: int = TRADING_DAYS_PER_YEAR) -> Iterator[Dict]:
+        """`simulate_batch_chunks` for one scenario, with (steps, num_paths) arrays like `GBMPathSimulator`"""
+        for block in self.simulate_batch_chunks(self.parameter_array([scenario_params]), num_paths,
+                                                horizon_years, seed, chunk_steps):
+            yield {"t0": block['t0'], **{field: block[field][:, 0] for field in
+                                         ("equity", "bond", "equity_log_returns")}}
+
+    def simulate_batch_chunks(self,
+                              scenarios: Scenarios,
+                              num_paths: int,
+                              horizon_years: float = 5,
+                              seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
+                              chunk_steps: int = TRADING_DAYS_PER_YEAR) -> Iterator[Dict]:
+        """
+        Simulate every parameter set as consecutive time-major blocks of at most
+        `chunk_steps` steps: dicts with the first step `t0` and (steps, sets,
+        num_paths) `equity`, `bond` and `equity_log_returns` arrays. Paths do not
+        depend on the chunk size or on the other parameter sets.
+        """
+        parameters = self.parameter_array(scenarios)
+        rng = make_rng(seed)
+        n_steps = horizon_steps(horizon_years, self.steps_per_year)
+        dt = self.dt
+        cholesky = self.correlation_factors(parameters)[:, :, :, None]  # sets x 3 x 3 x 1
+        p = {name: column[:, None] for name, column in zip(HYBRID_PARAMETERS, parameters.T)}
+        theta = p['equity_vol'] ** 2
+        kappa_dt = p['mean_reversion'] * dt
+        vol_of_vol = p['vol_of_vol']
+        phi = np.exp(-p['rate_mean_reversion'] * dt)
+        rate_mean = p['risk_free_rate']
+        rate_step_vol = p['rate_vol'] * np.sqrt((1 - phi ** 2) / (2 * p['rate_mean_reversion']))
+
+        shape = (len(parameters), num_paths)
+        variance = np.broadcast_to(p['initial_vol'] ** 2, shape).copy()
+        rate = np.broadcast_to(rate_mean, shape).copy()
+        equity_log_level = np.full((1,) + shape, np.log(INITIAL_VALUE))
+        bond_log_level = equity_log_level.copy()
+        draw = self._shock_source(rng, n_steps - 1, num_paths, FACTORS)
+
+        for t0 in range(0, n_steps, chunk_steps):
+            with tracer.span("simulate.chunk", t0=t0, num_paths=num_paths, parameter_sets=len(parameters)):
+                t1 = min(t0 + chunk_steps, n_steps)
+                first = 1 if t0 == 0 else 0  # t=0 is the initial value, with no shock
+                steps = t1 - t0 - first
+                shocks = draw(steps)  # steps x [equity, variance, rate] x paths, independent
+                # Correlate per parameter set: steps x 3 x sets x paths (elementwise, so rows never interact)
+                correlated = [sum(cholesky[:, i, j] * shocks[:, None, j] for j in range(i + 1))
+                              for i in range(FACTORS)]
+
+                # Only the variance and short-rate recursions need the step loop
+                variances = np.empty((steps,) + shape)
+                rates = np.empty((steps + 1,) + shape)
+                rates[0] = rate
+                for j in range(steps):
+                    np.maximum(variance, 0.0, out=variances[j])  # Full truncation
+                    root = np.sqrt(variances[j] * dt)
+                    variance += kappa_dt * (theta - variances[j]) + vol_of_vol * root * correlated[1][j]
+                    rates[j + 1] = rate_mean + (rates[j] - rate_mean) * phi + rate_step_vol * correlated[2][j]
+                rate = rates[-1]
+
+                equity_log_returns = np.zeros((t1 - t0,) + shape)
+                equity_log_returns[first:] = ((p['equity_drift'] - 0.5 * (variances - theta)) * dt
+                                              + np.sqrt(variances * dt) * correlated[0])
+                bond_log_returns = np.zeros((t1 - t0,) + shape)
+                bond_log_returns[first:] = rates[:-1] * dt - p['bond_duration'] * np.diff(rates, axis=0)
+
+                equity_log_paths = np.cumsum(np.concatenate([equity_log_level, equity_log_returns]), axis=0)[1:]
+                bond_log_paths = np.cumsum(np.concatenate([bond_log_level, bond_log_returns]), axis=0)[1:]
+                equity_log_level = equity_log_paths[-1:]
+                bond_log_level = bond_log_paths[-1:]
+
+                block = {
+                    "t0": t0,
+                    "equity": np.exp(equity_log_paths),
+                    "bond": np.exp(bond_log_paths),
+                    "equity_log_returns": equity_log_returns
+                }
+            tracer.count("simulate.path_steps", (t1 - t0) * num_paths * len(parameters))
+            yield block
+
+    def simulate_batch(self,
+                       scenarios: Scenarios,
+                       num_paths: int,
+                       horizon_years: float = 5,
+                       seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None) -> Dict:
+        """
+        Simulate every parameter set in one pass. Same fields as `simulate`, with
+        (sets, num_paths, n_steps) path arrays, (sets, n_steps) `leg_expectations`
+        and the `parameters` array.
+        """
+        parameters = self.parameter_array(scenarios)
+        n_steps = horizon_steps(horizon_years, self.steps_per_year)
+        with tracer.span("simulate", num_paths=num_paths, n_steps=n_steps, sampling=self.sampling,
+                         parameter_sets=len(parameters)):
+            block = next(self.simulate_batch_chunks(parameters, num_paths, horizon_years, seed,
+                                                    chunk_steps=n_steps))
+        batch = {field: np.ascontiguousarray(block[field].transpose(1, 2, 0))
+                 for field in ("equity", "bond", "equity_log_returns")}
+        batch.update(dt=self.dt, horizon_years=horizon_years, sampling=self.sampling, replicates=self.replicates,
+                     replicate_unit=self.replicate_unit, parameters=parameters,
+                     leg_expectations=self._leg_expectations(parameters, n_steps))
+        return batch
+
+    def simulate_scenarios(self,
+                           market_scenarios: Dict[str, Dict],
+                           num_paths: int,
+                           horizon_years: float = 5,
+                           seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None
+                           ) -> Dict[str, Dict]:
+        """
+        `simulate` output per scenario name, all scenarios simulated in one batched
+        pass. Each scenario's arrays are copied out of the batch, so they own
+        their memory and can be cached and evicted one by one.
+        """
+        batch = self.simulate_batch(market_scenarios, num_paths, horizon_years, seed)
+        scenarios = {}
+        for p, name in enumerate(market_scenarios):
+            paths = batch_member(batch, p)
+            for field in ("equity", "bond", "equity_log_returns"):
+                paths[field] = paths[field].copy()
+            paths["leg_expectations"] = {leg: values.copy() for leg, values in paths["leg_expectations"].items()}
+            scenarios[name] = paths
+        return scenarios
+
+
+def batch_member(batch: Dict, index: int) -> Dict:
+    """Paths of one parameter set of a `simulate_batch` result, in the `simulate` format"""
+    paths = {key: value for key, value in batch.items() if key != "parameters"}
+    for field in ("equity", "bond", "equity_log_returns"):
+        paths[field] = batch[field][index]
+    paths["leg_expectations"] = {leg: values[index] for leg, values in batch["leg_expectations"].items()}
+    return paths
@@ -0,0 +1,266 @@
+"""
+Lightweight phase timers, counters and trace export.
+
+The engine and the notebook wrap their phases in `tracer.span(name, **attributes)`
+and bump `tracer.count(name, value)`. Tracing is off by default: a disabled
+span is one attribute check returning a shared no-op context manager, so the
+instrumented hot paths cost nothing measurable. Once `tracer.enable()` is
+called, spans nest through a context variable (threads started with
+`contextvars.copy_context()` and asyncio tasks inherit their parent) and are
+kept in memory until exported:
+
+* `export_jsonl(path)` - one JSON object per span, then the counters;
+* `export_otlp(path)` - OTLP/JSON `resourceSpans`, loadable by an
+  OpenTelemetry collector (`otlpjsonfile` receiver) or trace viewers;
+* `summary()` / `print_summary()` - per-phase calls, total, self and mean time.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("agentic_numerix_span", default=None)
+
+
+class _NoopSpan:
+    """Shared stand-in returned while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed phase; use as a context manager"""
+
+    __slots__ = ("tracer", "name", "attributes", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "_start_perf", "duration_ns", "error", "thread", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.error = None
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.span_id = os.urandom(8).hex()
+        self.thread = threading.current_thread().name
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        self._start_perf = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration_ns = time.perf_counter_ns() - self._start_perf
+        self.end_ns = self.start_ns + self.duration_ns
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.tracer._finish(self)
+        return False
+
+    def set(self, **attributes) -> None:
+        """Add attributes known only inside the span (sizes, hit counts, ...)"""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_s": self.duration_ns / 1e9,
+            "thread": self.thread,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """Collects spans and counters while enabled; a no-op otherwise"""
+
+    def __init__(self, service_name: str = "agentic_numerix"):
+        self.service_name = service_name
+        self.enabled = False
+        self.spans: List[Span] = []
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, reset: bool = True) -> "Tracer":
+        if reset:
+            self.reset()
+        self.enabled = True
+        return self
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+            self.counters = {}
+
+    def span(self, name: str, **attributes):
+        """Context manager timing a phase (nested under the current span)"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def traced(self, name: Optional[str] = None):
+        """Decorator form of `span`, named after the function by default (works on coroutine functions too)"""
+        def decorate(func):
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with Span(self, span_name, {}):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, span_name, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add `value` to a named counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def export_jsonl(self, path: str) -> None:
+        """One JSON object per finished span, followed by a `counters` record"""
+        with open(path, "w") as f:
+            for span in sorted(self.spans, key=lambda s: s.start_ns):
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+            f.write(json.dumps({"counters": self.counters}) + "\n")
+
+    def to_otlp(self) -> Dict:
+        """Spans and counters as an OTLP/JSON export request"""
+        spans = []
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            record = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": key, "value": _otlp_value(value)}
+                               for key, value in dict(span.attributes, thread=span.thread).items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+            }
+            if span.parent_id:
+                record["parentSpanId"] = span.parent_id
+            spans.append(record)
+
+        now = str(time.time_ns())
+        metrics = [{"name": name, "sum": {"dataPoints": [{"asDouble": float(value), "timeUnixNano": now}],
+                                          "aggregationTemporality": 2, "isMonotonic": True}}
+                   for name, value in self.counters.items()]
+        resource = {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]}
+        scope = {"name": "agentic_numerix.instrumentation"}
+        return {
+            "resourceSpans": [{"resource": resource, "scopeSpans": [{"scope": scope, "spans": spans}]}],
+            "resourceMetrics": [{"resource": resource, "scopeMetrics": [{"scope": scope, "metrics": metrics}]}]
+        }
+
+    def export_otlp(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_otlp(), f)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Per span name: calls, total seconds, self seconds (minus child spans),
+        mean and max seconds and share of the root spans' total, slowest first.
+        """
+        columns = ["calls", "total_s", "self_s", "mean_s", "max_s", "pct_of_run"]
+        if not self.spans:
+            return pd.DataFrame(columns=columns)
+        children: Dict[str, List[Span]] = {}
+        for span in self.spans:
+            if span.parent_id:
+                children.setdefault(span.parent_id, []).append(span)
+        # Concurrent children (threads, asyncio tasks) overlap, so subtract the union of their intervals
+        child_time: Dict[str, int] = {}
+        for parent_id, spans in children.items():
+            covered, end = 0, None
+            for span in sorted(spans, key=lambda s: s.start_ns):
+                start = span.start_ns if end is None else max(span.start_ns, end)
+                if span.end_ns > start:
+                    covered += span.end_ns - start
+                end = span.end_ns if end is None else max(end, span.end_ns)
+            child_time[parent_id] = covered
+        rows = pd.DataFrame([{
+            "name": span.name,
+            "duration": span.duration_ns / 1e9,
+            "self": (span.duration_ns - child_time.get(span.span_id, 0)) / 1e9,
+            "root": span.parent_id is None
+        } for span in self.spans])
+        run_total = rows.loc[rows["root"], "duration"].sum()
+        grouped = rows.groupby("name")
+        table = pd.DataFrame({
+            "calls": grouped["duration"].count(),
+            "total_s": grouped["duration"].sum(),
+            "self_s": grouped["self"].sum(),
+            "mean_s": grouped["duration"].mean(),
+            "max_s": grouped["duration"].max()
+        })
+        table["pct_of_run"] = 100 * table["total_s"] / run_total if run_total else 0.0
+        return table.sort_values("total_s", ascending=False)[columns]
+
+    def print_summary(self) -> None:
+        print("=" * 80)
+        print("RUN PROFILE")
+        print("=" * 80)
+        print(self.summary().to_string(float_format=lambda x: f"{x:.4f}"))
+        if self.counters:
+            print("\nCounters:")
+            for name, value in sorted(self.counters.items()):
+                print(f"  {name}: {value:,.0f}" if float(value).is_integer() else f"  {name}: {value:,.4f}")
+
+
+# Process-wide tracer used by the engine and the notebook
+tracer = Tracer()
@@ -0,0 +1,251 @@
+"""
+Binary columnar interchange for scenarios, portfolios and per-scenario results.
+
+A table file is a small versioned JSON header followed by raw, 64-byte aligned
+column buffers:
+
+    b"ANXCOLS\\0" | uint64 header size | JSON header (padded) | column data...
+
+The header records the table `kind`, free-form JSON `metadata` and, per
+column, its dtype, shape and offset. Readers parse only the header and then
+memory-map (or slice out of bytes) just the columns they ask for, so a job
+that needs scenario ids never touches the factor arrays and nothing is parsed
+per scenario. `LocalStore` keeps tables under a directory (tests, single-box
+runs); `S3Store` puts and gets them with an S3 client.
+"""
+
+import io
+import json
+import os
+import struct
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from .instrumentation import tracer
+from .scenarios import CORRELATION_REGIMES, CREDIT_RATINGS, CURRENCY_PAIRS, IR_TENORS, ScenarioSet
+
+MAGIC = b"ANXCOLS\x00"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+TABLE_SUFFIX = ".cols"
+
+
+def _aligned(n: int) -> int:
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def _write_table(f: BinaryIO, columns: Dict[str, np.ndarray], kind: str, metadata: Optional[Dict]) -> None:
+    arrays = {name: np.ascontiguousarray(values) for name, values in columns.items()}
+    schema = {}
+    offset = 0
+    for name, values in arrays.items():
+        if values.dtype.hasobject:
+            raise TypeError(f"Column '{name}' has object dtype; use fixed-width types")
+        offset = _aligned(offset)
+        schema[name] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": offset,
+                        "nbytes": values.nbytes}
+        offset += values.nbytes
+
+    header = json.dumps({"version": FORMAT_VERSION, "kind": kind, "metadata": metadata or {},
+                         "columns": schema}).encode()
+    header_size = _aligned(len(MAGIC) + 8 + len(header))
+    f.write(MAGIC)
+    f.write(struct.pack("<Q", header_size))
+    f.write(header.ljust(header_size - len(MAGIC) - 8, b" "))
+
+    position = 0
+    for name, values in arrays.items():
+        f.write(b"\x00" * (schema[name]["offset"] - position))
+        f.write(memoryview(values.reshape(-1)).cast("B") if values.size else b"")
+        position = schema[name]["offset"] + values.nbytes
+
+
+def _read_header(prefix: bytes) -> Dict:
+    if prefix[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not an agentic_numerix column table")
+    header_size, = struct.unpack("<Q", prefix[len(MAGIC):len(MAGIC) + 8])
+    header = json.loads(prefix[len(MAGIC) + 8:header_size])
+    if header["version"] > FORMAT_VERSION:
+        raise ValueError(f"Table format version {header['version']} is newer than supported ({FORMAT_VERSION})")
+    header["header_size"] = header_size
+    return header
+
+
+def encode_table(columns: Dict[str, np.ndarray], kind: str, metadata: Optional[Dict] = None) -> bytes:
+    """Serialize named arrays (numeric, bool or fixed-width string) plus JSON metadata"""
+    buffer = io.BytesIO()
+    _write_table(buffer, columns, kind, metadata)
+    return buffer.getvalue()
+
+
+def decode_table(data: bytes, columns: Optional[List[str]] = None) -> Dict:
+    """
+    Table from bytes: {"kind", "version", "metadata", "schema", "columns"} with
+    zero-copy read-only views of the selected `columns` (all by default).
+    """
+    header_size, = struct.unpack("<Q", data[len(MAGIC):len(MAGIC) + 8])
+    header = _read_header(data[:header_size])
+    return _select(header, columns, lambda spec, dtype, count: np.frombuffer(
+        data, dtype=dtype, count=count, offset=header_size + spec["offset"]))
+
+
+def read_table_file(path: str, columns: Optional[List[str]] = None, mmap: bool = True) -> Dict:
+    """Table from a local file; selected columns are memory-mapped unless `mmap=False`"""
+    with open(path, "rb") as f:
+        prefix = f.read(len(MAGIC) + 8)
+        header_size, = struct.unpack("<Q", prefix[len(MAGIC):])
+        header = _read_header(prefix + f.read(header_size - len(prefix)))
+
+        def load(spec, dtype, count):
+            if mmap:
+                return np.memmap(path, dtype=dtype, mode="r", offset=header_size + spec["offset"], shape=(count,))
+            f.seek(header_size + spec["offset"])
+            return np.fromfile(f, dtype=dtype, count=count)
+
+        return _select(header, columns, load)
+
+
+def _select(header: Dict, columns: Optional[List[str]], load) -> Dict:
+    schema = header["columns"]
+    names = list(schema) if columns is None else columns
+    selected = {}
+    for name in names:
+        if name not in schema:
+            raise KeyError(f"Column '{name}' not in table (has {sorted(schema)})")
+        spec = schema[name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        values = load(spec, dtype, count) if count else np.empty(0, dtype=dtype)
+        selected[name] = values.reshape(spec["shape"])
+    return {"kind": header["kind"], "version": header["version"], "metadata": header["metadata"],
+            "schema": schema, "columns": selected}
+
+
+class LocalStore:
+    """Table store under a local directory; keys are relative paths"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def uri(self, key: str) -> str:
+        return self.local_path(key)
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def get_bytes(self, key: str) -> bytes:
+        with open(self.local_path(key), "rb") as f:
+            return f.read()
+
+    def list_keys(self, prefix: str = "") -> Iterator[str]:
+        """Keys under `prefix`, in sorted order"""
+        base = self.local_path(prefix)
+        directory = base if os.path.isdir(base) else os.path.dirname(base)
+        keys = []
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                key = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+        return iter(sorted(keys))
+
+
+class S3Store:
+    """Table store in an S3 bucket; `local_path` downloads into `cache_dir` for memory-mapping"""
+
+    def __init__(self, s3_client, bucket: str, cache_dir: Optional[str] = None):
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.cache_dir = cache_dir or os.path.join(os.getcwd(), ".table_cache")
+
+    def uri(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        with tracer.span("s3.put", key=key, bytes=len(data)):
+            self.s3.put_object(Bucket=self.bucket, Key=key, Body=data)
+        tracer.count("s3.put_bytes", len(data))
+
+    def get_bytes(self, key: str) -> bytes:
+        with tracer.span("s3.get", key=key) as span:
+            data = self.s3.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+            span.set(bytes=len(data))
+        tracer.count("s3.get_bytes", len(data))
+        return data
+
+    def list_keys(self, prefix: str = "") -> Iterator[str]:
+        """Keys under `prefix`, following continuation tokens past the 1,000-key page limit"""
+        request = {"Bucket": self.bucket, "Prefix": prefix}
+        while True:
+            with tracer.span("s3.list", prefix=prefix):
+                page = self.s3.list_objects_v2(**request)
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+            if not page.get("IsTruncated"):
+                return
+            request["ContinuationToken"] = page["NextContinuationToken"]
+
+    def local_path(self, key: str) -> str:
+        path = os.path.join(self.cache_dir, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.get_bytes(key))
+        return path
+
+
+Store = Union[LocalStore, S3Store]
+
+
+def write_table(store: Store, key: str, columns: Dict[str, np.ndarray], kind: str,
+                metadata: Optional[Dict] = None) -> None:
+    """Write a table to a store"""
+    if isinstance(store, LocalStore):
+        path = store.local_path(key)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            _write_table(f, columns, kind, metadata)
+    else:
+        store.put_bytes(key, encode_table(columns, kind, metadata))
+
+
+def read_table(store: Store, key: str, columns: Optional[List[str]] = None, mmap: bool = True) -> Dict:
+    """Read a table (only the selected columns) from a store"""
+    if mmap:
+        return read_table_file(store.local_path(key), columns)
+    return decode_table(store.get_bytes(key), columns)
+
+
+def write_scenarios(store: Store, key: str, scenario_set: ScenarioSet) -> None:
+    """Scenario set as a `scenarios` table, with factor labels and statistics in the metadata"""
+    write_table(store, key, scenario_set.columns(), "scenarios", {
+        "generation_timestamp": scenario_set.generation_timestamp,
+        "statistics": scenario_set.statistics(),
+        "currency_pairs": list(CURRENCY_PAIRS),
+        "ir_tenors": list(IR_TENORS),
+        "credit_ratings": list(CREDIT_RATINGS),
+        "correlation_regimes": list(CORRELATION_REGIMES)
+    })
+
+
+def read_scenarios(store: Store, key: str, mmap: bool = True) -> ScenarioSet:
+    """ScenarioSet backed by the (memory-mapped) columns of a `scenarios` table"""
+    table = read_table(store, key, mmap=mmap)
+    if table["kind"] != "scenarios":
+        raise ValueError(f"Expected a scenarios table, got '{table['kind']}'")
+    return ScenarioSet(**table["columns"], generation_timestamp=table["metadata"]["generation_timestamp"])
+
+
+def write_portfolio(store: Store, key: str, portfolio: Dict) -> None:
+    """Portfolio definition as a column-less `portfolio` table (the nested dict is metadata)"""
+    write_table(store, key, {}, "portfolio", portfolio)
+
+
+def read_portfolio(store: Store, key: str) -> Dict:
+    return read_table(store, key, mmap=False)["metadata"]
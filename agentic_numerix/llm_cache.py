@@ -0,0 +1,92 @@
+"""
+Persistent cache of model responses for agent and Bedrock calls.
+
+Investment-committee reruns send the same prompts to the same models.
+`LLMCache` keys each response by a SHA-256 of the model ID, the normalized
+prompt and the inference parameters (temperature, max tokens, the calling
+agent) and keeps it in the same SQLite layout as `EvaluationCache` (in its own
+`llm_responses` table, so it can share a database file with evaluations), with
+the same age and LRU size eviction, so a rerun is a lookup instead of a model call.
+Prompts are normalized - per-line whitespace stripped and blank lines dropped -
+before both keying and sending, so indentation in f-string templates neither
+misses the cache nor costs tokens.
+"""
+
+import hashlib
+import json
+import re
+from typing import Awaitable, Callable, Optional
+
+from .instrumentation import tracer
+from .result_cache import EvaluationCache
+
+# Bump whenever prompt normalization or context compaction changes; cached responses are dropped
+PROMPT_FORMAT_VERSION = 1
+
+_WHITESPACE = re.compile(r"[ \t]+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Strip and collapse whitespace on every line and drop blank lines"""
+    lines = (_WHITESPACE.sub(" ", line).strip() for line in prompt.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def prompt_key(model_id: str, prompt: str, **params) -> str:
+    """SHA-256 of the model ID, normalized prompt and inference parameters"""
+    document = {"model_id": model_id, "prompt": normalize_prompt(prompt), "params": params}
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough input-token count (about four characters per token for English and JSON)"""
+    return (len(text) + 3) // 4
+
+
+class LLMCache(EvaluationCache):
+    """`EvaluationCache` of model responses keyed by `prompt_key`"""
+
+    table = "llm_responses"
+
+    def __init__(self,
+                 path: str = ":memory:",
+                 max_bytes: int = 64 * 1024 ** 2,
+                 max_age_seconds: Optional[float] = 7 * 24 * 3600):
+        super().__init__(path, max_bytes, max_age_seconds, engine_version=PROMPT_FORMAT_VERSION)
+
+    def invoke(self, model_id: str, prompt: str, call: Callable[[str], str], **params) -> str:
+        """Cached response for the prompt, calling `call(normalized_prompt)` on a miss"""
+        prompt = normalize_prompt(prompt)
+        key = prompt_key(model_id, prompt, **params)
+        cached = self.get(key)
+        if cached is not None:
+            tracer.count("llm_cache.hits")
+            return cached["text"]
+        tracer.count("llm_cache.misses")
+        tracer.count("llm.input_tokens_estimate", estimate_tokens(prompt))
+        text = call(prompt)
+        self.put(key, {"model_id": model_id, "text": text})
+        return text
+
+    async def ainvoke(self, model_id: str, prompt: str, call: Callable[[str], Awaitable[str]], **params) -> str:
+        """`invoke` for async model calls"""
+        prompt = normalize_prompt(prompt)
+        key = prompt_key(model_id, prompt, **params)
+        cached = self.get(key)
+        if cached is not None:
+            tracer.count("llm_cache.hits")
+            return cached["text"]
+        tracer.count("llm_cache.misses")
+        tracer.count("llm.input_tokens_estimate", estimate_tokens(prompt))
+        text = await call(prompt)
+        self.put(key, {"model_id": model_id, "text": text})
+        return text
+
+
+def cached_invoke(cache: Optional[LLMCache], model_id: str, prompt: str, call: Callable[[str], str],
+                  **params) -> str:
+    """`cache.invoke`, or `call` on the normalized prompt when there is no cache"""
+    if cache is None:
+        return call(normalize_prompt(prompt))
+    return cache.invoke(model_id, prompt, call, **params)
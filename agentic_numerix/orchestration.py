@@ -0,0 +1,181 @@
+"""
+Concurrent execution of the hedging specialist agents.
+
+The Portfolio Risk Manager, Currency, Interest Rate and Credit specialists
+analyse the same context independently; only the Execution Strategy agent
+needs their answers. `ConcurrentAgentRunner` runs a workflow as a list of
+stages: the agents of a stage run concurrently on asyncio, the stage is joined,
+and the next stage's prompts include every earlier answer. End-to-end latency
+is then the slowest specialist plus the execution agent, instead of the sum of
+all five.
+
+Calls go through a semaphore (`max_concurrency`), are spaced to
+`requests_per_second` when a quota is known, and are retried on throttling
+errors (Bedrock `ThrottlingException` and friends, or `RateLimitError`) with
+exponential backoff and jitter. A throttle pauses every pending call, not only
+the one that hit it. `StubLLM` stands in for the model in local runs.
+"""
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+from .instrumentation import tracer
+
+# Independent analyses first, joined before execution planning
+HEDGING_WORKFLOW = [
+    ["portfolio_risk_manager", "currency_specialist", "interest_rate_strategist", "credit_analyst"],
+    ["execution_strategy"]
+]
+
+THROTTLING_ERROR_CODES = ("ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException",
+                          "ModelNotReadyException", "SlowDown")
+
+AgentCall = Callable[[str, str], Union[str, Awaitable[str]]]
+
+
+class RateLimitError(Exception):
+    """Raised by a model call that was throttled and should be retried"""
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """True for `RateLimitError` and botocore `ClientError`s with a throttling error code"""
+    if isinstance(error, RateLimitError):
+        return True
+    response = getattr(error, "response", None)
+    return isinstance(response, dict) and response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+def build_stage_prompt(context: str, previous: Dict[str, str]) -> str:
+    """The shared context followed by the analyses of earlier stages"""
+    if not previous:
+        return context
+    analyses = "\n\n".join(f"### {name}\n{text}" for name, text in previous.items())
+    return f"{context}\n\nSPECIALIST ANALYSES:\n\n{analyses}"
+
+
+class ConcurrentAgentRunner:
+    """Runs agent calls concurrently with bounded concurrency, request spacing and throttling backoff"""
+
+    def __init__(self,
+                 call: AgentCall,
+                 max_concurrency: int = 4,
+                 requests_per_second: Optional[float] = None,
+                 max_retries: int = 5,
+                 base_delay: float = 1.0,
+                 max_delay: float = 30.0,
+                 seed: Optional[int] = None):
+        self.call = call
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = random.Random(seed)
+        self.throttles = 0
+        self._next_slot = 0.0
+        self._resume_at = 0.0
+
+    async def _wait_turn(self) -> None:
+        """Sleep through any shared throttling pause, then until the next free request slot"""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if now >= self._resume_at:
+                break
+            await asyncio.sleep(self._resume_at - now)
+        if self.requests_per_second:
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.requests_per_second
+            if slot > now:
+                await asyncio.sleep(slot - now)
+
+    async def _invoke(self, name: str, prompt: str) -> str:
+        if asyncio.iscoroutinefunction(self.call):
+            return await self.call(name, prompt)
+        result = await asyncio.to_thread(self.call, name, prompt)
+        return await result if asyncio.iscoroutine(result) else result
+
+    async def call_agent(self, name: str, prompt: str, semaphore: asyncio.Semaphore) -> Dict:
+        """One agent call with retries; returns {'output', 'seconds', 'attempts'}"""
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            with tracer.span(f"agent.{name}", prompt_chars=len(prompt)) as span:
+                started = time.perf_counter()
+                for attempt in range(self.max_retries + 1):
+                    await self._wait_turn()
+                    try:
+                        output = await self._invoke(name, prompt)
+                        break
+                    except Exception as error:
+                        if not is_throttling_error(error) or attempt == self.max_retries:
+                            raise
+                        self.throttles += 1
+                        tracer.count("agents.throttled")
+                        # Full jitter on an exponential backoff; everyone waits, not just this call
+                        delay = self.rng.uniform(0.5, 1.0) * min(self.max_delay, self.base_delay * 2 ** attempt)
+                        self._resume_at = max(self._resume_at, loop.time() + delay)
+                span.set(attempts=attempt + 1)
+        return {"output": str(output), "seconds": time.perf_counter() - started, "attempts": attempt + 1}
+
+    async def run_workflow(self, context: str, stages: Optional[List[List[str]]] = None,
+                           prompt_builder: Callable[[str, Dict[str, str]], str] = build_stage_prompt) -> Dict:
+        """
+        Run each stage's agents concurrently and join them before the next stage.
+
+        Returns {'outputs': {agent: text}, 'calls': {agent: {'seconds', 'attempts'}},
+        'final': last agent's output, 'elapsed_seconds', 'sequential_seconds'} where
+        `sequential_seconds` is the sum of the call times, i.e. the latency of
+        running them one after another.
+        """
+        stages = stages or HEDGING_WORKFLOW
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outputs: Dict[str, str] = {}
+        calls: Dict[str, Dict] = {}
+        started = time.perf_counter()
+        with tracer.span("agents.workflow", stages=len(stages)):
+            for number, names in enumerate(stages):
+                prompt = prompt_builder(context, dict(outputs))
+                with tracer.span("agents.stage", stage=number, agents=len(names)):
+                    results = await asyncio.gather(*(self.call_agent(name, prompt, semaphore) for name in names))
+                for name, result in zip(names, results):
+                    outputs[name] = result.pop("output")
+                    calls[name] = result
+        return {
+            "outputs": outputs,
+            "calls": calls,
+            "final": outputs[stages[-1][-1]],
+            "elapsed_seconds": time.perf_counter() - started,
+            "sequential_seconds": sum(call["seconds"] for call in calls.values())
+        }
+
+
+class StubLLM:
+    """
+    Local stand-in for the agents' model: answers after a per-agent latency and
+    raises `RateLimitError` for the first `throttle_first[agent]` calls. Tracks
+    how many calls were in flight at once.
+    """
+
+    def __init__(self, latencies: Optional[Dict[str, float]] = None, default_latency: float = 0.1,
+                 throttle_first: Optional[Dict[str, int]] = None):
+        self.latencies = latencies or {}
+        self.default_latency = default_latency
+        self.throttle_first = dict(throttle_first or {})
+        self.calls: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, name: str, prompt: str) -> str:
+        self.calls.append(name)
+        if self.throttle_first.get(name, 0) > 0:
+            self.throttle_first[name] -= 1
+            raise RateLimitError(f"{name}: rate exceeded")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latencies.get(name, self.default_latency))
+        finally:
+            self.in_flight -= 1
+        return f"[{name}] analysis of a {len(prompt)}-character brief"
@@ -0,0 +1,278 @@
+"""
+Process-pool parallel hyperparameter optimization.
+
+Work is split into fixed-size tasks of configs per scenario. Every task owns a
+`SeedSequence` derived from (root_seed, scenario index, task index) for config
+sampling, and every scenario has one path seed shared by all of its tasks
+(common random numbers). Because neither the decomposition nor the seeds depend
+on the number of workers, results are bit-identical whether the run uses one
+process or all cores of the box (e.g. the 16 vCPUs of an ml.c5.4xlarge).
+
+With a checkpoint, every finished task is appended to it and a rerun skips the
+tasks already recorded. A stopping rule is applied per scenario to the history
+of its tasks in order, so the stopping point does not depend on the worker
+count or on completion order either.
+
+`sampling` and `control_variate` select the simulator's sampling mode and
+control-variate means (see `GBMPathSimulator` and `StrategyEvaluator`); every
+history entry carries the metrics' standard errors. `sparse` scores configs
+on their rebalance dates only (`SparsePortfolioScan`). A `simulator` instance
+(e.g. `HestonHybridSimulator`) replaces the default GBM engine in every worker.
+
+Histories are `OptimizationHistory` tables, ready for grouped analytics.
+
+`optimize_robust` runs a single search in which every config is scored on all
+scenarios at once and ranked by a cross-regime objective (see `robust.py`);
+each regime uses the same path seed as in `optimize_scenarios`.
+"""
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .checkpoint import OptimizationCheckpoint
+from .history import OptimizationHistory
+from .instrumentation import tracer
+from .path_cache import PathStore
+from .robust import ROBUST_OBJECTIVES, ROBUST_SCENARIO, evaluate_robust
+from .search_space import sample_configuration
+from .stopping import StoppingRule
+from .simulation import GBMPathSimulator
+from .strategy import StrategyEvaluator
+
+PATH_STREAM = 0
+CONFIG_STREAM = 1
+
+_worker_path_stores: Dict[str, PathStore] = {}
+
+
+def scenario_path_seed(root_seed: int, scenario_index: int) -> np.random.SeedSequence:
+    """Path seed shared by every task of a scenario"""
+    return np.random.SeedSequence(root_seed, spawn_key=(scenario_index, PATH_STREAM))
+
+
+def task_config_seed(root_seed: int, scenario_index: int, task_index: int) -> np.random.SeedSequence:
+    """Independent config-sampling stream for one task"""
+    return np.random.SeedSequence(root_seed, spawn_key=(scenario_index, CONFIG_STREAM, task_index))
+
+
+def _run_task(task: Dict, path_store: Optional[PathStore] = None) -> List[Dict]:
+    """Sample and score one task's configs; returns history entries in iteration order"""
+    if path_store is None:
+        engine = json.dumps(task['simulator'].describe(), sort_keys=True)
+        if engine not in _worker_path_stores:
+            _worker_path_stores[engine] = PathStore(task['simulator'], max_bytes=task['path_store_bytes'])
+        path_store = _worker_path_stores[engine]
+
+    rng = np.random.default_rng(task_config_seed(task['root_seed'], task['scenario_index'], task['task_index']))
+    configs = [
+        sample_configuration(task['strategy_params'], iteration, rng)
+        for iteration in range(task['first_iteration'], task['first_iteration'] + task['num_configs'])
+    ]
+
+    evaluator = StrategyEvaluator(task['market_scenarios'], path_store.simulator, horizon_years=task['horizon_years'],
+                                  path_store=path_store, control_variate=task['control_variate'],
+                                  sparse=task['sparse'])
+    if task['market_scenario'] == ROBUST_SCENARIO:
+        seeds = {scenario: scenario_path_seed(task['root_seed'], index)
+                 for index, scenario in enumerate(task['market_scenarios'])}
+        return evaluate_robust(evaluator, configs, task['num_paths'], seeds, weights=task['regime_weights'],
+                               objective=task['objective'])
+    seed = scenario_path_seed(task['root_seed'], task['scenario_index'])
+    table = evaluator.evaluate_batch(configs, task['market_scenario'], num_paths=task['num_paths'], seed=seed)
+    return [
+        {'config': config, 'metrics': metrics, 'market_scenario': task['market_scenario']}
+        for config, metrics in zip(configs, table.to_dict('records'))
+    ]
+
+
+def best_configuration(history: List[Dict]) -> Dict:
+    """Best history entry by Sharpe ratio, in the `best_config` shape used by the notebook"""
+    best = max(history, key=lambda h: h['metrics']['sharpe_ratio'])
+    best_config = best['config'].copy()
+    best_config['metrics'] = best['metrics']
+    if 'regime_metrics' in best:
+        best_config['regime_metrics'] = best['regime_metrics']
+    return best_config
+
+
+class ParallelOptimizer:
+    """Random-search optimizer that fans fixed-size config tasks out over a process pool"""
+
+    def __init__(self,
+                 strategy_params: Dict,
+                 market_scenarios: Dict,
+                 num_workers: Optional[int] = None,
+                 root_seed: int = 42,
+                 num_paths: int = 1000,
+                 horizon_years: float = 5,
+                 task_size: int = 25,
+                 path_store_bytes: int = 1024 ** 3,
+                 sampling: str = "pseudo",
+                 control_variate: bool = False,
+                 sparse: bool = False,
+                 simulator: Optional[GBMPathSimulator] = None):
+        self.strategy_params = strategy_params
+        self.market_scenarios = market_scenarios
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.root_seed = root_seed
+        self.num_paths = num_paths
+        self.horizon_years = horizon_years
+        self.task_size = task_size
+        self.path_store_bytes = path_store_bytes
+        self.simulator = simulator or GBMPathSimulator(sampling=sampling)
+        self.control_variate = control_variate
+        self.sparse = sparse
+
+    def _make_tasks(self, num_iterations: int, scenarios: List[str], options: Dict) -> List[Dict]:
+        scenario_names = list(self.market_scenarios.keys())
+        tasks = []
+        for scenario in scenarios:
+            # The robust search samples configs from its own stream, after the scenarios'
+            scenario_index = len(scenario_names) if scenario == ROBUST_SCENARIO else scenario_names.index(scenario)
+            for task_index, first in enumerate(range(0, num_iterations, self.task_size)):
+                tasks.append({
+                    'market_scenario': scenario,
+                    'scenario_index': scenario_index,
+                    'task_index': task_index,
+                    'first_iteration': first,
+                    'num_configs': min(self.task_size, num_iterations - first),
+                    'strategy_params': self.strategy_params,
+                    'market_scenarios': self.market_scenarios,
+                    'root_seed': self.root_seed,
+                    'num_paths': self.num_paths,
+                    'horizon_years': self.horizon_years,
+                    'path_store_bytes': self.path_store_bytes,
+                    'simulator': self.simulator,
+                    'control_variate': self.control_variate,
+                    'sparse': self.sparse,
+                    **options
+                })
+        return tasks
+
+    def _run(self, tasks: List[Dict], record, skip) -> None:
+        """Run tasks, passing each (task, entries) to `record` as it finishes; tasks with `skip(task)` are dropped"""
+        if self.num_workers == 1:
+            path_store = PathStore(self.simulator, max_bytes=self.path_store_bytes)
+            for task in tasks:
+                if not skip(task):
+                    record(task, _run_task(task, path_store))
+            return
+        # Scenario-major submission keeps each worker on few distinct path sets; a bounded
+        # number in flight lets an early stop skip the rest of a scenario's tasks
+        remaining = iter(tasks)
+        with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+            pending = {}
+            while True:
+                for task in remaining:
+                    if not skip(task):
+                        pending[pool.submit(_run_task, task)] = task
+                        if len(pending) >= 2 * self.num_workers:
+                            break
+                if not pending:
+                    return
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(pending.pop(future), future.result())
+
+    def optimize_scenarios(self, num_iterations: int = 100, scenarios: Optional[List[str]] = None,
+                           checkpoint_path: Optional[str] = None,
+                           stopping_rule: Optional[StoppingRule] = None) -> Dict:
+        """
+        Run `num_iterations` random configs for every scenario in one pool.
+        Returns {scenario: {'best_config': ..., 'history': [...], 'stopped': reason or None}}.
+
+        With `checkpoint_path`, finished tasks are appended to that file and a
+        rerun resumes after them. With `stopping_rule`, a scenario stops at the
+        first task after which the rule fires on its history.
+        """
+        return self._optimize(num_iterations, scenarios or list(self.market_scenarios.keys()), checkpoint_path,
+                              stopping_rule, {})
+
+    def optimize_robust(self, num_iterations: int = 100, objective: str = "worst_case_sharpe",
+                        regime_weights: Optional[Dict[str, float]] = None, checkpoint_path: Optional[str] = None,
+                        stopping_rule: Optional[StoppingRule] = None) -> Dict:
+        """
+        One random search for a regime-robust config: every config is scored on
+        all scenarios in one batched evaluation and ranked by `objective`
+        ("worst_case_sharpe" or "weighted_sharpe" with `regime_weights`).
+        Returns {'best_config': ... (with 'regime_metrics'), 'history': [...], 'stopped': ...}.
+        """
+        if objective not in ROBUST_OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}', expected one of {ROBUST_OBJECTIVES}")
+        options = {'objective': objective, 'regime_weights': regime_weights}
+        return self._optimize(num_iterations, [ROBUST_SCENARIO], checkpoint_path, stopping_rule,
+                              options)[ROBUST_SCENARIO]
+
+    def _optimize(self, num_iterations: int, scenarios: List[str], checkpoint_path: Optional[str],
+                  stopping_rule: Optional[StoppingRule], options: Dict) -> Dict:
+        tasks = self._make_tasks(num_iterations, scenarios, options)
+        checkpoint = OptimizationCheckpoint(checkpoint_path, {
+            "optimizer": "parallel_random_search", "root_seed": self.root_seed, "num_paths": self.num_paths,
+            "horizon_years": self.horizon_years, "task_size": self.task_size,
+            "strategy_params": self.strategy_params, "market_scenarios": self.market_scenarios,
+            "engine": self.simulator.describe(), "control_variate": self.control_variate,
+            "sparse": self.sparse, **options
+        }) if checkpoint_path else None
+
+        results = {scenario: {'history': OptimizationHistory(), 'stopped': None} for scenario in scenarios}
+        finished = {scenario: {} for scenario in scenarios}  # task_index -> entries, until committed in order
+        next_task = {scenario: 0 for scenario in scenarios}
+
+        def commit(scenario: str) -> None:
+            scenario_results = results[scenario]
+            while scenario_results['stopped'] is None and next_task[scenario] in finished[scenario]:
+                scenario_results['history'].extend(finished[scenario].pop(next_task[scenario]))
+                next_task[scenario] += 1
+                if stopping_rule is not None:
+                    scenario_results['stopped'] = stopping_rule(scenario_results['history'])
+
+        def record(task: Dict, entries: List[Dict]) -> None:
+            tracer.count("optimize.tasks")
+            if checkpoint is not None:
+                with tracer.span("checkpoint.append"):
+                    checkpoint.append(entries, {"market_scenario": task['market_scenario'],
+                                                "task_index": task['task_index'],
+                                                "num_configs": task['num_configs']})
+            finished[task['market_scenario']][task['task_index']] = entries
+            commit(task['market_scenario'])
+
+        # Tasks of the same shape recorded by an earlier (interrupted) run are not rerun
+        expected = {(task['market_scenario'], task['task_index']): task['num_configs'] for task in tasks}
+        restored = 0
+        for unit in checkpoint.load() if checkpoint else []:
+            state = unit['state']
+            if expected.get((state['market_scenario'], state['task_index'])) == state['num_configs']:
+                finished[state['market_scenario']][state['task_index']] = unit['entries']
+                restored += 1
+        for scenario in scenarios:
+            commit(scenario)
+
+        todo = [task for task in tasks if task['task_index'] not in finished[task['market_scenario']]
+                and task['task_index'] >= next_task[task['market_scenario']]]
+        scope = (f"robust over {len(self.market_scenarios)} regimes" if scenarios == [ROBUST_SCENARIO]
+                 else f"{len(scenarios)} scenarios")
+        print(f"Parallel optimization: {scope} x {num_iterations} iterations "
+              f"in {len(tasks)} tasks on {self.num_workers} workers"
+              + (f" ({restored} tasks restored from checkpoint)" if restored else ""))
+        # Spans are collected in this process only; with workers, `optimize` covers the whole pool
+        with tracer.span("optimize", scenarios=len(scenarios), tasks=len(todo), workers=self.num_workers):
+            self._run(todo, record, skip=lambda task: results[task['market_scenario']]['stopped'] is not None)
+
+        for scenario, scenario_results in results.items():
+            scenario_results['best_config'] = best_configuration(scenario_results['history'])
+            if scenario_results['stopped']:
+                print(f"  {scenario}: stopped after {len(scenario_results['history'])} evaluations - "
+                      f"{scenario_results['stopped']}")
+        return results
+
+    def optimize(self, num_iterations: int = 100, market_scenario: str = "base_case",
+                 checkpoint_path: Optional[str] = None,
+                 stopping_rule: Optional[StoppingRule] = None) -> Tuple[Dict, List[Dict]]:
+        """Run one scenario; returns (best_config, history)"""
+        result = self.optimize_scenarios(num_iterations, [market_scenario], checkpoint_path,
+                                         stopping_rule)[market_scenario]
+        return result['best_config'], result['history']
@@ -0,0 +1,161 @@
+"""
+Shared store of simulated market paths.
+
+Simulated equity and bond paths depend only on the market scenario, the path
+count, the horizon and the RNG seed - not on the strategy configuration. The
+`PathStore` simulates each (scenario, num_paths, horizon, seed) combination
+once and hands the same read-only arrays to every strategy config, which also
+gives common random numbers across configs. Only explicit seeds (ints and
+SeedSequences) reproduce paths, so paths for None or a live Generator are
+simulated and returned without being stored. Entries are kept in memory or, if
+a directory is given, in memory-mapped `.npy` files, with LRU eviction once the
+size limit is exceeded.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .result_cache import is_cacheable_seed
+from .simulation import GBMPathSimulator
+
+ARRAY_FIELDS = ("equity", "bond", "equity_log_returns")
+
+
+class PathStore:
+    """LRU cache of simulated path sets keyed by (scenario, num_paths, horizon, seed)"""
+
+    def __init__(self,
+                 simulator: Optional[GBMPathSimulator] = None,
+                 max_bytes: int = 2 * 1024 ** 3,
+                 directory: Optional[str] = None):
+        self.simulator = simulator or GBMPathSimulator()
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._sizes: Dict[Tuple, int] = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def make_key(self, market_scenario: str, scenario_params: Dict, num_paths: int,
+                 horizon_years: float, seed) -> Tuple:
+        """
+        Cache key; scenario params and the simulator's `describe()` are included so
+        an edited scenario or engine setting is never served stale paths
+        """
+        if isinstance(seed, np.random.SeedSequence):
+            seed = ("SeedSequence", seed.entropy, tuple(seed.spawn_key), seed.pool_size)
+        return (market_scenario, tuple(sorted(scenario_params.items())), num_paths, float(horizon_years), seed,
+                tuple(sorted(self.simulator.describe().items())))
+
+    def get(self, market_scenario: str, scenario_params: Dict, num_paths: int,
+            horizon_years: float = 5, seed=0) -> Dict:
+        """
+        Return cached paths for the key, simulating and storing them on a miss.
+        Seeds other than ints and SeedSequences bypass the store.
+        """
+        if not is_cacheable_seed(seed):
+            return self.simulator.simulate(scenario_params, num_paths, horizon_years, seed)
+        key = self.make_key(market_scenario, scenario_params, num_paths, horizon_years, seed)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        paths = self.simulator.simulate(scenario_params, num_paths, horizon_years, seed)
+        self._put(key, paths)
+        return paths
+
+    def prefetch(self, market_scenarios: Dict[str, Dict], num_paths: int, horizon_years: float = 5,
+                 seed=0) -> None:
+        """
+        Store the paths of every scenario not cached yet. Simulators with
+        `simulate_scenarios` (`HestonHybridSimulator`) simulate all of them in one
+        batched pass; the paths are the same as from `get` with the same seed.
+        Seeds that bypass the store (None, Generators) prefetch nothing.
+        """
+        if not is_cacheable_seed(seed):
+            return
+        keys = {name: self.make_key(name, params, num_paths, horizon_years, seed)
+                for name, params in market_scenarios.items()}
+        missing = {name: market_scenarios[name] for name, key in keys.items() if key not in self._entries}
+        if not missing:
+            return
+        if hasattr(self.simulator, "simulate_scenarios"):
+            simulated = self.simulator.simulate_scenarios(missing, num_paths, horizon_years, seed)
+        else:
+            simulated = {name: self.simulator.simulate(params, num_paths, horizon_years, seed)
+                         for name, params in missing.items()}
+        for name, paths in simulated.items():
+            self.misses += 1
+            self._put(keys[name], paths)
+
+    def _put(self, key: Tuple, paths: Dict) -> None:
+        size = sum(paths[field].nbytes for field in ARRAY_FIELDS)
+        if size > self.max_bytes:
+            return  # Larger than the whole cache - serve it uncached
+
+        if self.directory:
+            paths = self._write_memmap(key, paths)
+        else:
+            for field in ARRAY_FIELDS:
+                paths[field].setflags(write=False)
+
+        self._entries[key] = paths
+        self._sizes[key] = size
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            self._evict_oldest()
+
+    def _file_stem(self, key: Tuple) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"paths_{digest}")
+
+    def _write_memmap(self, key: Tuple, paths: Dict) -> Dict:
+        stem = self._file_stem(key)
+        mapped = dict(paths)
+        for field in ARRAY_FIELDS:
+            filename = f"{stem}_{field}.npy"
+            np.save(filename, paths[field])
+            mapped[field] = np.load(filename, mmap_mode='r')
+        return mapped
+
+    def _evict_oldest(self) -> None:
+        key, _ = self._entries.popitem(last=False)
+        self.nbytes -= self._sizes.pop(key)
+        self.evictions += 1
+        if self.directory:
+            stem = self._file_stem(key)
+            for field in ARRAY_FIELDS:
+                try:
+                    os.remove(f"{stem}_{field}.npy")
+                except OSError:
+                    pass  # Still mapped on Windows or already removed
+
+    def clear(self) -> None:
+        """Drop every cached path set"""
+        while self._entries:
+            self._evict_oldest()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current footprint"""
+        return {
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,186 @@
+"""
+Quasi-Monte Carlo building blocks for path simulation.
+
+* `sobol_points` - scrambled Sobol' points in up to `SOBOL_MAX_DIMS` dimensions
+  (Joe-Kuo direction numbers), randomized with a random linear matrix scramble
+  plus a digital shift, so independent scrambles give unbiased estimates whose
+  spread is an honest standard error;
+* `brownian_bridge` - turns normals into random-walk increments, constructing
+  the terminal point first and then midpoints level by level, so the first
+  (best-distributed) QMC coordinates drive the coarse shape of every path;
+* `norm_ppf` - the standard normal quantile used to map points to normals.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+SOBOL_BITS = 32
+
+# Joe-Kuo primitive polynomials (degree s, coefficients a) and initial direction numbers m for dimensions 2-32;
+# dimension 1 is the van der Corput sequence
+_SOBOL_TABLE = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+    (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)),
+    (6, 25, (1, 1, 5, 5, 19, 61)),
+    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+    (7, 7, (1, 1, 3, 13, 7, 35, 63)),
+    (7, 8, (1, 3, 5, 9, 1, 25, 53)),
+    (7, 14, (1, 3, 1, 13, 9, 35, 107)),
+    (7, 19, (1, 3, 1, 5, 27, 61, 31)),
+    (7, 21, (1, 1, 5, 11, 19, 41, 61)),
+    (7, 28, (1, 3, 5, 3, 3, 13, 69)),
+    (7, 31, (1, 1, 7, 13, 1, 19, 1)),
+    (7, 32, (1, 3, 7, 5, 13, 19, 59)),
+    (7, 37, (1, 1, 3, 9, 25, 29, 41)),
+    (7, 41, (1, 3, 5, 13, 23, 1, 55)),
+    (7, 42, (1, 3, 7, 3, 13, 59, 17)),
+)
+SOBOL_MAX_DIMS = len(_SOBOL_TABLE) + 1
+
+# Acklam's rational approximation to the standard normal quantile (relative error < 1.2e-9)
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+_PPF_LOW = 0.02425
+
+
+def _polyval(coefficients: Sequence[float], x: np.ndarray) -> np.ndarray:
+    result = coefficients[0] * x
+    for c in coefficients[1:-1]:
+        result += c
+        result *= x
+    result += coefficients[-1]
+    return result
+
+
+def norm_ppf(u: np.ndarray) -> np.ndarray:
+    """Standard normal quantile function for probabilities in (0, 1)"""
+    u = np.clip(np.asarray(u, dtype=float), 1e-300, 1 - 1e-16)
+
+    # Central-region formula everywhere, then the ~5% of tail points are replaced
+    q = u - 0.5
+    r = q * q
+    x = _polyval(_PPF_A, r)
+    x *= q
+    denominator = _polyval(_PPF_B, r)
+    denominator *= r
+    denominator += 1.0
+    x /= denominator
+
+    tails = np.flatnonzero(np.abs(q) > 0.5 - _PPF_LOW)
+    tail_u = u.ravel()[tails]
+    lower = tail_u < 0.5
+    t = np.sqrt(-2.0 * np.log(np.where(lower, tail_u, 1.0 - tail_u)))
+    tail_x = _polyval(_PPF_C, t) / (_polyval(_PPF_D, t) * t + 1.0)
+    x.ravel()[tails] = np.where(lower, tail_x, -tail_x)
+    return x
+
+
+def _direction_numbers(dims: int) -> np.ndarray:
+    """(dims, SOBOL_BITS) direction numbers as integers, most significant bit first"""
+    directions = np.zeros((dims, SOBOL_BITS), dtype=np.uint64)
+    for k in range(SOBOL_BITS):
+        directions[0, k] = 1 << (SOBOL_BITS - 1 - k)
+    for d in range(1, dims):
+        s, a, m = _SOBOL_TABLE[d - 1]
+        v: List[int] = [m[k] << (SOBOL_BITS - 1 - k) for k in range(s)]
+        for k in range(s, SOBOL_BITS):
+            value = v[k - s] ^ (v[k - s] >> s)
+            for i in range(1, s):
+                if (a >> (s - 1 - i)) & 1:
+                    value ^= v[k - i]
+            v.append(value)
+        directions[d] = v
+    return directions
+
+
+def _scramble(directions: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Linear matrix scramble: each dimension's digits times a random unit lower-triangular matrix (mod 2)"""
+    dims = directions.shape[0]
+    shifts = np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+    digits = ((directions[:, :, None] >> shifts) & np.uint64(1)).astype(np.int64)  # dims x directions x digits
+    matrices = np.tril(rng.integers(0, 2, (dims, SOBOL_BITS, SOBOL_BITS)), -1) + np.eye(SOBOL_BITS, dtype=np.int64)
+    scrambled = np.einsum("dki,dji->dkj", digits, matrices) & 1
+    return (scrambled.astype(np.uint64) << shifts).sum(axis=2, dtype=np.uint64)
+
+
+def sobol_points(num_points: int, dims: int, rng: np.random.Generator, scramble: bool = True) -> np.ndarray:
+    """
+    First `num_points` points of a (scrambled) Sobol' sequence, shaped
+    (num_points, dims), strictly inside (0, 1). Balance is best when
+    `num_points` is a power of two.
+    """
+    if not 1 <= dims <= SOBOL_MAX_DIMS:
+        raise ValueError(f"Sobol' dimensions must be between 1 and {SOBOL_MAX_DIMS}, got {dims}")
+    if num_points > 2 ** SOBOL_BITS:
+        raise ValueError(f"At most 2**{SOBOL_BITS} Sobol' points")
+    directions = _direction_numbers(dims)
+    shift = np.zeros(dims, dtype=np.uint64)
+    if scramble:
+        directions = _scramble(directions, rng)
+        shift = rng.integers(0, 2 ** SOBOL_BITS, dims, dtype=np.uint64)
+
+    # Point i is the XOR of the direction numbers selected by the bits of gray(i)
+    index = np.arange(num_points, dtype=np.uint64)
+    gray = index ^ (index >> np.uint64(1))
+    points = np.broadcast_to(shift, (num_points, dims)).copy()
+    for bit in range(max(int(num_points - 1).bit_length(), 1)):
+        selected = ((gray >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        points[selected] ^= directions[:, bit]
+    return (points.astype(float) + 0.5) / 2.0 ** SOBOL_BITS
+
+
+def _bridge_levels(num_steps: int) -> List[Tuple[np.ndarray, ...]]:
+    """Per level of the bridge: (points, left, right, left weight, right weight, conditional sd)"""
+    levels = []
+    intervals = [(0, num_steps)]
+    while intervals:
+        level = [(left, (left + right) // 2, right) for left, right in intervals if right - left > 1]
+        if not level:
+            break
+        left, mid, right = (np.array(column) for column in zip(*level))
+        span = (right - left).astype(float)
+        levels.append((mid, left, right, (right - mid) / span, (mid - left) / span,
+                       np.sqrt((mid - left) * (right - mid) / span)))
+        intervals = [pair for l, m, r in level for pair in ((l, m), (m, r))]
+    return levels
+
+
+def brownian_bridge(normals: np.ndarray) -> np.ndarray:
+    """
+    Increments of a unit-variance random walk of len(normals) steps built by
+    Brownian bridge: normals[0] sets the terminal value, the following rows the
+    midpoints of ever finer intervals. Same distribution as `normals` itself,
+    shaped like it (steps first, any trailing shape).
+    """
+    num_steps = len(normals)
+    walk = np.zeros((num_steps + 1,) + normals.shape[1:])
+    walk[num_steps] = np.sqrt(num_steps) * normals[0]
+    row = 1
+    expand = (slice(None),) + (None,) * (normals.ndim - 1)
+    for mid, left, right, left_weight, right_weight, sd in _bridge_levels(num_steps):
+        walk[mid] = (left_weight[expand] * walk[left] + right_weight[expand] * walk[right]
+                     + sd[expand] * normals[row:row + len(mid)])
+        row += len(mid)
+    return np.diff(walk, axis=0)
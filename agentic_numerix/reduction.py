@@ -0,0 +1,271 @@
+"""
+Scenario reduction: a small weighted subset of representative scenarios.
+
+Revaluation and agent analysis scale with the scenario count, but most of a
+1,000-10,000 scenario set is redundant. `reduce_scenarios` picks
+`num_representatives` actual scenarios with probability weights:
+
+* extremes are kept explicitly, each weighted as the single scenario it is:
+  the highest-volatility scenario of every factor group, the worst
+  per-scenario values (a P&L or valuation; by default minus `stress_index`)
+  and the scenario at the VaR level;
+* the rest are split into strata by correlation regime and by whether the value
+  lies in the lower tail; each stratum is clustered (k-means on standardized
+  log vols and the value) and the member nearest each centroid stands in for
+  its cluster, weighted by the cluster size - so the weighted regime mix is
+  exactly the original one;
+* the tail strata are oversampled: VaR/CVaR of the values on the weighted
+  subset are compared with the full set and the tail's share of the budget
+  grows until both are within `tolerance` (or hits a cap); the achieved errors
+  are reported either way.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .instrumentation import tracer
+from .scenarios import CORRELATION_REGIMES, ScenarioSet
+from .simulation import make_rng
+
+FACTOR_GROUPS = ("fx_volatility", "interest_rate_volatility", "credit_volatility", "equity_volatility")
+
+
+def _factor_matrix(scenario_set: ScenarioSet) -> np.ndarray:
+    """Standardized log vols of every factor plus the credit jump flag, one row per scenario"""
+    columns = [np.log(np.asarray(getattr(scenario_set, name), dtype=float).reshape(len(scenario_set), -1))
+               for name in FACTOR_GROUPS]
+    columns.append(np.asarray(scenario_set.credit_jump, dtype=float)[:, None])
+    features = np.hstack(columns)
+    std = features.std(axis=0)
+    return (features - features.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+
+def stress_index(scenario_set: ScenarioSet) -> np.ndarray:
+    """Per-scenario stress: mean over factor groups of the average standardized log vol"""
+    scores = []
+    for name in FACTOR_GROUPS:
+        values = np.log(np.asarray(getattr(scenario_set, name), dtype=float).reshape(len(scenario_set), -1))
+        std = values.std(axis=0)
+        scores.append(((values - values.mean(axis=0)) / np.where(std > 0, std, 1.0)).mean(axis=1))
+    return np.mean(scores, axis=0)
+
+
+def weighted_var_cvar(values: np.ndarray, weights: Optional[np.ndarray] = None, alpha: float = 0.05) -> Dict:
+    """
+    Lower-tail VaR (the alpha-quantile level, as `var_95` in the metrics) and CVaR
+    (mean of the worst alpha of probability mass) of weighted values.
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=float)
+    order = np.argsort(values, kind="stable")
+    v = values[order]
+    w = weights[order] / weights.sum()
+    cumulative = np.cumsum(w)
+    var = v[min(np.searchsorted(cumulative, alpha - 1e-12), len(v) - 1)]
+    # Mass of each value inside the worst alpha (the boundary value contributes partially)
+    in_tail = np.clip(alpha - (cumulative - w), 0.0, w)
+    return {"var": float(var), "cvar": float(in_tail @ v / in_tail.sum())}
+
+
+def _kmeans(features: np.ndarray, k: int, rng: np.random.Generator, iterations: int = 25) -> np.ndarray:
+    """Cluster labels from Lloyd's algorithm with k-means++ seeding"""
+    n = len(features)
+    if k >= n:
+        return np.arange(n)
+    centers = [features[rng.integers(n)]]
+    distance = ((features - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = distance.sum()
+        index = rng.choice(n, p=distance / total) if total > 0 else rng.integers(n)
+        centers.append(features[index])
+        distance = np.minimum(distance, ((features - features[index]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    labels = None
+    for _ in range(iterations):
+        # ||x - c||^2 up to the per-row constant ||x||^2
+        scores = (centers ** 2).sum(axis=1) - 2.0 * features @ centers.T
+        new_labels = scores.argmin(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for j in range(k):
+            members = labels == j
+            if members.any():
+                centers[j] = features[members].mean(axis=0)
+    return labels
+
+
+def _allocate(budget: int, counts: np.ndarray) -> np.ndarray:
+    """Split `budget` proportionally to `counts` (largest remainder), at least one per non-empty group"""
+    allocation = np.zeros(len(counts), dtype=int)
+    nonempty = np.flatnonzero(counts > 0)
+    if not len(nonempty):
+        return allocation
+    if budget < len(nonempty):
+        allocation[nonempty[np.argsort(-counts[nonempty], kind="stable")[:max(budget, 0)]]] = 1
+        return allocation
+    allocation[nonempty] = 1
+    share = (budget - len(nonempty)) * counts / counts.sum()
+    allocation += np.floor(share).astype(int)
+    leftover = budget - allocation.sum()
+    allocation[np.argsort(-(share - np.floor(share)), kind="stable")[:leftover]] += 1
+    return np.minimum(allocation, counts)
+
+
+def _select(features: np.ndarray, strata: np.ndarray, budgets: Dict[bool, int], extremes: np.ndarray,
+            rng: np.random.Generator):
+    """
+    Representative indices and weights: the explicit extremes, then cluster medoids
+    per (regime, tail) stratum with each tail/body budget split across regimes.
+    """
+    n = len(features)
+    indices = [extremes]
+    weights = [np.ones(len(extremes))]
+    pool = np.ones(n, dtype=bool)
+    pool[extremes] = False
+    for tail, budget in budgets.items():
+        codes = np.arange(len(CORRELATION_REGIMES)) * 2 + tail
+        counts = np.array([np.count_nonzero(pool & (strata == code)) for code in codes])
+        for code, k in zip(codes, _allocate(budget, counts)):
+            members = np.flatnonzero(pool & (strata == code))
+            if not len(members) or not k:
+                continue
+            labels = _kmeans(features[members], int(k), rng)
+            for label in np.unique(labels):
+                cluster = members[labels == label]
+                center = features[cluster].mean(axis=0)
+                indices.append([cluster[((features[cluster] - center) ** 2).sum(axis=1).argmin()]])
+                weights.append([len(cluster)])
+    indices = np.concatenate(indices).astype(np.int64)
+    weights = np.concatenate(weights).astype(float) / n
+    order = np.argsort(indices, kind="stable")
+    return indices[order], weights[order]
+
+
+@tracer.traced("scenarios.reduce")
+def reduce_scenarios(scenario_set: ScenarioSet,
+                     num_representatives: int = 100,
+                     values: Optional[np.ndarray] = None,
+                     alpha: float = 0.05,
+                     tolerance: float = 0.02,
+                     extreme_fraction: float = 0.05,
+                     max_tail_share: float = 0.6,
+                     seed=None) -> Dict:
+    """
+    Weighted representative subset of `scenario_set`.
+
+    `values` are per-scenario outcomes where lower is worse (portfolio values or
+    P&L from a cheap revaluation); without them minus `stress_index` is used.
+    The worst `extreme_fraction` of the budget and the scenario at the VaR level
+    are kept explicitly. The scenarios at or below the VaR start with a `2 * alpha`
+    share of the rest of the budget; the share doubles, up to `max_tail_share`, while
+    the weighted VaR or CVaR misses the full-set value by more than `tolerance`
+    (relative).
+
+    Returns {'scenario_set': the representatives (a `ScenarioSet`, original ids kept),
+    'indices', 'weights' (summing to 1), 'extreme' (mask of explicitly kept
+    scenarios), 'regime_mix' and 'factor_means': {name: {'full', 'reduced'}}, 'tail': {'full',
+    'reduced', 'var_error', 'cvar_error', 'within_tolerance', 'tail_share'}, 'num_scenarios',
+    'num_representatives'}.
+    """
+    n = len(scenario_set)
+    values = -stress_index(scenario_set) if values is None else np.asarray(values, dtype=float)
+    if len(values) != n:
+        raise ValueError(f"Expected {n} values, got {len(values)}")
+    rng = make_rng(seed)
+    # Values weigh as much as all factors together, so clusters are also tight in value
+    features = _factor_matrix(scenario_set)
+    std = values.std()
+    scaled = (values - values.mean()) / (std if std > 0 else 1.0)
+    features = np.hstack([features, np.sqrt(features.shape[1]) * scaled[:, None]])
+    regime_codes = np.asarray(scenario_set.regime_codes)
+
+    # Always kept: the most volatile scenario of each factor group and the worst values
+    peaks = {int(np.argmax(np.asarray(getattr(scenario_set, name)).reshape(n, -1).mean(axis=1)))
+             for name in FACTOR_GROUPS}
+    budget = min(num_representatives, n)
+    full = weighted_var_cvar(values, alpha=alpha)
+    ranked = np.argsort(values, kind="stable")
+    # The scenario at the VaR level is kept too, so the weighted tail mass ends exactly on it
+    boundary = min(int(np.ceil(alpha * n - 1e-9)), n) - 1
+    worst = ranked[:max(1, int(round(extreme_fraction * budget)))]
+    extremes = np.array(sorted(peaks | set(worst.tolist()) | {int(ranked[max(boundary, 0)])}), dtype=np.int64)
+    remaining = max(budget - len(extremes), 0)
+
+    # Strata: regime x (value at or below the VaR or not); the tail strata are oversampled
+    in_tail = values <= full["var"]
+    strata = 2 * regime_codes.astype(np.int64) + in_tail
+    pool = np.ones(n, dtype=bool)
+    pool[extremes] = False
+    minimum = {tail: len(np.unique(strata[pool & (in_tail == tail)])) for tail in (True, False)}
+    if remaining < sum(minimum.values()):
+        raise ValueError(f"num_representatives={num_representatives} is too small: "
+                         f"{len(extremes) + sum(minimum.values())} needed to cover the extremes and every stratum")
+    tail_share = 2 * alpha
+    while True:
+        tail_budget = min(max(int(round(tail_share * remaining)), minimum[True]), remaining - minimum[False],
+                          int(np.count_nonzero(pool & in_tail)))
+        indices, weights = _select(features, strata, {True: tail_budget, False: remaining - tail_budget},
+                                   extremes, rng)
+        reduced = weighted_var_cvar(values[indices], weights, alpha)
+        errors = {measure: abs(reduced[measure] - full[measure]) / max(abs(full[measure]), 1e-12)
+                  for measure in ("var", "cvar")}
+        within = max(errors.values()) <= tolerance
+        if within or tail_share >= max_tail_share:
+            break
+        tail_share = min(2 * tail_share, max_tail_share)
+
+    regime_mix = {}
+    for code, regime in enumerate(CORRELATION_REGIMES):
+        share = float(np.mean(regime_codes == code))
+        if share > 0:
+            regime_mix[regime] = {"full": share, "reduced": float(weights[regime_codes[indices] == code].sum())}
+    factor_means = {}
+    for name in FACTOR_GROUPS:
+        per_scenario = np.asarray(getattr(scenario_set, name), dtype=float).reshape(n, -1).mean(axis=1)
+        factor_means[name] = {"full": float(per_scenario.mean()), "reduced": float(weights @ per_scenario[indices])}
+    tracer.count("scenarios.representatives", len(indices))
+    return {
+        "scenario_set": scenario_set.take(indices),
+        "indices": indices,
+        "weights": weights,
+        "extreme": np.isin(indices, extremes),
+        "regime_mix": regime_mix,
+        "factor_means": factor_means,
+        "tail": {
+            "alpha": alpha,
+            "full": full,
+            "reduced": reduced,
+            "var_error": errors["var"],
+            "cvar_error": errors["cvar"],
+            "within_tolerance": bool(within),
+            "tail_share": tail_share
+        },
+        "num_scenarios": n,
+        "num_representatives": len(indices)
+    }
+
+
+def reduction_report(reduction: Dict) -> Dict:
+    """JSON-serializable summary of a `reduce_scenarios` result (for prompts and saved artifacts)"""
+    tail = reduction["tail"]
+    scenario_ids = reduction["scenario_set"].scenario_ids()
+    return {
+        "num_scenarios": reduction["num_scenarios"],
+        "num_representatives": reduction["num_representatives"],
+        "extreme_scenarios": [scenario_ids[i] for i in np.flatnonzero(reduction["extreme"])],
+        "regime_mix": reduction["regime_mix"],
+        "factor_means": reduction["factor_means"],
+        "tail": {
+            "alpha": tail["alpha"],
+            "var_full": tail["full"]["var"],
+            "var_weighted": tail["reduced"]["var"],
+            "cvar_full": tail["full"]["cvar"],
+            "cvar_weighted": tail["reduced"]["cvar"],
+            "var_error": tail["var_error"],
+            "cvar_error": tail["cvar_error"],
+            "within_tolerance": tail["within_tolerance"]
+        }
+    }
@@ -0,0 +1,184 @@
+"""
+Persistent, content-addressed cache of strategy evaluations.
+
+A strategy's metrics are fully determined by the config, the market scenario
+parameters, the path count, the seed, the horizon and the simulation engine.
+`EvaluationCache` keys each result by a SHA-256 of the canonical JSON of those
+inputs and keeps it in a SQLite table, so re-running the optimization cell (or
+resubmitting the same strategy) is a lookup instead of a simulation. Entries
+expire after `max_age_seconds` and the least recently used ones are evicted
+once the payloads exceed `max_bytes`; entries written by another engine
+version are dropped on open.
+
+The table mirrors the deployment plan's Results Cache item layout - a
+`cache_key` partition key, an `expires_at` epoch-seconds TTL attribute and a
+JSON `payload` - so `items()` can be copied into it as is.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from .simulation import ENGINE_VERSION
+
+# Config fields that are bookkeeping, not inputs to the evaluation
+NON_KEY_FIELDS = ("iteration", "metrics")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    cache_key TEXT PRIMARY KEY,
+    engine_version INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    expires_at REAL,
+    size INTEGER NOT NULL,
+    payload TEXT NOT NULL
+)
+"""
+
+
+def _canonical(value):
+    """JSON-compatible form of keys' numpy scalars, tuples and SeedSequences"""
+    if isinstance(value, np.random.SeedSequence):
+        return {"entropy": value.entropy, "spawn_key": list(value.spawn_key), "pool_size": value.pool_size}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (tuple, set)):
+        return list(value)
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
+
+def is_cacheable_seed(seed) -> bool:
+    """Only explicit seeds reproduce the same paths; None and live Generators do not"""
+    return isinstance(seed, (int, np.integer, np.random.SeedSequence))
+
+
+def evaluation_key(config: Dict, scenario_params: Dict, num_paths: int, seed, horizon_years: float,
+                   engine: Dict, **options) -> str:
+    """SHA-256 of the canonical JSON of everything that determines an evaluation's metrics"""
+    document = {
+        "config": {name: value for name, value in config.items() if name not in NON_KEY_FIELDS},
+        "scenario_params": scenario_params,
+        "num_paths": int(num_paths),
+        "seed": seed,
+        "horizon_years": float(horizon_years),
+        "engine": engine,
+        "options": options
+    }
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=_canonical)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class EvaluationCache:
+    """
+    SQLite-backed evaluation cache with age and size eviction and hit/miss
+    counters. Subclasses set their own `table`, so caches of different kinds
+    can share one database file without evicting or purging each other's entries.
+    """
+
+    table = "results"
+
+    def __init__(self,
+                 path: str = ":memory:",
+                 max_bytes: int = 256 * 1024 ** 2,
+                 max_age_seconds: Optional[float] = 30 * 24 * 3600,
+                 engine_version: int = ENGINE_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.engine_version = engine_version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA.format(table=self.table))
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)")
+        with self._lock:
+            removed = self._db.execute(f"DELETE FROM {self.table} WHERE engine_version != ?",
+                                       (engine_version,)).rowcount
+            self.evictions += removed
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached metrics for `key`, or None on a miss (expired entries are misses)"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(f"SELECT payload, expires_at FROM {self.table} WHERE cache_key = ?",
+                                   (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    self._db.execute(f"DELETE FROM {self.table} WHERE cache_key = ?", (key,))
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._db.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE cache_key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, metrics: Dict) -> None:
+        """Store metrics under `key`, then evict expired and least recently used entries"""
+        payload = json.dumps(metrics, default=_canonical)
+        now = time.time()
+        expires_at = now + self.max_age_seconds if self.max_age_seconds is not None else None
+        with self._lock:
+            self._db.execute(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (key, self.engine_version, now, now, expires_at, len(payload), payload))
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self.evictions += self._db.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,)).rowcount
+        total, = self._db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        if total <= self.max_bytes:
+            return
+        # Oldest-accessed first until the payloads fit
+        excess = total - self.max_bytes
+        freed = 0
+        stale = []
+        for key, size in self._db.execute(f"SELECT cache_key, size FROM {self.table} ORDER BY accessed_at"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._db.executemany(f"DELETE FROM {self.table} WHERE cache_key = ?", stale)
+        self.evictions += len(stale)
+
+    def items(self) -> Iterator[Dict]:
+        """Entries as Results Cache items ({cache_key, engine_version, expires_at, payload})"""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT cache_key, engine_version, expires_at, payload FROM {self.table}").fetchall()
+        for key, version, expires_at, payload in rows:
+            yield {"cache_key": key, "engine_version": version,
+                   "expires_at": int(expires_at) if expires_at is not None else None, "payload": payload}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current footprint"""
+        with self._lock:
+            entries, nbytes = self._db.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "nbytes": nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "engine_version": self.engine_version
+        }
+
+    def __len__(self) -> int:
+        return self.stats()["entries"]
@@ -0,0 +1,88 @@
+"""
+Regime-robust strategy objectives.
+
+Instead of one search per market scenario followed by manual reconciliation
+of five unrelated "best" configs, a robust search scores every sampled config
+on all regimes at once (`StrategyEvaluator.evaluate_regimes`, one batched
+scan) and ranks it by an aggregate objective:
+
+* `worst_case_sharpe` - the lowest Sharpe ratio across regimes;
+* `weighted_sharpe` - the regime-weighted mean Sharpe ratio (equal weights by
+  default, or e.g. scenario probabilities).
+
+Robust history entries keep the optimizer's shape: `metrics` holds the
+aggregates, with the chosen objective repeated as `sharpe_ratio` /
+`sharpe_ratio_se` so best-config selection and stopping rules apply unchanged,
+and `regime_metrics` holds the full metrics per regime.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+from .strategy import StrategyEvaluator
+
+ROBUST_SCENARIO = "robust"
+ROBUST_OBJECTIVES = ("worst_case_sharpe", "weighted_sharpe")
+
+
+def regime_weights(scenarios: List[str], weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Regime weights normalized to sum to one (equal by default; regimes missing from `weights` get zero)"""
+    raw = {scenario: 1.0 if weights is None else float(weights.get(scenario, 0.0)) for scenario in scenarios}
+    unknown = set(weights or {}) - set(scenarios)
+    if unknown:
+        raise ValueError(f"Weights for unknown regimes: {sorted(unknown)}")
+    total = sum(raw.values())
+    if total <= 0 or any(weight < 0 for weight in raw.values()):
+        raise ValueError("Regime weights must be non-negative with a positive sum")
+    return {scenario: weight / total for scenario, weight in raw.items()}
+
+
+def robust_metrics(regime_metrics: Dict[str, Dict], weights: Dict[str, float],
+                   objective: str = "worst_case_sharpe") -> Dict:
+    """
+    Aggregate metrics of one config over regimes. Standard errors treat the
+    regimes' estimates as independent.
+    """
+    if objective not in ROBUST_OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}', expected one of {ROBUST_OBJECTIVES}")
+    sharpes = {scenario: metrics['sharpe_ratio'] for scenario, metrics in regime_metrics.items()}
+    worst = min(sharpes, key=sharpes.get)
+    weighted = sum(weights[scenario] * sharpe for scenario, sharpe in sharpes.items())
+    metrics = {
+        "worst_case_sharpe": sharpes[worst],
+        "worst_case_sharpe_se": regime_metrics[worst].get('sharpe_ratio_se', math.nan),
+        "weighted_sharpe": weighted,
+        "weighted_sharpe_se": math.sqrt(sum(weights[scenario] ** 2 * metrics.get('sharpe_ratio_se', math.nan) ** 2
+                                            for scenario, metrics in regime_metrics.items())),
+        "sharpe_dispersion": math.sqrt(sum(weights[scenario] * (sharpe - weighted) ** 2
+                                           for scenario, sharpe in sharpes.items())),
+        "worst_regime": worst,
+        "weighted_mean_return": sum(weights[s] * metrics['mean_return'] for s, metrics in regime_metrics.items()),
+        "worst_max_drawdown": min(metrics['max_drawdown'] for metrics in regime_metrics.values()),
+        "worst_cvar_95": min(metrics['cvar_95'] for metrics in regime_metrics.values())
+    }
+    metrics["sharpe_ratio"] = metrics[objective]
+    metrics["sharpe_ratio_se"] = metrics[f"{objective}_se"]
+    return metrics
+
+
+def evaluate_robust(evaluator: StrategyEvaluator, configs: List[Dict], num_paths: int = 1000, seed=None,
+                    scenarios: Optional[List[str]] = None, weights: Optional[Dict[str, float]] = None,
+                    objective: str = "worst_case_sharpe") -> List[Dict]:
+    """
+    Score configs on every regime in one batched evaluation; returns history
+    entries with aggregate `metrics` and per-regime `regime_metrics`
+    """
+    scenarios = scenarios or list(evaluator.market_scenarios)
+    normalized = regime_weights(scenarios, weights)
+    per_regime = evaluator.evaluate_regimes(configs, num_paths, seed, scenarios)
+    entries = []
+    for k, config in enumerate(configs):
+        regime_metrics = {scenario: per_regime[scenario][k] for scenario in scenarios}
+        entries.append({
+            'config': config,
+            'metrics': robust_metrics(regime_metrics, normalized, objective),
+            'regime_metrics': regime_metrics,
+            'market_scenario': ROBUST_SCENARIO
+        })
+    return entries
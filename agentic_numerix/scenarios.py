@@ -0,0 +1,212 @@
+"""
+Columnar volatility scenario sets for the multi-asset hedging analysis.
+
+A `ScenarioSet` holds one array per risk factor - scenarios x 6 FX pairs,
+scenarios x 7 IR tenors, scenarios x 6 credit ratings, equity vol - plus a
+correlation regime code and credit jump flags. `generate_scenario_set` draws
+every factor in one Latin Hypercube design (each of the 23 dimensions is
+stratified into `num_scenarios` equal-probability bins), so a million
+scenarios are a handful of whole-array operations. The nested per-scenario
+dicts used by the agents and the JSON payloads are built only on demand.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .instrumentation import tracer
+from .qmc import norm_ppf
+from .simulation import make_rng
+
+CURRENCY_PAIRS = ("EURUSD", "GBPUSD", "JPYUSD", "CHFUSD", "AUDUSD", "CADUSD")
+IR_TENORS = ("3M", "6M", "1Y", "2Y", "5Y", "10Y", "30Y")
+CREDIT_RATINGS = ("AAA", "AA", "A", "BBB", "BB", "B")
+CORRELATION_REGIMES = ("normal", "stress", "crisis")
+REGIME_PROBABILITIES = (0.70, 0.20, 0.10)
+CREDIT_JUMP_PROBABILITY = 0.10  # Systemic jump risk
+CREDIT_JUMP_RANGE = (1.5, 3.0)
+
+# Factor: (default min_vol, default max_vol, lognormal sigma); draws are centred on the range midpoint
+FACTOR_DEFAULTS = {
+    "fx_volatility": (0.05, 0.35, 0.30),
+    "interest_rate_volatility": (0.60, 1.80, 0.25),  # 60-180 bps
+    "credit_volatility": (0.15, 0.75, 0.40),
+    "equity_volatility": (0.12, 0.55, 0.35)
+}
+
+
+def latin_hypercube(num_samples: int, num_dims: int, seed=None) -> np.ndarray:
+    """
+    Latin Hypercube sample on the unit cube, shaped (num_dims, num_samples):
+    every dimension has exactly one point in each of the `num_samples`
+    equal-width strata, with strata paired at random across dimensions.
+    """
+    rng = make_rng(seed)
+    sample = rng.random((num_dims, num_samples))
+    for dim in range(num_dims):
+        sample[dim] += rng.permutation(num_samples)
+    sample /= num_samples
+    return sample
+
+
+class ScenarioSet:
+    """Columnar set of volatility scenarios with on-demand per-scenario dict views"""
+
+    def __init__(self,
+                 fx_volatility: np.ndarray,
+                 interest_rate_volatility: np.ndarray,
+                 credit_volatility: np.ndarray,
+                 equity_volatility: np.ndarray,
+                 regime_codes: np.ndarray,
+                 credit_jump: np.ndarray,
+                 scenario_index: Optional[np.ndarray] = None,
+                 generation_timestamp: Optional[str] = None):
+        self.fx_volatility = fx_volatility  # (scenarios, len(CURRENCY_PAIRS))
+        self.interest_rate_volatility = interest_rate_volatility  # (scenarios, len(IR_TENORS))
+        self.credit_volatility = credit_volatility  # (scenarios, len(CREDIT_RATINGS)), jumps applied
+        self.equity_volatility = equity_volatility  # (scenarios,)
+        self.regime_codes = regime_codes  # Index into CORRELATION_REGIMES
+        self.credit_jump = credit_jump  # Systemic credit jump flag
+        self.scenario_index = np.arange(len(equity_volatility)) if scenario_index is None else scenario_index
+        self.generation_timestamp = generation_timestamp or datetime.now().isoformat()
+
+    def __len__(self) -> int:
+        return len(self.equity_volatility)
+
+    @property
+    def regimes(self) -> np.ndarray:
+        """Correlation regime names per scenario"""
+        return np.asarray(CORRELATION_REGIMES)[self.regime_codes]
+
+    def scenario_ids(self) -> List[str]:
+        return [f"scenario_{i:04d}" for i in self.scenario_index.tolist()]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The factor arrays by name"""
+        return {
+            "scenario_index": self.scenario_index,
+            "fx_volatility": self.fx_volatility,
+            "interest_rate_volatility": self.interest_rate_volatility,
+            "credit_volatility": self.credit_volatility,
+            "equity_volatility": self.equity_volatility,
+            "regime_codes": self.regime_codes,
+            "credit_jump": self.credit_jump
+        }
+
+    def fingerprint(self) -> str:
+        """SHA-256 of the factor arrays (not the timestamp): equal for identically generated sets"""
+        digest = hashlib.sha256()
+        for name, values in self.columns().items():
+            digest.update(name.encode())
+            digest.update(np.ascontiguousarray(values).tobytes())
+        return digest.hexdigest()
+
+    def take(self, indices) -> "ScenarioSet":
+        """Subset of scenarios (index array, slice or boolean mask); scenario ids are kept"""
+        return ScenarioSet(**{name: values[indices] for name, values in self.columns().items()},
+                           generation_timestamp=self.generation_timestamp)
+
+    def scenario(self, i: int) -> Dict:
+        """Nested dict view of scenario i, in the notebook's original per-scenario layout"""
+        return next(self.iter_dicts(i, i + 1))
+
+    def iter_dicts(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict]:
+        """Nested dict views of scenarios [start, stop)"""
+        rows = slice(start, stop)
+        regimes = self.regimes[rows].tolist()
+        for j, (index, fx, ir, credit, equity) in enumerate(zip(
+                self.scenario_index[rows].tolist(), self.fx_volatility[rows].tolist(),
+                self.interest_rate_volatility[rows].tolist(), self.credit_volatility[rows].tolist(),
+                self.equity_volatility[rows].tolist())):
+            yield {
+                "scenario_id": f"scenario_{index:04d}",
+                "fx_volatility": dict(zip(CURRENCY_PAIRS, fx)),
+                "interest_rate_volatility": dict(zip(IR_TENORS, ir)),
+                "credit_volatility": dict(zip(CREDIT_RATINGS, credit)),
+                "equity_volatility": {"equity_vol": equity},
+                "correlation_regime": regimes[j]
+            }
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self.iter_dicts())
+
+    @tracer.traced("scenarios.statistics")
+    def statistics(self) -> Dict:
+        """Summary statistics across scenarios"""
+        def summary(values: np.ndarray) -> Dict:
+            return {
+                "mean": float(np.mean(values)),
+                "median": float(np.median(values)),
+                "min": float(np.min(values)),
+                "max": float(np.max(values)),
+                "std": float(np.std(values))
+            }
+
+        # Correlation regime distribution, most frequent first
+        counts = np.bincount(self.regime_codes, minlength=len(CORRELATION_REGIMES))
+        order = np.argsort(-counts, kind='stable')
+        return {
+            "fx_volatility": summary(self.fx_volatility),
+            "interest_rate_volatility": summary(self.interest_rate_volatility),
+            "correlation_regime_distribution": {
+                CORRELATION_REGIMES[i]: int(counts[i]) for i in order if counts[i] > 0
+            }
+        }
+
+    def to_payload(self) -> Dict:
+        """JSON-serializable scenario file in the original `generate_scenarios` layout"""
+        return {
+            "scenarios": self.to_dicts(),
+            "num_scenarios": len(self),
+            "generation_timestamp": self.generation_timestamp,
+            "statistics": self.statistics()
+        }
+
+
+@tracer.traced("scenarios.generate")
+def generate_scenario_set(scenario_params: Dict, num_scenarios: int = 1000, seed=None) -> ScenarioSet:
+    """
+    Generate volatility scenarios with Latin Hypercube Sampling.
+
+    `scenario_params` gives `min_vol` / `max_vol` per factor (see FACTOR_DEFAULTS).
+    Vols are lognormal around the range midpoint; the correlation regime and the
+    credit jump flag and size come from their own stratified dimensions, so the
+    regime mix matches REGIME_PROBABILITIES to within one scenario per regime.
+    """
+    widths = {"fx_volatility": len(CURRENCY_PAIRS), "interest_rate_volatility": len(IR_TENORS),
+              "credit_volatility": len(CREDIT_RATINGS), "equity_volatility": 1}
+    num_dims = sum(widths.values()) + 3  # + regime, jump flag, jump size
+    sample = latin_hypercube(num_scenarios, num_dims, seed)
+
+    factors = {}
+    dim = 0
+    for factor, width in widths.items():
+        default_min, default_max, sigma = FACTOR_DEFAULTS[factor]
+        params = scenario_params.get(factor, {})
+        center = np.log((params.get("min_vol", default_min) + params.get("max_vol", default_max)) / 2)
+        values = np.empty((num_scenarios, width))
+        for j in range(width):
+            z = norm_ppf(sample[dim + j])
+            z *= sigma
+            z += center
+            values[:, j] = np.exp(z, out=z)
+        factors[factor] = values
+        dim += width
+
+    regime_codes = np.searchsorted(np.cumsum(REGIME_PROBABILITIES)[:-1], sample[dim], side='right').astype(np.int8)
+    credit_jump = sample[dim + 1] < CREDIT_JUMP_PROBABILITY
+    jump_low, jump_high = CREDIT_JUMP_RANGE
+    jump_multiplier = np.where(credit_jump, jump_low + (jump_high - jump_low) * sample[dim + 2], 1.0)
+    factors["credit_volatility"] *= jump_multiplier[:, None]
+
+    tracer.count("scenarios.generated", num_scenarios)
+    return ScenarioSet(
+        fx_volatility=factors["fx_volatility"],
+        interest_rate_volatility=factors["interest_rate_volatility"],
+        credit_volatility=factors["credit_volatility"],
+        equity_volatility=factors["equity_volatility"][:, 0].copy(),
+        regime_codes=regime_codes,
+        credit_jump=credit_jump
+    )
@@ -0,0 +1,79 @@
+"""
+Strategy hyperparameter search space: random sampling and grid sweeps over
+`STRATEGY_HYPERPARAMETERS`. Both produce plain config dicts that can be scored
+together with `StrategyEvaluator.evaluate_batch`.
+"""
+
+import itertools
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def sample_configuration(strategy_params: Dict, iteration: int, rng: np.random.Generator) -> Dict:
+    """Sample one strategy configuration from the hyperparameter space"""
+    return {
+        "iteration": iteration,
+        "target_volatility": float(rng.uniform(
+            strategy_params['target_volatility']['min'],
+            strategy_params['target_volatility']['max']
+        )),
+        "equity_weight_function": str(rng.choice(
+            strategy_params['equity_weight_function']['choices']
+        )),
+        "vol_lookback_months": int(rng.integers(
+            strategy_params['vol_lookback_months']['min'],
+            strategy_params['vol_lookback_months']['max'] + 1
+        )),
+        "rebalancing_frequency": str(rng.choice(
+            strategy_params['rebalancing_frequency']['options']
+        )),
+        "risk_aversion": float(rng.uniform(
+            strategy_params['risk_aversion']['min'],
+            strategy_params['risk_aversion']['max']
+        )),
+        "transaction_cost_bps": float(rng.uniform(
+            strategy_params['transaction_cost_bps']['min'],
+            strategy_params['transaction_cost_bps']['max']
+        )),
+        "min_equity_weight": strategy_params['equity_weight_bounds']['min_weight'],
+        "max_equity_weight": strategy_params['equity_weight_bounds']['max_weight']
+    }
+
+
+def sample_configurations(strategy_params: Dict, num_configs: int,
+                          rng: Optional[np.random.Generator] = None, start_iteration: int = 0) -> List[Dict]:
+    """Sample `num_configs` random strategy configurations"""
+    rng = rng if rng is not None else np.random.default_rng()
+    return [sample_configuration(strategy_params, start_iteration + i, rng) for i in range(num_configs)]
+
+
+def default_configuration(strategy_params: Dict) -> Dict:
+    """Baseline configuration from the `default` entries of the hyperparameter space"""
+    return {
+        "iteration": 0,
+        "target_volatility": strategy_params['target_volatility']['default'],
+        "equity_weight_function": strategy_params['equity_weight_function']['choices'][0],
+        "vol_lookback_months": strategy_params['vol_lookback_months']['default'],
+        "rebalancing_frequency": strategy_params['rebalancing_frequency']['default'],
+        "risk_aversion": strategy_params['risk_aversion']['default'],
+        "transaction_cost_bps": strategy_params['transaction_cost_bps']['default'],
+        "min_equity_weight": strategy_params['equity_weight_bounds']['min_weight'],
+        "max_equity_weight": strategy_params['equity_weight_bounds']['max_weight']
+    }
+
+
+def grid_configurations(strategy_params: Dict, grid: Dict[str, List[Any]], start_iteration: int = 0) -> List[Dict]:
+    """
+    Cartesian product of the values in `grid`, e.g.
+    {"target_volatility": [0.08, 0.10, 0.12], "vol_lookback_months": [6, 12, 24]}.
+    Parameters not in the grid keep their defaults.
+    """
+    base = default_configuration(strategy_params)
+    names = list(grid.keys())
+    configs = []
+    for i, values in enumerate(itertools.product(*(grid[name] for name in names))):
+        config = dict(base, **dict(zip(names, values)))
+        config["iteration"] = start_iteration + i
+        configs.append(config)
+    return configs
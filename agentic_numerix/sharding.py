@@ -0,0 +1,201 @@
+"""
+Key-sharded scenario processing across instances and cores.
+
+`write_scenario_shards` splits a scenario set into N shard tables by a stable
+hash of the scenario key and records them in a manifest. Each processing
+instance then handles only its own shards (SageMaker's `ShardedByS3Key`
+delivers each instance a disjoint subset of the shard files; locally,
+`assign_shards` deals them round-robin), fans each shard's scenarios out over a
+process pool on its cores and writes one distinctly named result table per
+shard plus an instance manifest. `run_local_instances` simulates N instances
+as separate processes against a local directory.
+
+Chunk seeds derive from (manifest seed, shard, chunk), so results do not
+depend on the number of instances or workers.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .interchange import TABLE_SUFFIX, LocalStore, Store, read_table, write_scenarios, write_table
+from .scenarios import ScenarioSet
+
+MANIFEST_VERSION = 1
+
+ProcessFn = Callable[[Dict[str, np.ndarray], np.random.SeedSequence], Dict[str, np.ndarray]]
+SummarizeFn = Callable[[Dict[str, np.ndarray]], Dict]
+
+
+def shard_of(scenario_index: np.ndarray, num_shards: int) -> np.ndarray:
+    """Stable shard id per scenario key (splitmix64 finalizer of the index, mod num_shards)"""
+    x = np.asarray(scenario_index, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x % np.uint64(num_shards)).astype(np.int64)
+
+
+def shard_name(shard: int, num_shards: int) -> str:
+    return f"shard-{shard:05d}-of-{num_shards:05d}"
+
+
+def write_scenario_shards(store: Store, shard_prefix: str, manifest_key: str, scenario_set: ScenarioSet,
+                          num_shards: int, seed: int = 0) -> Dict:
+    """Write one scenario table per shard under `shard_prefix` and the manifest at `manifest_key`"""
+    shard_ids = shard_of(scenario_set.scenario_index, num_shards)
+    shards = []
+    for shard in range(num_shards):
+        filename = shard_name(shard, num_shards) + TABLE_SUFFIX
+        members = np.flatnonzero(shard_ids == shard)
+        write_scenarios(store, f"{shard_prefix}/{filename}", scenario_set.take(members))
+        shards.append({"shard": shard, "file": filename, "num_scenarios": int(len(members))})
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "num_shards": num_shards,
+        "num_scenarios": len(scenario_set),
+        "seed": seed,
+        "shards": shards
+    }
+    store.put_bytes(manifest_key, json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+def read_manifest(store: Store, key: str) -> Dict:
+    return json.loads(store.get_bytes(key))
+
+
+def assign_shards(manifest: Dict, instance: int, num_instances: int) -> List[Dict]:
+    """Round-robin share of the manifest's shards for one instance"""
+    return [entry for entry in manifest["shards"] if entry["shard"] % num_instances == instance]
+
+
+def sagemaker_instance(config_path: str = "/opt/ml/config/resourceconfig.json") -> Tuple[int, int]:
+    """(instance index, instance count) of a SageMaker processing job; (0, 1) outside SageMaker"""
+    try:
+        with open(config_path) as f:
+            config = json.load(f)
+    except OSError:
+        return 0, 1
+    hosts = sorted(config["hosts"])
+    return hosts.index(config["current_host"]), len(hosts)
+
+
+def _chunks(columns: Dict[str, np.ndarray], chunk_size: int) -> List[Dict[str, np.ndarray]]:
+    n = len(next(iter(columns.values())))
+    return [{name: np.asarray(values[start:start + chunk_size]) for name, values in columns.items()}
+            for start in range(0, n, chunk_size)]
+
+
+def _run_chunk(args) -> Dict[str, np.ndarray]:
+    process_fn, columns, seed = args
+    return process_fn(columns, seed)
+
+
+def process_shards(store: Store,
+                   manifest: Dict,
+                   shards: List[Dict],
+                   input_prefix: str,
+                   output_prefix: str,
+                   process_fn: ProcessFn,
+                   summarize_fn: Optional[SummarizeFn] = None,
+                   columns: Optional[List[str]] = None,
+                   instance: int = 0,
+                   num_workers: Optional[int] = None,
+                   chunk_size: int = 10000) -> Dict:
+    """
+    Process this instance's shards: each shard's selected `columns` are split into
+    chunks scored by `process_fn(chunk_columns, seed)` on a pool of `num_workers`
+    processes (all cores by default), concatenated and written to
+    `{output_prefix}/results-{shard name}.cols` with `summarize_fn(columns)` as
+    metadata. Writes and returns the instance manifest.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    started = time.time()
+    entries = []
+    pool = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else None
+    try:
+        for entry in shards:
+            table = read_table(store, f"{input_prefix}/{entry['file']}", columns=columns)
+            chunks = _chunks(table["columns"], chunk_size) if entry["num_scenarios"] else []
+            tasks = [(process_fn, chunk, np.random.SeedSequence(manifest["seed"], spawn_key=(entry["shard"], i)))
+                     for i, chunk in enumerate(chunks)]
+            parts = list(pool.map(_run_chunk, tasks)) if pool else [_run_chunk(task) for task in tasks]
+            if not parts:
+                continue
+            results = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+            output_key = f"{output_prefix}/results-{shard_name(entry['shard'], manifest['num_shards'])}{TABLE_SUFFIX}"
+            metadata = dict(summarize_fn(results) if summarize_fn else {}, shard=entry["shard"])
+            write_table(store, output_key, results, "scenario_results", metadata)
+            entries.append({"shard": entry["shard"], "output_key": output_key,
+                            "num_processed": int(entry["num_scenarios"])})
+    finally:
+        if pool:
+            pool.shutdown()
+
+    instance_manifest = {
+        "version": MANIFEST_VERSION,
+        "instance": instance,
+        "num_workers": num_workers,
+        "shards": entries,
+        "elapsed_seconds": time.time() - started
+    }
+    store.put_bytes(f"{output_prefix}/manifest-instance-{instance:03d}.json",
+                    json.dumps(instance_manifest, indent=2).encode())
+    return instance_manifest
+
+
+def _local_instance(root: str, manifest_key: str, input_prefix: str, output_prefix: str, process_fn: ProcessFn,
+                    summarize_fn: Optional[SummarizeFn], columns: Optional[List[str]], instance: int,
+                    num_instances: int, num_workers: int, chunk_size: int) -> None:
+    store = LocalStore(root)
+    manifest = read_manifest(store, manifest_key)
+    process_shards(store, manifest, assign_shards(manifest, instance, num_instances), input_prefix,
+                   output_prefix, process_fn, summarize_fn, columns, instance, num_workers, chunk_size)
+
+
+def run_local_instances(store: LocalStore,
+                        manifest_key: str,
+                        input_prefix: str,
+                        output_prefix: str,
+                        process_fn: ProcessFn,
+                        summarize_fn: Optional[SummarizeFn] = None,
+                        columns: Optional[List[str]] = None,
+                        num_instances: int = 5,
+                        workers_per_instance: int = 1,
+                        chunk_size: int = 10000) -> List[Dict]:
+    """
+    Simulate a multi-instance processing job locally: one OS process per
+    instance, each with its own pool of `workers_per_instance` workers and its
+    round-robin share of the shards. Returns the instance manifests.
+    """
+    processes = [
+        multiprocessing.Process(target=_local_instance, args=(
+            store.root, manifest_key, input_prefix, output_prefix, process_fn, summarize_fn, columns,
+            instance, num_instances, workers_per_instance, chunk_size
+        ))
+        for instance in range(num_instances)
+    ]
+    try:
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    finally:
+        # Interrupted or failed to start: stop the instances still running before propagating
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+    failed = {instance: process.exitcode for instance, process in enumerate(processes) if process.exitcode != 0}
+    if failed:
+        raise RuntimeError(f"Local instances {sorted(failed)} failed with exit codes {list(failed.values())}")
+    return [read_manifest(store, f"{output_prefix}/manifest-instance-{instance:03d}.json")
+            for instance in range(num_instances)]
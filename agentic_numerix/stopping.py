@@ -0,0 +1,66 @@
+"""
+Pluggable early-stopping rules for hyperparameter search.
+
+A stopping rule is any callable taking the history so far (entries in
+evaluation order, each with a `metrics` dict) and returning a reason string
+to stop, or None to continue. Rules only look at the history, so a resumed
+run stops at the same point as an uninterrupted one.
+"""
+
+import math
+from typing import Callable, Dict, List, Optional
+
+StoppingRule = Callable[[List[Dict]], Optional[str]]
+
+
+class NoImprovementStopping:
+    """Stop when the best metric has not improved by more than `min_delta` in `patience` evaluations"""
+
+    def __init__(self, patience: int = 50, min_delta: float = 0.0, metric: str = "sharpe_ratio"):
+        self.patience = patience
+        self.min_delta = min_delta
+        self.metric = metric
+
+    def threshold(self, best: float, metrics: Optional[Dict] = None) -> float:
+        """Improvement over `best` (from the entry with `metrics`) that counts as progress"""
+        return self.min_delta
+
+    def __call__(self, history: List[Dict]) -> Optional[str]:
+        best = -math.inf  # Last significant best: the value improvements are measured against
+        best_metrics = None
+        last_improvement = -1
+        top = -math.inf
+        for i, entry in enumerate(history):
+            value = entry['metrics'][self.metric]
+            top = max(top, value)
+            if best == -math.inf or value > best + self.threshold(best, best_metrics):
+                best = value
+                best_metrics = entry['metrics']
+                last_improvement = i
+        stale = len(history) - 1 - last_improvement
+        if history and stale >= self.patience:
+            return (f"no {self.metric} improvement beyond {self.threshold(best, best_metrics):.4f} "
+                    f"in {stale} evaluations (best {top:.4f}, last significant best {best:.4f})")
+        return None
+
+
+class SharpeConfidenceStopping(NoImprovementStopping):
+    """
+    Stop when no evaluation in the last `patience` beat the best Sharpe ratio by
+    more than `z` standard errors of its estimate, i.e. once improvements are
+    indistinguishable from Monte Carlo noise. The standard error is the best
+    entry's replicate-based `sharpe_ratio_se` when it has one (this also credits
+    variance reduction), else the iid estimate from `num_paths` paths,
+    sqrt((1 + SR^2 / 2) / num_paths).
+    """
+
+    def __init__(self, num_paths: int, patience: int = 50, z: float = 1.96):
+        super().__init__(patience=patience, metric="sharpe_ratio")
+        self.num_paths = num_paths
+        self.z = z
+
+    def threshold(self, best: float, metrics: Optional[Dict] = None) -> float:
+        standard_error = (metrics or {}).get("sharpe_ratio_se", math.nan)
+        if not math.isfinite(standard_error):
+            standard_error = math.sqrt((1 + 0.5 * best ** 2) / self.num_paths)
+        return self.z * standard_error
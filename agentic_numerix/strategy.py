@@ -0,0 +1,797 @@
+"""
+Volatility-targeted equity/bond allocation strategy evaluation.
+
+`StrategyEvaluator.evaluate` is the vectorized replacement for the per-step loop
+in `HyperparameterOptimizationAgent.evaluate_strategy`: weights, transaction
+costs and portfolio values are computed as whole-array operations over the
+simulated paths and the same metrics dict is returned. `evaluate_streaming`
+runs the same scan on paths simulated chunk by chunk, without storing them.
+With a `result_cache`, configs already scored on the same inputs are looked up
+instead of re-evaluated.
+
+Every metric comes with a standard error (`<metric>_se`) from the spread of
+the metric across the simulator's independent path replicates (batch means;
+for max drawdown, a worst case, it is only indicative). With
+`control_variate=True` the mean return and mean final value are regressed on
+the unmanaged equity and bond legs, whose expectations are known, and
+corrected by the legs' sampling error.
+
+Each config rebalances at its own `rebalancing_frequency`. With `sparse=True`,
+stored paths are scored by `SparsePortfolioScan`, which only recomputes
+weights and costs on rebalance dates and just tracks drawdown in between.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import tracer
+from .path_cache import PathStore
+from .result_cache import EvaluationCache, evaluation_key, is_cacheable_seed
+from .simulation import (
+    DEFAULT_REPLICATES,
+    TRADING_DAYS_PER_MONTH,
+    TRADING_DAYS_PER_YEAR,
+    GBMPathSimulator,
+    horizon_steps,
+)
+from .tail import TailSketch
+from .volatility import window_realized_vol
+
+METRIC_NAMES = [
+    "mean_return", "volatility", "sharpe_ratio", "max_drawdown", "final_value_mean",
+    "final_value_std", "var_95", "cvar_95", "avg_equity_weight", "equity_weight_volatility"
+]
+STANDARD_ERROR_NAMES = [f"{name}_se" for name in METRIC_NAMES]
+REBALANCE_INTERVALS = {
+    "daily": 1,
+    "weekly": 5,
+    "monthly": TRADING_DAYS_PER_MONTH,
+    "quarterly": 3 * TRADING_DAYS_PER_MONTH
+}
+
+
+def _weight_function(func_type: str, vol: np.ndarray, target_vol) -> np.ndarray:
+    """Unbounded equity weight for an array of realized vols (target_vol may broadcast)"""
+    if func_type in ("inverse_vol", "inverse_vol_squared"):
+        power = 1 if func_type == "inverse_vol" else 2
+        positive = vol > 0
+        ratio = np.divide(target_vol, vol, out=np.ones(np.broadcast(target_vol, vol).shape), where=positive)
+        return np.where(positive, np.minimum(ratio ** power, 1.0), 1.0)
+    elif func_type == "linear_decay":
+        k = 5.0  # Decay rate
+        return np.maximum(0.0, 1.0 - k * (vol - target_vol))
+    elif func_type == "sigmoid":
+        k = 10.0  # Steepness
+        return 1.0 / (1.0 + np.exp(k * (vol - target_vol)))
+    return np.full(np.broadcast(target_vol, vol).shape, 0.5)  # Default 50/50
+
+
+def calculate_equity_weight(config: Dict, realized_vol: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """
+    Calculate equity weight based on strategy function.
+
+    `realized_vol` may be a scalar or an array of per-path vols; the result has
+    the same shape.
+    """
+    vol = np.asarray(realized_vol, dtype=float)
+    weight = _weight_function(config['equity_weight_function'], vol, config['target_volatility'])
+
+    # Apply bounds
+    weight = np.clip(weight, config['min_equity_weight'], config['max_equity_weight'])
+    return float(weight) if weight.ndim == 0 else weight
+
+
+def calculate_equity_weights_batch(configs: List[Dict], realized_vol: np.ndarray) -> np.ndarray:
+    """
+    Equity weights for K configs at once. `realized_vol` has a leading config
+    axis of length K (any trailing shape); configs sharing a weight function
+    are evaluated together.
+    """
+    vol = np.asarray(realized_vol, dtype=float)
+    expand = (slice(None),) + (None,) * (vol.ndim - 1)
+    target = np.array([c['target_volatility'] for c in configs])[expand]
+    lower = np.array([c['min_equity_weight'] for c in configs])[expand]
+    upper = np.array([c['max_equity_weight'] for c in configs])[expand]
+    func_types = np.array([c['equity_weight_function'] for c in configs])
+
+    weights = np.empty(vol.shape)
+    for func_type in np.unique(func_types):
+        idx = np.flatnonzero(func_types == func_type)
+        weights[idx] = _weight_function(str(func_type), vol[idx], target[idx])
+    return np.clip(weights, lower, upper)
+
+
+def calculate_max_drawdown(portfolio_values: np.ndarray) -> float:
+    """Calculate maximum drawdown"""
+    cummax = np.maximum.accumulate(portfolio_values, axis=1)
+    drawdown = (portfolio_values - cummax) / cummax
+    return float(np.min(drawdown))
+
+
+def rebalance_interval(config: Dict) -> int:
+    """Steps between rebalances for the config's `rebalancing_frequency` (monthly when unset)"""
+    frequency = config.get('rebalancing_frequency', "monthly")
+    if frequency not in REBALANCE_INTERVALS:
+        raise ValueError(f"Unknown rebalancing_frequency '{frequency}', expected one of {list(REBALANCE_INTERVALS)}")
+    return REBALANCE_INTERVALS[frequency]
+
+
+def rebalance_dates(n_steps: int, lookback_steps: int, interval: int = TRADING_DAYS_PER_MONTH) -> np.ndarray:
+    """Time steps at which the strategy re-estimates volatility and rebalances"""
+    dates = np.arange(interval, n_steps, interval)
+    return dates[dates >= lookback_steps]
+
+
+class StrategyEvaluator:
+    """Evaluates allocation strategy configurations on simulated market paths"""
+
+    def __init__(self, market_scenarios: Dict, simulator: Optional[GBMPathSimulator] = None,
+                 horizon_years: float = 5, path_store: Optional[PathStore] = None,
+                 result_cache: Optional[EvaluationCache] = None, control_variate: bool = False,
+                 sparse: bool = False):
+        if path_store is not None and simulator is not None and simulator.describe() != path_store.simulator.describe():
+            raise ValueError("The path store's simulator differs from the evaluator's; cached results "
+                             "would be keyed by the wrong engine")
+        self.market_scenarios = market_scenarios
+        # Stored paths come from the store's simulator, so it also keys cached results
+        self.simulator = path_store.simulator if path_store is not None else simulator or GBMPathSimulator()
+        self.horizon_years = horizon_years
+        self.path_store = path_store
+        self.result_cache = result_cache
+        self.control_variate = control_variate
+        self.sparse = sparse
+
+    def _cached(self, configs: List[Dict], market_scenario: str, num_paths: int, seed,
+                compute: Callable[[List[Dict]], List[Dict]], **options) -> List[Dict]:
+        """Metrics per config, computing (in one call) only those missing from the result cache"""
+        with tracer.span("evaluate", market_scenario=market_scenario, configs=len(configs), num_paths=num_paths):
+            tracer.count("evaluate.configs", len(configs))
+            if self.result_cache is None or not is_cacheable_seed(seed):
+                return compute(configs)
+            scenario_params = self.market_scenarios[market_scenario]
+            engine = self.simulator.describe()
+            if self.control_variate:
+                options = dict(options, control_variate=True)
+            keys = [evaluation_key(config, scenario_params, num_paths, seed, self.horizon_years, engine, **options)
+                    for config in configs]
+            with tracer.span("result_cache.get"):
+                metrics = [self.result_cache.get(key) for key in keys]
+            missing = [i for i, m in enumerate(metrics) if m is None]
+            tracer.count("result_cache.hits", len(configs) - len(missing))
+            tracer.count("result_cache.misses", len(missing))
+            if missing:
+                for i, m in zip(missing, compute([configs[i] for i in missing])):
+                    self.result_cache.put(keys[i], m)
+                    metrics[i] = m
+            return metrics
+
+    @property
+    def _sparse_options(self) -> Dict:
+        """Cache-key options of evaluations on stored paths (streaming always scans every step)"""
+        return {"sparse": True} if self.sparse else {}
+
+    def get_paths(self, market_scenario: str, num_paths: int = 1000, seed=None,
+                  horizon_years: Optional[float] = None) -> Dict:
+        """Simulated paths for a scenario, served from the path store when one is attached"""
+        scenario_params = self.market_scenarios[market_scenario]
+        horizon_years = self.horizon_years if horizon_years is None else horizon_years
+        if self.path_store is not None:
+            return self.path_store.get(market_scenario, scenario_params, num_paths, horizon_years, seed)
+        return self.simulator.simulate(scenario_params, num_paths, horizon_years, seed)
+
+    def evaluate(self, config: Dict, market_scenario: str, num_paths: int = 1000, seed=None) -> Dict:
+        """Evaluate a strategy configuration and return its performance metrics"""
+        return self._cached([config], market_scenario, num_paths, seed, lambda batch: evaluate_paths_batch(
+            batch, self.market_scenarios[market_scenario], self.get_paths(market_scenario, num_paths, seed),
+            control_variate=self.control_variate, sparse=self.sparse), **self._sparse_options)[0]
+
+    def evaluate_paths(self, config: Dict, scenario_params: Dict, paths: Dict) -> Dict:
+        """Evaluate a strategy configuration on already simulated paths"""
+        return evaluate_paths_batch([config], scenario_params, paths, control_variate=self.control_variate,
+                                    sparse=self.sparse)[0]
+
+    def evaluate_batch(self, configs: List[Dict], market_scenario: str, num_paths: int = 1000,
+                       seed=None) -> pd.DataFrame:
+        """
+        Score K configs on one shared path set in a single batched pass.
+        Returns a table of metrics and their standard errors, one row per config, in input order.
+        """
+        metrics = self._cached(configs, market_scenario, num_paths, seed, lambda batch: evaluate_paths_batch(
+            batch, self.market_scenarios[market_scenario], self.get_paths(market_scenario, num_paths, seed),
+            control_variate=self.control_variate, sparse=self.sparse), **self._sparse_options)
+        return pd.DataFrame(metrics, columns=METRIC_NAMES + STANDARD_ERROR_NAMES)
+
+    def evaluate_streaming(self, configs: Union[Dict, List[Dict]], market_scenario: str, num_paths: int = 1000,
+                           seed=None, chunk_steps: int = TRADING_DAYS_PER_MONTH,
+                           path_block: Optional[int] = None) -> Union[Dict, pd.DataFrame]:
+        """
+        Score one config (returns its metrics dict) or a list of configs (returns a
+        metrics table) while simulating the paths `chunk_steps` steps at a time.
+
+        Full paths are never stored, so memory is O(configs x paths) for any
+        horizon, which lets path counts grow into the millions. Streamed paths
+        are always scanned step by step and the path store is bypassed. Results
+        are identical to the dense `evaluate` / `evaluate_batch` (`sparse=False`)
+        for the same seed, and shared with their cache entries; the sparse scan
+        agrees with them up to floating-point rounding.
+
+        With `path_block`, paths are simulated in independent blocks of that many
+        paths (block b seeded from spawn key b of `seed`) whose mergeable
+        `MetricsAccumulator`s are combined, so memory is O(configs x path_block).
+        """
+        batch = configs if isinstance(configs, list) else [configs]
+        # Unblocked streaming reproduces `evaluate` exactly, so it shares its cache entries
+        options = {} if path_block is None else {"path_block": path_block}
+        metrics = self._cached(batch, market_scenario, num_paths, seed, lambda missing: self._stream(
+            missing, market_scenario, num_paths, seed, chunk_steps, path_block).metrics(), **options)
+        if isinstance(configs, list):
+            return pd.DataFrame(metrics, columns=METRIC_NAMES + STANDARD_ERROR_NAMES)
+        return metrics[0]
+
+    def _stream(self, configs: List[Dict], market_scenario: str, num_paths: int, seed, chunk_steps: int,
+                path_block: Optional[int]) -> "MetricsAccumulator":
+        if path_block is None:
+            return self.accumulate_streaming(configs, market_scenario, num_paths, seed, chunk_steps)
+        seed = seed if isinstance(seed, (np.random.SeedSequence, np.random.Generator)) \
+            else np.random.SeedSequence(seed)
+        accumulator = None
+        for b, first in enumerate(range(0, num_paths, path_block)):
+            block_seed = seed if isinstance(seed, np.random.Generator) else \
+                np.random.SeedSequence(seed.entropy, spawn_key=tuple(seed.spawn_key) + (b,))
+            part = self.accumulate_streaming(configs, market_scenario, min(path_block, num_paths - first),
+                                             block_seed, chunk_steps)
+            accumulator = part if accumulator is None else accumulator.merge(part)
+        return accumulator
+
+    def evaluate_regimes(self, configs: List[Dict], num_paths: int = 1000, seed=None,
+                         scenarios: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Metrics of every config in every regime ({scenario: [metrics per config]},
+        all `market_scenarios` by default), scored in one scan over the regimes'
+        stacked paths. `seed` is shared by all regimes (the path store then
+        simulates them in one batch where the engine supports it) or a {scenario:
+        seed} dict. Results and cache entries are the same as `evaluate_batch`
+        per scenario.
+        """
+        scenarios = scenarios or list(self.market_scenarios)
+        seeds = seed if isinstance(seed, dict) else {scenario: seed for scenario in scenarios}
+        if self.path_store is not None and not isinstance(seed, dict):
+            self.path_store.prefetch({scenario: self.market_scenarios[scenario] for scenario in scenarios},
+                                     num_paths, self.horizon_years, seed)
+        computed: Dict[int, Dict[str, Dict]] = {}  # id(config) -> {scenario: metrics}
+
+        def compute(scenario: str) -> Callable[[List[Dict]], List[Dict]]:
+            def run(missing: List[Dict]) -> List[Dict]:
+                batch = [config for config in missing if id(config) not in computed]
+                if batch:
+                    regime_metrics = evaluate_regimes_batch(
+                        batch, [self.market_scenarios[s] for s in scenarios],
+                        [self.get_paths(s, num_paths, seeds[s]) for s in scenarios],
+                        control_variate=self.control_variate, sparse=self.sparse)
+                    for k, config in enumerate(batch):
+                        computed[id(config)] = {s: regime_metrics[r][k] for r, s in enumerate(scenarios)}
+                return [computed[id(config)][scenario] for config in missing]
+            return run
+
+        return {scenario: self._cached(configs, scenario, num_paths, seeds[scenario], compute(scenario),
+                                       **self._sparse_options)
+                for scenario in scenarios}
+
+    def accumulate_streaming(self, configs: List[Dict], market_scenario: str, num_paths: int = 1000,
+                             seed=None, chunk_steps: int = TRADING_DAYS_PER_MONTH) -> "MetricsAccumulator":
+        """Mergeable metric state of one streamed path set, e.g. for one worker's share of the paths"""
+        scenario_params = self.market_scenarios[market_scenario]
+        n_steps = horizon_steps(self.horizon_years, self.simulator.steps_per_year)
+        scan = PortfolioScan(configs, scenario_params, num_paths, n_steps, self.simulator.steps_per_year)
+        with tracer.span("evaluate.stream", num_paths=num_paths, chunk_steps=chunk_steps):
+            for block in self.simulator.simulate_chunks(scenario_params, num_paths, self.horizon_years, seed,
+                                                        chunk_steps):
+                scan.update(block['equity'], block['bond'], block['equity_log_returns'])
+            expectations = self.simulator.leg_expectations(scenario_params, n_steps) if self.control_variate else None
+            return scan.accumulator(self.horizon_years, expectations, self.simulator.replicates,
+                                    self.simulator.replicate_unit)
+
+
+def evaluate_paths_batch(configs: List[Dict], scenario_params: Dict, paths: Dict,
+                         chunk_steps: int = TRADING_DAYS_PER_YEAR, control_variate: bool = False,
+                         sparse: bool = False) -> List[Dict]:
+    """
+    Evaluate K strategy configs on the same paths in one batched pass.
+
+    The stored paths are fed through the same time-major scan used for
+    streaming evaluation, `chunk_steps` steps at a time, so results are
+    identical to `StrategyEvaluator.evaluate_streaming` on the same seed.
+    With `sparse`, `SparsePortfolioScan` only rebalances on each config's
+    rebalance dates instead (same metrics up to rounding). Control variates need the paths' `leg_expectations`.
+    """
+    if control_variate and "leg_expectations" not in paths:
+        raise ValueError("Control variates need paths with 'leg_expectations' (from GBMPathSimulator.simulate)")
+    num_paths, n_steps = paths['equity'].shape
+    steps_per_year = int(round(1 / paths['dt']))
+    if sparse:
+        scan = SparsePortfolioScan(configs, scenario_params, num_paths, n_steps, steps_per_year)
+        with tracer.span("scan.transpose"):
+            rows = [np.ascontiguousarray(paths[field].T) for field in ('equity', 'bond', 'equity_log_returns')]
+        scan.run(*rows)
+    else:
+        scan = PortfolioScan(configs, scenario_params, num_paths, n_steps, steps_per_year)
+        for t0 in range(0, n_steps, chunk_steps):
+            block = slice(t0, t0 + chunk_steps)
+            with tracer.span("scan.transpose"):
+                rows = [np.ascontiguousarray(paths[field][:, block].T)
+                        for field in ('equity', 'bond', 'equity_log_returns')]
+            scan.update(*rows)
+    return scan.metrics(paths['horizon_years'], paths['leg_expectations'] if control_variate else None,
+                        paths.get('replicates', DEFAULT_REPLICATES), paths.get('replicate_unit', 1))
+
+
+def evaluate_regimes_batch(configs: List[Dict], regime_params: List[Dict], regime_paths: List[Dict],
+                           chunk_steps: int = TRADING_DAYS_PER_YEAR, control_variate: bool = False,
+                           sparse: bool = False) -> List[List[Dict]]:
+    """
+    Evaluate K strategy configs on several regimes' paths in one pass.
+
+    The regimes' paths are stacked along the path axis of a single scan, so
+    each rebalance computes realized vols and target weights for every regime
+    in one call. Returns metrics per regime, then per config, equal to
+    `evaluate_paths_batch` on each regime's paths alone (`sparse` as there).
+    All regimes need the same horizon and time step.
+    """
+    if len({paths['equity'].shape[1] for paths in regime_paths}) > 1 or \
+            len({paths['dt'] for paths in regime_paths}) > 1:
+        raise ValueError("Regime paths must share the horizon and time step")
+    if control_variate and any("leg_expectations" not in paths for paths in regime_paths):
+        raise ValueError("Control variates need paths with 'leg_expectations' (from GBMPathSimulator.simulate)")
+    sizes = [paths['equity'].shape[0] for paths in regime_paths]
+    edges = np.concatenate([[0], np.cumsum(sizes)])
+    n_steps = regime_paths[0]['equity'].shape[1]
+    initial_vols = np.repeat([params['equity_vol'] for params in regime_params], sizes)
+    steps_per_year = int(round(1 / regime_paths[0]['dt']))
+    if sparse:
+        scan = SparsePortfolioScan(configs, {"equity_vol": initial_vols}, int(edges[-1]), n_steps, steps_per_year)
+        with tracer.span("scan.transpose"):
+            rows = [np.ascontiguousarray(np.concatenate([paths[field] for paths in regime_paths]).T)
+                    for field in ('equity', 'bond', 'equity_log_returns')]
+        scan.run(*rows)
+    else:
+        scan = PortfolioScan(configs, {"equity_vol": initial_vols}, int(edges[-1]), n_steps, steps_per_year)
+        for t0 in range(0, n_steps, chunk_steps):
+            block = slice(t0, t0 + chunk_steps)
+            with tracer.span("scan.transpose"):
+                rows = [np.ascontiguousarray(np.concatenate([paths[field][:, block] for paths in regime_paths]).T)
+                        for field in ('equity', 'bond', 'equity_log_returns')]
+            scan.update(*rows)
+    return [
+        scan.metrics(paths['horizon_years'], paths['leg_expectations'] if control_variate else None,
+                     paths.get('replicates', DEFAULT_REPLICATES), paths.get('replicate_unit', 1),
+                     columns=slice(int(edges[r]), int(edges[r + 1])))
+        for r, paths in enumerate(regime_paths)
+    ]
+
+
+class PortfolioScan:
+    """
+    Running state of K strategy configs over N paths, advanced one time-major
+    block of steps at a time.
+
+    Memory is O(configs x paths) regardless of the horizon: current and previous
+    portfolio value, running peak and worst drawdown ratio, current weights and
+    running weight moments per config and path, plus per-path cumulative sums of
+    log returns snapshotted where a lookback window starts (month ends for
+    monthly and quarterly configs) for realized vol (`window_realized_vol`,
+    whose window ends with the rebalance step's return) and the first and latest
+    values of the equity and bond legs. Only the snapshots inside the longest
+    lookback window are kept.
+
+    Each config rebalances every `rebalance_interval(config)` steps once its
+    lookback is filled; the scan steps through the union of those dates.
+
+    The paths may stack several regimes (`scenario_params['equity_vol']` then
+    holds each path's scenario vol); `accumulator(columns=...)` scores one
+    regime's slice of the paths.
+    """
+
+    def __init__(self, configs: List[Dict], scenario_params: Dict, num_paths: int, n_steps: int,
+                 steps_per_year: int = TRADING_DAYS_PER_YEAR):
+        self.configs = configs
+        self.num_paths = num_paths
+        self.n_steps = n_steps
+        self.steps_per_year = steps_per_year
+        self.t = 0
+
+        # Union of the configs' rebalance dates; each config only acts once its lookback is filled
+        self.lookbacks = np.array([c['vol_lookback_months'] for c in configs]) * TRADING_DAYS_PER_MONTH
+        self.intervals = np.array([rebalance_interval(c) for c in configs])
+        self.unique_lookbacks, self.lookback_index = np.unique(self.lookbacks, return_inverse=True)
+        config_dates = [rebalance_dates(n_steps, int(lookback), int(interval))
+                        for lookback, interval in zip(self.lookbacks, self.intervals)]
+        self.dates = set(int(t) for dates in config_dates for t in dates)
+        self.snapshot_dates = set(int(t) for dates, lookback in zip(config_dates, self.lookbacks)
+                                  for t in dates - lookback)
+        self.cost_rates = np.array([c['transaction_cost_bps'] for c in configs])[:, None] / 10000
+
+        # Initial weight from the scenario vol (one per path when regimes are stacked), held until the first rebalance
+        initial_vols, vol_index = np.unique(np.broadcast_to(scenario_params['equity_vol'], (num_paths,)),
+                                            return_inverse=True)
+        initial = calculate_equity_weights_batch(configs, np.tile(initial_vols, (len(configs), 1)))
+        self.weights = initial[:, vol_index]
+        self.weight_sum = np.zeros((len(configs), num_paths))
+        self.weight_sq_sum = np.zeros((len(configs), num_paths))
+        self.last_rebalance = 0
+
+        # Cumulative sums of log returns and their squares, snapshotted at month ends
+        self.log_return_sum = np.zeros(num_paths)
+        self.log_return_sq_sum = np.zeros(num_paths)
+        self.snapshots: Dict[int, tuple] = {}
+
+        self.initial_values = None
+        self.previous = None
+
+    @tracer.traced("scan.update")
+    def update(self, equity_rows: np.ndarray, bond_rows: np.ndarray, log_return_rows: np.ndarray) -> None:
+        """Advance the scan over a (steps, num_paths) block of consecutive time steps"""
+        spread_rows = equity_rows - bond_rows
+        start = 0
+        if self.t == 0:
+            self.previous = bond_rows[0] + self.weights * spread_rows[0]
+            self.initial_values = self.previous.copy()
+            self.running_peak = self.previous.copy()
+            self.worst_ratio = np.ones_like(self.previous)
+            self._current = np.empty_like(self.previous)
+            self._ratio = np.empty_like(self.previous)
+            self.snapshots[0] = (self.log_return_sum.copy(), self.log_return_sq_sum.copy())
+            self.legs_initial = np.stack([equity_rows[0], bond_rows[0]])
+            self.t = start = 1
+
+        previous, current, ratio = self.previous, self._current, self._ratio
+        for j in range(start, len(equity_rows)):
+            t = self.t
+            returns = log_return_rows[j]
+            self.log_return_sum += returns
+            self.log_return_sq_sum += returns * returns
+
+            rebalance = t in self.dates
+            if t in self.snapshot_dates:
+                self._snapshot(t)
+            if rebalance:
+                # Rebalance: transaction cost on the weight change, charged against the previous day's value
+                new_weights = self._target_weights(t)
+                cost = np.abs(new_weights - self.weights) * self.cost_rates * previous
+                self._accumulate_weights(t)
+                self.weights = new_weights
+            np.multiply(self.weights, spread_rows[j], out=current)
+            current += bond_rows[j]
+            if rebalance:
+                current -= cost
+            np.maximum(self.running_peak, current, out=self.running_peak)
+            np.divide(current, self.running_peak, out=ratio)
+            np.minimum(self.worst_ratio, ratio, out=self.worst_ratio)
+            previous, current = current, previous
+            self.t += 1
+
+        self.previous, self._current = previous, current
+        self.legs_latest = np.stack([equity_rows[-1], bond_rows[-1]])
+
+    def _snapshot(self, t: int) -> None:
+        self.snapshots[t] = (self.log_return_sum.copy(), self.log_return_sq_sum.copy())
+        for old in [s for s in self.snapshots if s < t - self.unique_lookbacks.max()]:
+            del self.snapshots[old]
+
+    @tracer.traced("scan.rebalance")
+    def _target_weights(self, t: int) -> np.ndarray:
+        """
+        New weights at rebalance date t for the configs due then; the others, and
+        configs whose lookback is not yet filled, keep theirs
+        """
+        active = (self.lookbacks <= t) & (t % self.intervals == 0)
+        vols = np.full((len(self.unique_lookbacks), self.num_paths), np.nan)
+        for u in np.unique(self.lookback_index[active]):
+            lookback = self.unique_lookbacks[u]
+            start_sum, start_sq_sum = self.snapshots[t - lookback]
+            vols[u] = window_realized_vol(self.log_return_sum - start_sum, self.log_return_sq_sum - start_sq_sum,
+                                          lookback, self.steps_per_year)
+
+        new_weights = self.weights.copy()
+        if active.any():
+            configs = [c for c, a in zip(self.configs, active) if a]
+            new_weights[active] = calculate_equity_weights_batch(configs, vols[self.lookback_index[active]])
+        return new_weights
+
+    def _accumulate_weights(self, t: int) -> None:
+        """Add the weight segment ending at t to the running weight moments"""
+        length = t - self.last_rebalance
+        self.weight_sum += self.weights * length
+        self.weight_sq_sum += self.weights ** 2 * length
+        self.last_rebalance = t
+
+    @tracer.traced("scan.accumulate")
+    def accumulator(self, horizon_years: float, leg_expectations: Optional[Dict[str, np.ndarray]] = None,
+                    replicates: int = DEFAULT_REPLICATES, replicate_unit: int = 1,
+                    columns: slice = slice(None)) -> "MetricsAccumulator":
+        """
+        Mergeable metric state of the paths in `columns` once all n_steps have been
+        consumed; with `leg_expectations` (see `GBMPathSimulator.leg_expectations`)
+        the means use the equity and bond legs as control variates
+        """
+        if self.t != self.n_steps:
+            raise ValueError(f"Scan consumed {self.t} of {self.n_steps} steps")
+        # Close the last weight segment
+        length = self.n_steps - self.last_rebalance
+        weights = self.weights[:, columns]
+        weight_sum = self.weight_sum[:, columns] + weights * length
+        weight_sq_sum = self.weight_sq_sum[:, columns] + weights ** 2 * length
+        controls = None
+        if leg_expectations is not None:
+            final = self.n_steps - 1
+            controls = (self.legs_latest[:, columns] / self.legs_initial[:, columns],
+                        np.array([leg_expectations["equity_log"][final], leg_expectations["bond_log"][final]]),
+                        np.array([leg_expectations["equity_growth"][final], leg_expectations["bond_growth"][final]]))
+        return MetricsAccumulator(self.initial_values[:, columns], self.previous[:, columns],
+                                  self.worst_ratio[:, columns], weight_sum, weight_sq_sum, self.n_steps,
+                                  horizon_years, controls=controls, replicates=replicates,
+                                  replicate_unit=replicate_unit)
+
+    def metrics(self, horizon_years: float, leg_expectations: Optional[Dict[str, np.ndarray]] = None,
+                replicates: int = DEFAULT_REPLICATES, replicate_unit: int = 1,
+                columns: slice = slice(None)) -> List[Dict]:
+        """Metrics dicts per config (of the paths in `columns`) once all n_steps have been consumed"""
+        return self.accumulator(horizon_years, leg_expectations, replicates, replicate_unit, columns).metrics()
+
+
+class SparsePortfolioScan(PortfolioScan):
+    """
+    Rebalance-date-sparse scan of K configs over full, time-major path arrays.
+
+    Between two rebalance dates a config holds its weights, so its value on any
+    day is `bond + weight * (equity - bond)` of that day's legs. Configs are
+    grouped by rebalancing interval and each group only visits its own
+    rebalance dates: realized vols (from prefix sums of log returns), new
+    weights, turnover costs and weight moments are computed there, so final
+    values, costs and weights are those of `PortfolioScan`. Drawdown still
+    follows the held value on every day of each holding period (a few in-place
+    array operations per day), so it is the daily drawdown exactly.
+    """
+
+    @tracer.traced("scan.sparse")
+    def run(self, equity_rows: np.ndarray, bond_rows: np.ndarray, log_return_rows: np.ndarray) -> None:
+        """Score the configs on (n_steps, num_paths) arrays holding the whole horizon"""
+        if equity_rows.shape != (self.n_steps, self.num_paths):
+            raise ValueError(f"Sparse scan needs all {self.n_steps} steps of {self.num_paths} paths, "
+                             f"got {equity_rows.shape}")
+        spread_rows = equity_rows - bond_rows
+        # Cumulative sums of log returns and their squares up to and including each step
+        sums = np.zeros_like(log_return_rows)
+        sq_sums = np.zeros_like(log_return_rows)
+        np.cumsum(log_return_rows[1:], axis=0, out=sums[1:])
+        np.cumsum(log_return_rows[1:] * log_return_rows[1:], axis=0, out=sq_sums[1:])
+
+        self.initial_values = bond_rows[0] + self.weights * spread_rows[0]
+        self.running_peak = self.initial_values.copy()
+        self.worst_ratio = np.ones_like(self.initial_values)
+        self.previous = np.empty_like(self.initial_values)
+        self.legs_initial = np.stack([equity_rows[0], bond_rows[0]])
+        self.legs_latest = np.stack([equity_rows[-1], bond_rows[-1]])
+        for interval in np.unique(self.intervals):
+            self._run_group(np.flatnonzero(self.intervals == interval), int(interval), bond_rows, spread_rows,
+                            sums, sq_sums)
+        # Weight segments are closed through the horizon
+        self.t = self.last_rebalance = self.n_steps
+
+    def _run_group(self, group: np.ndarray, interval: int, bond_rows: np.ndarray, spread_rows: np.ndarray,
+                   sums: np.ndarray, sq_sums: np.ndarray) -> None:
+        configs = [self.configs[k] for k in group]
+        lookbacks = self.lookbacks[group]
+        cost_rates = self.cost_rates[group]
+        weights = self.weights[group]
+        weight_sum = np.zeros_like(weights)
+        weight_sq_sum = np.zeros_like(weights)
+        peak = self.running_peak[group]
+        worst = self.worst_ratio[group]
+        value = self.initial_values[group]
+        dates = np.arange(interval, self.n_steps, interval)
+        held = np.empty_like(weights)
+        last_date = last_rebalance = 0
+
+        def monitor(current: np.ndarray) -> None:
+            np.maximum(peak, current, out=peak)
+            np.minimum(worst, current / peak, out=worst)
+
+        def hold(start: int, end: int) -> None:
+            """Track drawdown of the held weights on every day strictly between `start` and `end`"""
+            # In place, day by day: a (days, configs, paths) block with np.maximum.accumulate
+            # along time gives the same values but measured 2-5x slower at every batch size
+            for day in range(start + 1, end):
+                np.multiply(weights, spread_rows[day], out=held)
+                np.add(held, bond_rows[day], out=held)
+                np.maximum(peak, held, out=peak)
+                np.divide(held, peak, out=held)
+                np.minimum(worst, held, out=worst)
+
+        for t in dates:
+            hold(last_date, t)
+            active = lookbacks <= t
+            if active.any():
+                previous = value if t - 1 == last_date else weights * spread_rows[t - 1] + bond_rows[t - 1]
+                new_weights = weights.copy()
+                new_weights[active] = calculate_equity_weights_batch(
+                    [c for c, a in zip(configs, active) if a],
+                    self._realized_vols(t, lookbacks[active], sums, sq_sums))
+                cost = np.abs(new_weights - weights) * cost_rates * previous
+                weight_sum += weights * (t - last_rebalance)
+                weight_sq_sum += weights ** 2 * (t - last_rebalance)
+                weights, last_rebalance = new_weights, t
+                value = weights * spread_rows[t] + bond_rows[t] - cost
+            else:
+                value = weights * spread_rows[t] + bond_rows[t]
+            monitor(value)
+            last_date = t
+        if last_date != self.n_steps - 1:
+            hold(last_date, self.n_steps - 1)
+            value = weights * spread_rows[-1] + bond_rows[-1]
+            monitor(value)
+
+        self.previous[group] = value
+        self.running_peak[group] = peak
+        self.worst_ratio[group] = worst
+        self.weights[group] = weights
+        self.weight_sum[group] = weight_sum + weights * (self.n_steps - last_rebalance)
+        self.weight_sq_sum[group] = weight_sq_sum + weights ** 2 * (self.n_steps - last_rebalance)
+
+    def _realized_vols(self, t: int, lookbacks: np.ndarray, sums: np.ndarray, sq_sums: np.ndarray) -> np.ndarray:
+        """Realized vol per lookback (rows) and path over the returns into steps t - lookback + 1 .. t"""
+        unique, index = np.unique(lookbacks, return_inverse=True)
+        vols = np.empty((len(unique), self.num_paths))
+        for u, lookback in enumerate(unique):
+            vols[u] = window_realized_vol(sums[t] - sums[t - lookback], sq_sums[t] - sq_sums[t - lookback],
+                                          lookback, self.steps_per_year)
+        return vols[index]
+
+
+def control_variate_adjust(targets: np.ndarray, controls: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """
+    Per-path control-variate estimates: `targets` (configs, paths) minus their
+    least-squares fit on `controls` (controls, paths) at the controls' deviation
+    from their known means `expected`. The mean of the result estimates the
+    target mean with the controls' sampling error removed.
+    """
+    centered = controls - controls.mean(axis=1, keepdims=True)
+    beta = (targets - targets.mean(axis=1, keepdims=True)) @ centered.T @ np.linalg.pinv(centered @ centered.T)
+    return targets - beta @ (controls - expected[:, None])
+
+
+def _sample_metrics(returns: np.ndarray, return_estimates: np.ndarray, final_values: np.ndarray,
+                    final_value_estimates: np.ndarray, worst_ratio: np.ndarray, weight_sum: np.ndarray,
+                    weight_sq_sum: np.ndarray, n_steps: int) -> np.ndarray:
+    """(configs, metrics) array in METRIC_NAMES order for one sample of paths (columns)"""
+    return_mean = return_estimates.mean(axis=1)
+    return_std = returns.std(axis=1)
+    var = np.quantile(final_values, 0.05, axis=1)
+    in_tail = final_values <= var[:, None]
+    weight_count = final_values.shape[1] * n_steps
+    weight_mean = weight_sum.sum(axis=1) / weight_count
+    return np.stack([
+        return_mean,
+        return_std,
+        np.divide(return_mean, return_std, out=np.zeros_like(return_mean), where=return_std > 0),
+        worst_ratio.min(axis=1) - 1.0,
+        final_value_estimates.mean(axis=1),
+        final_values.std(axis=1),
+        var,
+        (final_values * in_tail).sum(axis=1) / in_tail.sum(axis=1),
+        weight_mean,
+        np.sqrt(np.maximum(weight_sq_sum.sum(axis=1) / weight_count - weight_mean ** 2, 0.0))
+    ], axis=1)
+
+
+class MetricsAccumulator:
+    """
+    Per-config metric state of one set of paths that merges with the state of
+    disjoint path sets (other chunks, workers or partitions) of the same scenario.
+
+    Return moments and weight sums merge exactly, drawdowns by minimum, and
+    final values are held in `TailSketch`es, so VaR / CVaR of the combined
+    paths are exact while their lower tail fits the sketch buffer.
+
+    Paths are split into `replicates` independent groups (unit i of
+    `replicate_unit` paths goes to group i % replicates) and every metric is
+    also kept per group; merging pools the groups, and their spread gives the
+    standard errors. `controls` = (leg growth factors (2, paths), expected leg
+    log growth (2,), expected leg growth (2,)) switches the mean return and
+    mean final value to control-variate estimates.
+    """
+
+    def __init__(self, initial_values: np.ndarray, final_values: np.ndarray, worst_ratio: np.ndarray,
+                 weight_sum: np.ndarray, weight_sq_sum: np.ndarray, n_steps: int, horizon_years: float,
+                 sketch_capacity: int = 16384, controls: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+                 replicates: int = DEFAULT_REPLICATES, replicate_unit: int = 1):
+        returns = np.log(final_values / initial_values) / horizon_years  # Annualized
+        return_estimates, final_value_estimates = returns, final_values
+        if controls is not None:
+            growth, expected_log, expected_growth = controls
+            return_estimates = control_variate_adjust(returns, np.log(growth) / horizon_years,
+                                                      expected_log / horizon_years)
+            final_value_estimates = control_variate_adjust(final_values, growth, expected_growth)
+        self.num_paths = final_values.shape[1]
+        self.return_mean = returns.mean(axis=1)
+        self.return_m2 = ((returns - self.return_mean[:, None]) ** 2).sum(axis=1)
+        self.control_return_mean = return_estimates.mean(axis=1) if controls is not None else None
+        self.control_final_value_mean = final_value_estimates.mean(axis=1) if controls is not None else None
+        self.max_drawdown = worst_ratio.min(axis=1) - 1.0
+        self.weight_sum = weight_sum.sum(axis=1)
+        self.weight_sq_sum = weight_sq_sum.sum(axis=1)
+        self.weight_count = self.num_paths * n_steps
+        self.final_values = [TailSketch.from_values(values, sketch_capacity) for values in final_values]
+
+        labels = (np.arange(self.num_paths) // replicate_unit) % replicates
+        groups = [np.flatnonzero(labels == r) for r in range(replicates)]
+        groups = [columns for columns in groups if len(columns)]
+        self.replicate_sizes = np.array([len(columns) for columns in groups])
+        self.replicate_metrics = np.stack([
+            _sample_metrics(returns[:, columns], return_estimates[:, columns], final_values[:, columns],
+                            final_value_estimates[:, columns], worst_ratio[:, columns], weight_sum[:, columns],
+                            weight_sq_sum[:, columns], n_steps)
+            for columns in groups
+        ])  # replicates x configs x metrics
+
+    def merge(self, other: "MetricsAccumulator") -> "MetricsAccumulator":
+        """Merge the state of a disjoint path set (in place) and return self"""
+        num_paths = self.num_paths + other.num_paths
+        delta = other.return_mean - self.return_mean
+        self.return_m2 = self.return_m2 + other.return_m2 + delta ** 2 * self.num_paths * other.num_paths / num_paths
+        self.return_mean = self.return_mean + delta * other.num_paths / num_paths
+        if self.control_return_mean is not None and other.control_return_mean is not None:
+            share = other.num_paths / num_paths
+            self.control_return_mean = (1 - share) * self.control_return_mean + share * other.control_return_mean
+            self.control_final_value_mean = ((1 - share) * self.control_final_value_mean
+                                             + share * other.control_final_value_mean)
+        else:
+            self.control_return_mean = self.control_final_value_mean = None
+        self.num_paths = num_paths
+        self.max_drawdown = np.minimum(self.max_drawdown, other.max_drawdown)
+        self.weight_sum = self.weight_sum + other.weight_sum
+        self.weight_sq_sum = self.weight_sq_sum + other.weight_sq_sum
+        self.weight_count += other.weight_count
+        for sketch, other_sketch in zip(self.final_values, other.final_values):
+            sketch.merge(other_sketch)
+        self.replicate_sizes = np.concatenate([self.replicate_sizes, other.replicate_sizes])
+        self.replicate_metrics = np.concatenate([self.replicate_metrics, other.replicate_metrics])
+        return self
+
+    def standard_errors(self) -> np.ndarray:
+        """(configs, metrics) standard errors from the size-weighted spread across replicates (NaN below two)"""
+        count = len(self.replicate_sizes)
+        if count < 2:
+            return np.full(self.replicate_metrics.shape[1:], np.nan)
+        weights = self.replicate_sizes / self.replicate_sizes.sum()
+        center = np.tensordot(weights, self.replicate_metrics, axes=1)
+        spread = np.tensordot(weights ** 2, (self.replicate_metrics - center) ** 2, axes=1)
+        return np.sqrt(count / (count - 1) * spread)
+
+    @tracer.traced("metrics")
+    def metrics(self) -> List[Dict]:
+        """Metrics dicts (with `<metric>_se` standard errors), one per config"""
+        return_means = self.return_mean if self.control_return_mean is None else self.control_return_mean
+        return_stds = np.sqrt(self.return_m2 / self.num_paths)
+        weight_means = self.weight_sum / self.weight_count
+        weight_stds = np.sqrt(np.maximum(self.weight_sq_sum / self.weight_count - weight_means ** 2, 0.0))
+        standard_errors = self.standard_errors()
+        results = []
+        for k, sketch in enumerate(self.final_values):
+            metrics = {
+                "mean_return": float(return_means[k]),
+                "volatility": float(return_stds[k]),
+                "sharpe_ratio": float(return_means[k] / return_stds[k]) if return_stds[k] > 0 else 0,
+                "max_drawdown": float(self.max_drawdown[k]),
+                "final_value_mean": sketch.mean if self.control_final_value_mean is None
+                else float(self.control_final_value_mean[k]),
+                "final_value_std": sketch.std,
+                "var_95": sketch.var(0.05),
+                "cvar_95": sketch.cvar(0.05),
+                "avg_equity_weight": float(weight_means[k]),
+                "equity_weight_volatility": float(weight_stds[k])
+            }
+            metrics.update(zip(STANDARD_ERROR_NAMES, standard_errors[k].tolist()))
+            results.append(metrics)
+        return results
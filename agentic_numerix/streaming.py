@@ -0,0 +1,170 @@
+"""
+Streaming Bedrock completions with time-to-first-token and latency reporting.
+
+`ResponseStream` wraps `invoke_model_with_response_stream` for the Anthropic
+messages API and yields text deltas as they arrive: iterate it directly, or
+with `async for` from asyncio code (the blocking event stream is read on a
+worker thread). An optional `on_text` callback sees every chunk too, which is
+how the executive summary is printed incrementally and how a status channel
+(e.g. a WebSocket `post_to_connection`) can forward it. Once the stream is
+exhausted, `stats()` reports time to first token, total latency, chunk count
+and token usage. `FakeBedrockClient` replays a fixed text with configurable
+delays, for local runs without Bedrock.
+"""
+
+import asyncio
+import contextvars
+import json
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from .instrumentation import tracer
+
+_DONE = object()
+
+
+class ResponseStream:
+    """Text deltas of one streamed model response, with timing and usage"""
+
+    def __init__(self, client, model_id: str, body: Dict, on_text: Optional[Callable[[str], None]] = None):
+        self.client = client
+        self.model_id = model_id
+        self.body = body
+        self.on_text = on_text
+        self.chunks: List[str] = []
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.started = None
+        self.first_token_at = None
+        self.finished_at = None
+
+    def _events(self) -> Iterator[Dict]:
+        response = self.client.invoke_model_with_response_stream(modelId=self.model_id, body=json.dumps(self.body))
+        for event in response["body"]:
+            if "chunk" in event:
+                yield json.loads(event["chunk"]["bytes"])
+
+    def __iter__(self) -> Iterator[str]:
+        self.started = time.perf_counter()
+        with tracer.span("bedrock.stream", model_id=self.model_id) as span:
+            for event in self._events():
+                kind = event.get("type")
+                if kind == "message_start":
+                    self.input_tokens = event["message"].get("usage", {}).get("input_tokens", 0)
+                elif kind == "message_delta":
+                    self.output_tokens = event.get("usage", {}).get("output_tokens", self.output_tokens)
+                elif kind == "content_block_delta" and event["delta"].get("type") == "text_delta":
+                    text = event["delta"]["text"]
+                    if self.first_token_at is None:
+                        self.first_token_at = time.perf_counter()
+                        span.set(time_to_first_token=self.first_token_at - self.started)
+                    self.chunks.append(text)
+                    if self.on_text is not None:
+                        self.on_text(text)
+                    yield text
+            self.finished_at = time.perf_counter()
+        tracer.count("bedrock.input_tokens", self.input_tokens)
+        tracer.count("bedrock.output_tokens", self.output_tokens)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        """
+        Async iteration: the blocking stream is consumed on a thread (where `on_text`
+        also runs) and handed over through a queue.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def pump() -> None:
+            try:
+                for text in self:
+                    loop.call_soon_threadsafe(queue.put_nowait, text)
+                loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+            except Exception as error:
+                loop.call_soon_threadsafe(queue.put_nowait, error)
+
+        threading.Thread(target=contextvars.copy_context().run, args=(pump,), daemon=True).start()
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def read(self) -> str:
+        """Consume the whole stream (calling `on_text` per chunk) and return the text"""
+        for _ in self:
+            pass
+        return self.text
+
+    def stats(self) -> Dict:
+        """Time to first token and total latency in seconds, chunk count and token usage"""
+        return {
+            "time_to_first_token_seconds": (self.first_token_at - self.started) if self.first_token_at else None,
+            "latency_seconds": (self.finished_at - self.started) if self.finished_at else None,
+            "chunks": len(self.chunks),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens
+        }
+
+
+class FakeBedrockClient:
+    """
+    Stand-in for a `bedrock-runtime` client: streams `text` in `chunk_chars`
+    pieces after `first_token_delay` seconds, one every `chunk_delay` seconds,
+    as Anthropic messages API events. `invoke_model` returns the whole text
+    after the same total time.
+    """
+
+    def __init__(self, text: str, chunk_chars: int = 40, first_token_delay: float = 0.5,
+                 chunk_delay: float = 0.02):
+        self.text = text
+        self.chunk_chars = chunk_chars
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+
+    def _usage(self, body: str) -> Dict:
+        prompt = "".join(m["content"] for m in json.loads(body)["messages"])
+        return {"input_tokens": (len(prompt) + 3) // 4, "output_tokens": (len(self.text) + 3) // 4}
+
+    def _stream(self, usage: Dict) -> Iterator[Dict]:
+        def event(payload: Dict) -> Dict:
+            return {"chunk": {"bytes": json.dumps(payload).encode()}}
+
+        yield event({"type": "message_start", "message": {"usage": {"input_tokens": usage["input_tokens"]}}})
+        time.sleep(self.first_token_delay)
+        for start in range(0, len(self.text), self.chunk_chars):
+            if start:
+                time.sleep(self.chunk_delay)
+            yield event({"type": "content_block_delta", "index": 0,
+                         "delta": {"type": "text_delta", "text": self.text[start:start + self.chunk_chars]}})
+        yield event({"type": "message_delta", "usage": {"output_tokens": usage["output_tokens"]}})
+        yield event({"type": "message_stop"})
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str) -> Dict:
+        self.calls += 1
+        return {"body": self._stream(self._usage(body)), "contentType": "application/json"}
+
+    def invoke_model(self, modelId: str, body: str) -> Dict:
+        self.calls += 1
+        usage = self._usage(body)
+        for _ in self._stream(usage):
+            pass
+        payload = {"content": [{"type": "text", "text": self.text}], "usage": usage}
+        return {"body": _Body(json.dumps(payload).encode())}
+
+
+class _Body:
+    """Minimal StreamingBody: `read()` returns the payload"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def read(self) -> bytes:
+        return self.data
@@ -0,0 +1,213 @@
+"""
+Mergeable lower-tail statistics for VaR / CVaR.
+
+A `TailSketch` summarizes a sample of values (e.g. final portfolio values of
+one path chunk, one worker or one SageMaker partition) so that sketches can be
+merged and queried for the VaR / CVaR of the combined sample without shipping
+every value to one place. It keeps
+
+* the `capacity` smallest values, exactly - the smallest k values of a union
+  are always among the smallest k of its parts, so the buffer merges exactly;
+* log-spaced bucket counts (DDSketch-style, relative accuracy
+  `relative_accuracy`) of the values pushed out of the buffer, used once the
+  tail no longer fits in it;
+* count, mean and sum of squared deviations (Chan et al. parallel update).
+
+Quantiles use the same linear interpolation as `np.percentile`, so results
+are exact whenever the tail fits the buffer (`is_exact`) and within
+`relative_accuracy` otherwise.
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+class TailSketch:
+    """Mergeable summary of a sample for lower-tail quantiles (VaR) and tail means (CVaR)"""
+
+    def __init__(self, capacity: int = 16384, relative_accuracy: float = 0.001):
+        self.capacity = capacity
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.tail = np.empty(0)  # Sorted smallest values
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zeros = 0
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, capacity: int = 16384, relative_accuracy: float = 0.001) -> "TailSketch":
+        """Sketch of an array of values"""
+        sketch = cls(capacity, relative_accuracy)
+        sketch.add(values)
+        return sketch
+
+    def _bucket_keys(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def _bucket_value(self, key: int) -> float:
+        """Representative magnitude of a bucket, within relative_accuracy of any value in it"""
+        return 2.0 * self.gamma ** key / (self.gamma + 1)
+
+    def _add_overflow(self, values: np.ndarray) -> None:
+        """Bucket values that no longer fit in the tail buffer"""
+        for store, magnitudes in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(magnitudes):
+                keys, counts = np.unique(self._bucket_keys(magnitudes), return_counts=True)
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    store[key] = store.get(key, 0) + count
+        self.zeros += int((values == 0).sum())
+
+    def add(self, values: np.ndarray) -> "TailSketch":
+        """Add a batch of values"""
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return self
+        other = TailSketch(self.capacity, self.relative_accuracy)
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        if len(values) > self.capacity:
+            values = np.partition(values, self.capacity - 1)
+            other._add_overflow(values[self.capacity:])
+            values = values[:self.capacity]
+        other.tail = np.sort(values)
+        return self.merge(other)
+
+    def merge(self, other: "TailSketch") -> "TailSketch":
+        """Merge another sketch into this one (in place) and return self"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative_accuracy")
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.capacity = min(self.capacity, other.capacity)
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, n in other_store.items():
+                store[key] = store.get(key, 0) + n
+        self.zeros += other.zeros
+        tail = np.sort(np.concatenate([self.tail, other.tail]))
+        self._add_overflow(tail[self.capacity:])
+        self.tail = tail[:self.capacity]
+        return self
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation (ddof=0, as np.std)"""
+        return math.sqrt(self.m2 / self.count) if self.count else math.nan
+
+    def _value_at_rank(self, rank: int) -> float:
+        """Value of the `rank`-th smallest element (0-based): exact from the buffer, else from buckets"""
+        if rank < len(self.tail):
+            return float(self.tail[rank])
+        seen = len(self.tail)
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if rank < seen:
+                return -self._bucket_value(key)
+        seen += self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if rank < seen:
+                return self._bucket_value(key)
+        return self.max
+
+    def quantile(self, q: float) -> float:
+        """q-quantile with np.percentile's linear interpolation"""
+        if self.count == 0:
+            return math.nan
+        position = q * (self.count - 1)
+        lower = int(math.floor(position))
+        low = self._value_at_rank(lower)
+        if lower + 1 >= self.count:
+            return low
+        return low + (position - lower) * (self._value_at_rank(lower + 1) - low)
+
+    def var(self, alpha: float = 0.05) -> float:
+        """Value at risk: the alpha-quantile of the values (a level, like `var_95` in the metrics)"""
+        return self.quantile(alpha)
+
+    def cvar(self, alpha: float = 0.05) -> float:
+        """Conditional VaR: mean of the values at or below `var(alpha)`"""
+        threshold = self.var(alpha)
+        if len(self.tail) == self.count or (len(self.tail) and self.tail[-1] > threshold):
+            return float(self.tail[self.tail <= threshold].mean())
+
+        # Tail extends past the buffer: buffered values exactly, the rest from bucket representatives
+        total = float(self.tail.sum())
+        n = len(self.tail)
+        buckets = ([(-self._bucket_value(k), self.negative[k]) for k in sorted(self.negative, reverse=True)] +
+                   [(0.0, self.zeros)] +
+                   [(self._bucket_value(k), self.positive[k]) for k in sorted(self.positive)])
+        for value, bucket_count in buckets:
+            if value > threshold:
+                break
+            total += value * bucket_count
+            n += bucket_count
+        return total / n
+
+    def is_exact(self, alpha: float = 0.05) -> bool:
+        """True when var/cvar at `alpha` are computed from buffered values only"""
+        if len(self.tail) == self.count:
+            return True
+        lower = int(math.floor(alpha * (self.count - 1)))
+        return bool(lower + 1 < len(self.tail) and self.tail[-1] > self.quantile(alpha))
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form, e.g. for a processing job's output file"""
+        return {
+            "capacity": self.capacity,
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+            "tail": self.tail.tolist(),
+            "positive": {str(k): n for k, n in self.positive.items()},
+            "negative": {str(k): n for k, n in self.negative.items()},
+            "zeros": self.zeros
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TailSketch":
+        """Rebuild a sketch written by `to_dict`"""
+        sketch = cls(data['capacity'], data['relative_accuracy'])
+        sketch.count = data['count']
+        sketch.mean = data['mean']
+        sketch.m2 = data['m2']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch.tail = np.asarray(data['tail'], dtype=float)
+        sketch.positive = {int(k): n for k, n in data['positive'].items()}
+        sketch.negative = {int(k): n for k, n in data['negative'].items()}
+        sketch.zeros = data['zeros']
+        return sketch
+
+
+def merge_sketches(sketches: Iterable[TailSketch], capacity: Optional[int] = None) -> TailSketch:
+    """Merge sketches (e.g. from workers or partitions) into a new sketch"""
+    sketches = list(sketches)
+    if not sketches:
+        return TailSketch(capacity or 16384)
+    merged = TailSketch(capacity or sketches[0].capacity, sketches[0].relative_accuracy)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from agentic_numerix import sample_configurations
+
+STRATEGY_HYPERPARAMETERS = {
+    "target_volatility": {"min": 0.05, "max": 0.20, "default": 0.10},
+    "equity_weight_function": {
+        "type": "options",
+        "choices": ["inverse_vol", "inverse_vol_squared", "linear_decay", "sigmoid"]
+    },
+    "vol_lookback_months": {"min": 6, "max": 24, "default": 12},
+    "rebalancing_frequency": {"options": ["daily", "weekly", "monthly", "quarterly"], "default": "monthly"},
+    "equity_weight_bounds": {"min_weight": 0.0, "max_weight": 1.0},
+    "risk_aversion": {"min": 0.5, "max": 5.0, "default": 2.0},
+    "transaction_cost_bps": {"min": 0, "max": 20, "default": 5}
+}
+
+MARKET_SCENARIOS = {
+    "base_case": {"equity_drift": 0.08, "equity_vol": 0.18, "risk_free_rate": 0.03, "correlation_equity_rates": -0.3},
+    "bull_market": {"equity_drift": 0.15, "equity_vol": 0.12, "risk_free_rate": 0.02, "correlation_equity_rates": 0.0},
+    "bear_market": {"equity_drift": -0.05, "equity_vol": 0.35, "risk_free_rate": 0.01,
+                    "correlation_equity_rates": -0.6},
+    "high_volatility": {"equity_drift": 0.05, "equity_vol": 0.40, "risk_free_rate": 0.04,
+                        "correlation_equity_rates": -0.5},
+    "low_volatility": {"equity_drift": 0.07, "equity_vol": 0.08, "risk_free_rate": 0.03,
+                       "correlation_equity_rates": 0.1}
+}
+
+
+@pytest.fixture
+def strategy_params():
+    return STRATEGY_HYPERPARAMETERS
+
+
+@pytest.fixture
+def market_scenarios():
+    return MARKET_SCENARIOS
+
+
+@pytest.fixture
+def configs():
+    """Random configs covering every weight function and rebalancing frequency"""
+    sampled = sample_configurations(STRATEGY_HYPERPARAMETERS, 12, np.random.default_rng(3))
+    functions = STRATEGY_HYPERPARAMETERS["equity_weight_function"]["choices"]
+    frequencies = STRATEGY_HYPERPARAMETERS["rebalancing_frequency"]["options"]
+    for i, config in enumerate(sampled):
+        config["equity_weight_function"] = functions[i % len(functions)]
+        config["rebalancing_frequency"] = frequencies[(i + i // len(functions)) % len(frequencies)]
+    return sampled
@@ -0,0 +1,48 @@
+import pytest
+
+from agentic_numerix import NoImprovementStopping, OptimizationCheckpoint, checkpoint as checkpoint_module
+
+RUN = {"optimizer": "test", "seed": 1}
+
+
+def entry(value):
+    return {"config": {"iteration": value}, "metrics": {"sharpe_ratio": value}}
+
+
+def test_appends_and_loads_units(tmp_path):
+    checkpoint = OptimizationCheckpoint(str(tmp_path / "run.jsonl"), RUN)
+    checkpoint.append([entry(0.1)], {"next": 1})
+    checkpoint.append([entry(0.2), entry(0.3)], {"next": 3})
+    assert checkpoint.latest_state() == {"next": 3}
+    assert [e["metrics"]["sharpe_ratio"] for e in checkpoint.history()] == [0.1, 0.2, 0.3]
+    with pytest.raises(ValueError):
+        OptimizationCheckpoint(checkpoint.path, {"optimizer": "other"}).load()
+
+
+@pytest.mark.parametrize("block", [4, 64 * 1024])
+def test_torn_tail_is_cut_before_the_next_append(tmp_path, monkeypatch, block):
+    monkeypatch.setattr(checkpoint_module, "_TAIL_BLOCK", block)
+    checkpoint = OptimizationCheckpoint(str(tmp_path / "run.jsonl"), RUN)
+    checkpoint.append([entry(0.1)], {"next": 1})
+    with open(checkpoint.path, "a") as f:
+        f.write('{"entries": [{"config": {"iteration": 9')
+    assert checkpoint.latest_state() == {"next": 1}
+    checkpoint.append([entry(0.2)], {"next": 2})
+    assert checkpoint.latest_state() == {"next": 2}
+    assert [e["metrics"]["sharpe_ratio"] for e in checkpoint.history()] == [0.1, 0.2]
+
+
+def test_torn_header_is_rewritten(tmp_path):
+    checkpoint = OptimizationCheckpoint(str(tmp_path / "run.jsonl"), RUN)
+    with open(checkpoint.path, "w") as f:
+        f.write('{"run": {"optim')
+    checkpoint.append([entry(0.1)], {"next": 1})
+    assert checkpoint.latest_state() == {"next": 1}
+
+
+def test_no_improvement_stopping_reports_the_true_best():
+    history = [entry(value) for value in [1.0, 1.001, 1.002, 0.5, 0.9]]
+    assert NoImprovementStopping(patience=5, min_delta=0.01)(history) is None
+    reason = NoImprovementStopping(patience=3, min_delta=0.01)(history)
+    assert reason == ("no sharpe_ratio improvement beyond 0.0100 in 4 evaluations "
+                      "(best 1.0020, last significant best 1.0000)")
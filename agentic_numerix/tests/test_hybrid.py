@@ -0,0 +1,27 @@
+import numpy as np
+
+from agentic_numerix import HestonHybridSimulator, batch_member
+
+FIELDS = ("equity", "bond", "equity_log_returns")
+
+
+def test_single_scenario_batch_matches_simulate(market_scenarios):
+    simulator = HestonHybridSimulator()
+    paths = simulator.simulate(market_scenarios["base_case"], 50, 1, 3)
+    member = batch_member(simulator.simulate_batch({"base_case": market_scenarios["base_case"]}, 50, 1, 3), 0)
+    for field in FIELDS:
+        np.testing.assert_array_equal(member[field], paths[field])
+
+
+def test_scenarios_own_their_arrays(market_scenarios):
+    simulator = HestonHybridSimulator()
+    batch = simulator.simulate_batch(market_scenarios, 50, 1, 3)
+    scenarios = simulator.simulate_scenarios(market_scenarios, 50, 1, 3)
+    assert list(scenarios) == list(market_scenarios)
+    for index, paths in enumerate(scenarios.values()):
+        member = batch_member(batch, index)
+        for field in FIELDS:
+            np.testing.assert_array_equal(paths[field], member[field])
+            assert paths[field].base is None
+        for values in paths["leg_expectations"].values():
+            assert values.base is None
@@ -0,0 +1,47 @@
+from agentic_numerix import EvaluationCache, LLMCache, cached_invoke, normalize_prompt
+
+PROMPT = """
+    Summarize the hedge.
+
+        Keep it short.
+"""
+
+
+def test_llm_cache_shares_a_file_with_evaluations(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    evaluations = EvaluationCache(path)
+    evaluations.put("k1", {"sharpe_ratio": 1.0})
+    responses = LLMCache(path)
+    responses.invoke("model", PROMPT, lambda prompt: "memo")
+    assert evaluations.get("k1") == {"sharpe_ratio": 1.0}
+    assert len(evaluations) == 1
+    assert len(responses) == 1
+    # Reopening either kind purges only its own stale versions
+    assert EvaluationCache(path).get("k1") == {"sharpe_ratio": 1.0}
+    assert LLMCache(path).invoke("model", PROMPT, lambda prompt: "miss") == "memo"
+
+
+def test_cached_invoke_with_cache():
+    cache = LLMCache()
+    calls = []
+
+    def call(prompt):
+        calls.append(prompt)
+        return "memo"
+
+    assert cached_invoke(cache, "model", PROMPT, call, temperature=0.3) == "memo"
+    assert cached_invoke(cache, "model", PROMPT, call, temperature=0.3) == "memo"
+    assert calls == [normalize_prompt(PROMPT)]
+    assert cache.stats()["hits"] == 1
+
+
+def test_cached_invoke_without_cache():
+    calls = []
+
+    def call(prompt):
+        calls.append(prompt)
+        return "memo"
+
+    assert cached_invoke(None, "model", PROMPT, call, temperature=0.3) == "memo"
+    assert cached_invoke(None, "model", PROMPT, call, temperature=0.3) == "memo"
+    assert calls == [normalize_prompt(PROMPT)] * 2
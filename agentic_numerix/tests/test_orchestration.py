@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from agentic_numerix import HEDGING_WORKFLOW, ConcurrentAgentRunner, RateLimitError, StubLLM
+from agentic_numerix.orchestration import build_stage_prompt
+
+AGENTS = [name for stage in HEDGING_WORKFLOW for name in stage]
+
+
+def test_workflow_runs_each_stage_concurrently():
+    llm = StubLLM(default_latency=0.05)
+    result = asyncio.run(ConcurrentAgentRunner(llm, max_concurrency=4).run_workflow("Hedge the book."))
+    assert list(result["outputs"]) == AGENTS
+    assert llm.max_in_flight == len(HEDGING_WORKFLOW[0])
+    assert result["final"] == result["outputs"]["execution_strategy"]
+    assert result["elapsed_seconds"] < result["sequential_seconds"]
+    # The last stage's brief holds the first stage's analyses
+    first_stage = {name: result["outputs"][name] for name in HEDGING_WORKFLOW[0]}
+    assert f"a {len(build_stage_prompt('Hedge the book.', first_stage))}-character brief" in result["final"]
+
+
+def test_concurrency_is_bounded():
+    llm = StubLLM(default_latency=0.02)
+    asyncio.run(ConcurrentAgentRunner(llm, max_concurrency=2).run_workflow("Hedge the book."))
+    assert llm.max_in_flight == 2
+
+
+def test_throttled_calls_are_retried():
+    llm = StubLLM(default_latency=0.01, throttle_first={"currency_specialist": 2, "credit_analyst": 1})
+    runner = ConcurrentAgentRunner(llm, base_delay=0.01, max_delay=0.05, seed=0)
+    result = asyncio.run(runner.run_workflow("Hedge the book."))
+    assert runner.throttles == 3
+    assert result["calls"]["currency_specialist"]["attempts"] == 3
+    assert result["calls"]["credit_analyst"]["attempts"] == 2
+    assert result["calls"]["execution_strategy"]["attempts"] == 1
+    assert len(llm.calls) == len(AGENTS) + 3
+
+
+def test_retries_give_up_after_max_retries():
+    llm = StubLLM(default_latency=0.01, throttle_first={"credit_analyst": 3})
+    runner = ConcurrentAgentRunner(llm, max_retries=2, base_delay=0.01, seed=0)
+    with pytest.raises(RateLimitError):
+        asyncio.run(runner.run_workflow("Hedge the book."))
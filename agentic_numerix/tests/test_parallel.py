@@ -0,0 +1,33 @@
+import pytest
+
+from agentic_numerix import ParallelOptimizer
+
+
+def optimizer(strategy_params, market_scenarios, num_workers, **options):
+    return ParallelOptimizer(strategy_params, market_scenarios, num_workers=num_workers, root_seed=5, num_paths=100,
+                             horizon_years=2, task_size=4, **options)
+
+
+def plain(result):
+    """A search result with its history as a list of entries, for comparison"""
+    return dict(result, history=list(result["history"]))
+
+
+@pytest.mark.parametrize("options", [{}, {"sparse": True, "control_variate": True}])
+def test_results_do_not_depend_on_the_worker_count(strategy_params, market_scenarios, options):
+    results = [
+        {scenario: plain(result) for scenario, result in optimizer(
+            strategy_params, market_scenarios, num_workers, **options).optimize_scenarios(
+            12, ["base_case", "bear_market"]).items()}
+        for num_workers in (1, 2, 3)
+    ]
+    assert len(results[0]["base_case"]["history"]) == 12
+    assert results[1] == results[0]
+    assert results[2] == results[0]
+
+
+def test_robust_search_does_not_depend_on_the_worker_count(strategy_params, market_scenarios):
+    serial, pooled = (plain(optimizer(strategy_params, market_scenarios, num_workers).optimize_robust(8))
+                      for num_workers in (1, 2))
+    assert len(serial["history"]) == 8
+    assert pooled == serial
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from agentic_numerix import GBMPathSimulator, HestonHybridSimulator, PathStore, StrategyEvaluator
+
+SCENARIO = {"equity_drift": 0.08, "equity_vol": 0.18, "risk_free_rate": 0.03, "correlation_equity_rates": -0.3}
+SCENARIOS = {"base_case": SCENARIO}
+
+
+def test_explicit_seeds_are_shared():
+    store = PathStore()
+    first = store.get("base_case", SCENARIO, 50, 1, seed=3)
+    assert store.get("base_case", SCENARIO, 50, 1, seed=3) is first
+    assert store.get("base_case", SCENARIO, 50, 1, seed=np.random.SeedSequence(3)) is not first
+    assert (store.hits, store.misses) == (1, 2)
+    assert not first["equity"].flags.writeable
+
+
+@pytest.mark.parametrize("seed", [None, np.random.default_rng(3)])
+def test_unreproducible_seeds_bypass_the_store(seed):
+    store = PathStore()
+    first = store.get("base_case", SCENARIO, 50, 1, seed=seed)
+    second = store.get("base_case", SCENARIO, 50, 1, seed=seed)
+    assert not np.array_equal(first["equity"], second["equity"])
+    store.prefetch(SCENARIOS, 50, 1, seed=seed)
+    assert store.nbytes == 0 and store.hits == store.misses == 0
+
+
+def test_key_includes_the_engine():
+    antithetic = PathStore(GBMPathSimulator(sampling="antithetic"))
+    pseudo = PathStore(GBMPathSimulator())
+    assert (antithetic.make_key("base_case", SCENARIO, 50, 1, 3) !=
+            pseudo.make_key("base_case", SCENARIO, 50, 1, 3))
+
+
+def test_evaluator_keys_results_by_the_store_engine():
+    store = PathStore(HestonHybridSimulator())
+    assert StrategyEvaluator(SCENARIOS, path_store=store).simulator is store.simulator
+    assert StrategyEvaluator(SCENARIOS, HestonHybridSimulator(), path_store=store).simulator is store.simulator
+    with pytest.raises(ValueError):
+        StrategyEvaluator(SCENARIOS, GBMPathSimulator(), path_store=store)
+
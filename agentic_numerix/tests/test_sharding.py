@@ -0,0 +1,55 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from agentic_numerix import (
+    LocalStore,
+    assign_shards,
+    generate_scenario_set,
+    read_manifest,
+    run_local_instances,
+    shard_of,
+    write_scenario_shards,
+)
+
+MANIFEST = "input/manifest.json"
+FAILING_SCENARIO = 7
+
+
+def score(columns, seed):
+    return {"scenario_index": columns["scenario_index"], "score": columns["equity_volatility"] * 2}
+
+
+def score_or_fail(columns, seed):
+    if FAILING_SCENARIO in columns["scenario_index"]:
+        raise RuntimeError("bad scenario")
+    return score(columns, seed)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalStore(str(tmp_path))
+    scenario_set = generate_scenario_set({}, num_scenarios=60, seed=1)
+    write_scenario_shards(store, "input/scenarios", MANIFEST, scenario_set, num_shards=6)
+    return store
+
+
+def test_instances_process_every_shard_once(store):
+    manifests = run_local_instances(store, MANIFEST, "input/scenarios", "output", score,
+                                    columns=["scenario_index", "equity_volatility"], num_instances=3)
+    shards = sorted(entry["shard"] for manifest in manifests for entry in manifest["shards"])
+    assert shards == list(range(6))
+    assert sum(entry["num_processed"] for manifest in manifests for entry in manifest["shards"]) == 60
+
+
+def test_failed_instance_is_reported_after_all_finish(store):
+    shard = int(shard_of(np.array([FAILING_SCENARIO]), 6)[0])
+    manifest = read_manifest(store, MANIFEST)
+    failing = [i for i in range(3) if shard in [entry["shard"] for entry in assign_shards(manifest, i, 3)]]
+    with pytest.raises(RuntimeError, match=rf"Local instances \[{failing[0]}\] failed"):
+        run_local_instances(store, MANIFEST, "input/scenarios", "output", score_or_fail,
+                            columns=["scenario_index", "equity_volatility"], num_instances=3)
+    assert multiprocessing.active_children() == []
+    written = set(store.list_keys("output/manifest-instance-"))
+    assert written == {f"output/manifest-instance-{i:03d}.json" for i in range(3) if i not in failing}
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agentic_numerix import (
+    METRIC_NAMES,
+    REBALANCE_INTERVALS,
+    STANDARD_ERROR_NAMES,
+    GBMPathSimulator,
+    StrategyEvaluator,
+    calculate_equity_weight,
+    evaluate_paths_batch,
+    evaluate_regimes_batch,
+)
+from agentic_numerix.strategy import calculate_max_drawdown, rebalance_dates
+
+NUM_PATHS = 200
+HORIZON_YEARS = 3
+SEED = 11
+
+
+def reference_metrics(config, scenario_params, paths):
+    """The notebook's per-step strategy loop, run on every path at once"""
+    equity, bond, log_returns = paths["equity"], paths["bond"], paths["equity_log_returns"]
+    num_paths, n_steps = equity.shape
+    steps_per_year = int(round(1 / paths["dt"]))
+    lookback = config["vol_lookback_months"] * 21
+    dates = set(rebalance_dates(n_steps, lookback, REBALANCE_INTERVALS[config["rebalancing_frequency"]]).tolist())
+
+    weights = np.full(num_paths, calculate_equity_weight(config, scenario_params["equity_vol"]))
+    values = np.empty((num_paths, n_steps))
+    weight_path = np.empty((num_paths, n_steps))
+    values[:, 0] = bond[:, 0] + weights * (equity[:, 0] - bond[:, 0])
+    weight_path[:, 0] = weights
+    for t in range(1, n_steps):
+        cost = 0.0
+        if t in dates:
+            vol = log_returns[:, t - lookback + 1:t + 1].std(axis=1) * np.sqrt(steps_per_year)
+            new_weights = calculate_equity_weight(config, vol)
+            cost = np.abs(new_weights - weights) * config["transaction_cost_bps"] / 10000 * values[:, t - 1]
+            weights = new_weights
+        values[:, t] = bond[:, t] + weights * (equity[:, t] - bond[:, t]) - cost
+        weight_path[:, t] = weights
+
+    final = values[:, -1]
+    returns = np.log(final / values[:, 0]) / paths["horizon_years"]
+    var_95 = np.percentile(final, 5)
+    return {
+        "mean_return": returns.mean(),
+        "volatility": returns.std(),
+        "sharpe_ratio": returns.mean() / returns.std(),
+        "max_drawdown": calculate_max_drawdown(values),
+        "final_value_mean": final.mean(),
+        "final_value_std": final.std(),
+        "var_95": var_95,
+        "cvar_95": final[final <= var_95].mean(),
+        "avg_equity_weight": weight_path.mean(),
+        "equity_weight_volatility": weight_path.std()
+    }
+
+
+@pytest.fixture
+def paths(market_scenarios):
+    return GBMPathSimulator().simulate(market_scenarios["base_case"], NUM_PATHS, HORIZON_YEARS, SEED)
+
+
+def test_metrics_match_the_reference_loop(configs, market_scenarios, paths):
+    for config, metrics in zip(configs, evaluate_paths_batch(configs, market_scenarios["base_case"], paths)):
+        assert list(metrics) == METRIC_NAMES + STANDARD_ERROR_NAMES
+        expected = reference_metrics(config, market_scenarios["base_case"], paths)
+        np.testing.assert_allclose([metrics[name] for name in METRIC_NAMES], [expected[name] for name in METRIC_NAMES],
+                                   rtol=1e-9, atol=1e-12)
+
+
+def test_sparse_scan_matches_the_dense_scan(configs, market_scenarios, paths):
+    dense = pd.DataFrame(evaluate_paths_batch(configs, market_scenarios["base_case"], paths))
+    sparse = pd.DataFrame(evaluate_paths_batch(configs, market_scenarios["base_case"], paths, sparse=True))
+    pd.testing.assert_frame_equal(sparse, dense, check_exact=False, rtol=1e-12)
+    np.testing.assert_array_equal(sparse["max_drawdown"], dense["max_drawdown"])
+
+
+@pytest.mark.parametrize("chunk_steps", [1, 21, 1000])
+def test_streaming_matches_stored_paths(configs, market_scenarios, chunk_steps):
+    evaluator = StrategyEvaluator(market_scenarios, horizon_years=HORIZON_YEARS)
+    stored = evaluator.evaluate_batch(configs, "bear_market", NUM_PATHS, SEED)
+    streamed = evaluator.evaluate_streaming(configs, "bear_market", NUM_PATHS, SEED, chunk_steps=chunk_steps)
+    pd.testing.assert_frame_equal(streamed, stored, check_exact=False, rtol=1e-12)
+
+
+def test_merged_blocks_keep_exact_tails(configs, market_scenarios):
+    evaluator = StrategyEvaluator(market_scenarios, horizon_years=HORIZON_YEARS)
+    first, second = (evaluator.accumulate_streaming(configs, "base_case", 100, seed) for seed in (1, 2))
+    finals = [np.sort(np.concatenate([a.tail, b.tail])) for a, b in zip(first.final_values, second.final_values)]
+    for metrics, final in zip(first.merge(second).metrics(), finals):
+        var_95 = np.percentile(final, 5)
+        assert metrics["var_95"] == var_95
+        assert metrics["cvar_95"] == final[final <= var_95].mean()
+
+
+def test_regimes_match_separate_scenarios(configs, market_scenarios):
+    simulator = GBMPathSimulator()
+    scenarios = list(market_scenarios.values())
+    regime_paths = [simulator.simulate(params, NUM_PATHS, HORIZON_YEARS, SEED) for params in scenarios]
+    for sparse in (False, True):
+        stacked = evaluate_regimes_batch(configs, scenarios, regime_paths, sparse=sparse)
+        for params, paths, metrics in zip(scenarios, regime_paths, stacked):
+            separate = evaluate_paths_batch(configs, params, paths, sparse=sparse)
+            pd.testing.assert_frame_equal(pd.DataFrame(metrics), pd.DataFrame(separate), check_exact=False,
+                                          rtol=1e-12)
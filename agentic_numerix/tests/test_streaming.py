@@ -0,0 +1,42 @@
+import asyncio
+
+from agentic_numerix import FakeBedrockClient, ResponseStream
+
+TEXT = "Reduce equity to 40% and extend duration; hedge EUR exposure with 3-month forwards. " * 3
+BODY = {"anthropic_version": "bedrock-2023-05-31", "max_tokens": 512,
+        "messages": [{"role": "user", "content": "Summarize the hedge."}]}
+
+
+def fake_client():
+    return FakeBedrockClient(TEXT, chunk_chars=40, first_token_delay=0.0, chunk_delay=0.0)
+
+
+def test_stream_yields_the_text_in_chunks():
+    seen = []
+    stream = ResponseStream(fake_client(), "model", BODY, on_text=seen.append)
+    chunks = list(stream)
+    assert "".join(chunks) == stream.text == TEXT
+    assert seen == chunks
+    assert len(chunks) == -(-len(TEXT) // 40)
+    stats = stream.stats()
+    assert stats["chunks"] == len(chunks)
+    assert stats["input_tokens"] == (len("Summarize the hedge.") + 3) // 4
+    assert stats["output_tokens"] == (len(TEXT) + 3) // 4
+    assert 0 <= stats["time_to_first_token_seconds"] <= stats["latency_seconds"]
+
+
+def test_read_consumes_the_stream():
+    client = fake_client()
+    assert ResponseStream(client, "model", BODY).read() == TEXT
+    assert client.calls == 1
+
+
+def test_async_iteration():
+    seen = []
+
+    async def collect():
+        return [text async for text in ResponseStream(fake_client(), "model", BODY, on_text=seen.append)]
+
+    chunks = asyncio.run(collect())
+    assert "".join(chunks) == TEXT
+    assert seen == chunks
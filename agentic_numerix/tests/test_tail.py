@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from agentic_numerix import TailSketch, merge_sketches
+
+
+def exact_var_cvar(values, alpha=0.05):
+    values = np.sort(values)
+    var = np.percentile(values, 100 * alpha)
+    return var, values[values <= var].mean()
+
+
+@pytest.mark.parametrize("count", [1, 2, 19, 20, 21, 1000])
+def test_buffered_sample_is_exact(count):
+    values = np.random.default_rng(count).lognormal(4.6, 0.3, count)
+    sketch = TailSketch.from_values(values)
+    assert sketch.is_exact()
+    assert (sketch.var(), sketch.cvar()) == exact_var_cvar(values)
+    assert sketch.mean == pytest.approx(values.mean(), rel=1e-14)
+    assert sketch.std == pytest.approx(values.std(), rel=1e-12)
+
+
+def test_merged_parts_are_exact_while_the_tail_fits():
+    rng = np.random.default_rng(0)
+    parts = [rng.normal(100, 15, size) for size in (400, 1000, 7, 600)]
+    sketch = merge_sketches([TailSketch.from_values(values, capacity=256) for values in parts])
+    values = np.concatenate(parts)
+    assert sketch.count == len(values)
+    assert sketch.is_exact()
+    assert (sketch.var(), sketch.cvar()) == exact_var_cvar(values)
+
+
+def test_overflowing_tail_is_within_relative_accuracy():
+    values = np.random.default_rng(1).lognormal(4.6, 0.3, 5000)
+    sketch = TailSketch.from_values(values, capacity=64)
+    assert not sketch.is_exact()
+    var, cvar = exact_var_cvar(values)
+    assert sketch.var() == pytest.approx(var, rel=2 * sketch.relative_accuracy)
+    assert sketch.cvar() == pytest.approx(cvar, rel=2 * sketch.relative_accuracy)
+
+
+def test_round_trips_through_a_dict():
+    sketch = TailSketch.from_values(np.random.default_rng(2).normal(100, 15, 3000), capacity=64)
+    restored = TailSketch.from_dict(sketch.to_dict())
+    assert (restored.count, restored.var(), restored.cvar()) == (sketch.count, sketch.var(), sketch.cvar())
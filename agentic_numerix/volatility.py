@@ -0,0 +1,27 @@
+"""
+Per-path rolling realized volatility.
+
+The portfolio scans keep running (or prefix) sums of log-returns and squared
+log-returns per path, so the realized vol over any lookback window costs O(1)
+per path regardless of the window length, and every path gets its own vol.
+
+The window for a rebalance at step t holds the `lookback` returns into steps
+t - lookback + 1 .. t, i.e. it ends with (and includes) step t's own return:
+weights set at the close of step t use that close. The original notebook
+loop used the returns into steps t - lookback .. t - 1, one step earlier.
+"""
+
+import numpy as np
+
+from .simulation import TRADING_DAYS_PER_YEAR
+
+
+def window_realized_vol(window_sum: np.ndarray, window_sq_sum: np.ndarray, lookback: int,
+                        steps_per_year: int = TRADING_DAYS_PER_YEAR) -> np.ndarray:
+    """
+    Annualized realized vol per path from the sum of a window's `lookback`
+    log-returns and the sum of their squares (population variance, clipped at 0)
+    """
+    mean = window_sum / lookback
+    mean_sq = window_sq_sum / lookback
+    return np.sqrt(np.maximum(mean_sq - mean ** 2, 0.0) * steps_per_year)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the simulation, scenario and aggregation hot paths
+
+Times the engine behind the notebook's hot paths, offline and without AWS:
+- evaluate_strategy: StrategyEvaluator as used by HyperparameterOptimizationAgent
+  (streaming from 100k paths on), swept over paths, horizon and vol lookback
+- generate_scenarios: VolatilityScenarioGenerator's LHS scenario set, swept over scenario count
+- scenario_statistics: _calculate_scenario_statistics (ScenarioSet.statistics)
+- aggregation: ResultAggregator over sharded result tables in a local directory
+
+Every case runs in a fresh process so its peak RSS is its own. Results (best and
+mean seconds, throughput, path-steps/sec, peak RSS) are written as JSON and
+compared against a stored baseline; any case slower or larger than the baseline
+by more than the tolerance is reported as a regression and the script exits 1.
+
+Usage:
+    python3 utils/run_benchmarks.py                     # Full suite vs utils/benchmark_baseline.json
+    python3 utils/run_benchmarks.py --quick             # Smaller sweep for CI
+    python3 utils/run_benchmarks.py --only aggregation  # One benchmark family
+    python3 utils/run_benchmarks.py --update-baseline   # Record this machine's numbers as the baseline
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+
+from agentic_numerix import (  # noqa: E402
+    LocalStore,
+    ResultAggregator,
+    StrategyEvaluator,
+    generate_scenario_set,
+    horizon_steps,
+    write_table,
+)
+
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "utils", "benchmark_baseline.json")
+DEFAULT_OUTPUT = "benchmark_results.json"
+STREAMING_PATHS = 100000  # HyperparameterOptimizationAgent.streaming_paths
+
+# Notebook base case and default strategy configuration
+MARKET_SCENARIOS = {
+    "base_case": {"equity_drift": 0.08, "equity_vol": 0.18, "risk_free_rate": 0.03,
+                  "correlation_equity_rates": -0.3}
+}
+STRATEGY_CONFIG = {
+    "iteration": 0,
+    "target_volatility": 0.10,
+    "equity_weight_function": "inverse_vol",
+    "vol_lookback_months": 12,
+    "rebalancing_frequency": "monthly",
+    "risk_aversion": 2.0,
+    "transaction_cost_bps": 5,
+    "min_equity_weight": 0.0,
+    "max_equity_weight": 1.0
+}
+SCENARIO_PARAMS = {
+    "fx_volatility": {"min_vol": 0.05, "max_vol": 0.35},
+    "interest_rate_volatility": {"min_vol": 0.60, "max_vol": 1.80},
+    "credit_volatility": {"min_vol": 0.15, "max_vol": 0.75},
+    "equity_volatility": {"min_vol": 0.12, "max_vol": 0.55}
+}
+
+Case = Tuple[Callable[[], None], Dict, Callable[[], None]]  # (run, work counts, cleanup)
+
+
+def bench_evaluate_strategy(num_paths: int, horizon_years: float, lookback_months: int) -> Case:
+    evaluator = StrategyEvaluator(MARKET_SCENARIOS, horizon_years=horizon_years)
+    config = dict(STRATEGY_CONFIG, vol_lookback_months=lookback_months)
+
+    def run():
+        if num_paths >= STREAMING_PATHS:
+            evaluator.evaluate_streaming(config, "base_case", num_paths=num_paths, seed=0)
+        else:
+            evaluator.evaluate(config, "base_case", num_paths=num_paths, seed=0)
+
+    path_steps = num_paths * horizon_steps(horizon_years)
+    return run, {"items": num_paths, "unit": "paths", "path_steps": path_steps}, lambda: None
+
+
+def bench_generate_scenarios(num_scenarios: int) -> Case:
+    def run():
+        generate_scenario_set(SCENARIO_PARAMS, num_scenarios, seed=42)
+
+    return run, {"items": num_scenarios, "unit": "scenarios"}, lambda: None
+
+
+def bench_scenario_statistics(num_scenarios: int) -> Case:
+    scenario_set = generate_scenario_set(SCENARIO_PARAMS, num_scenarios, seed=42)
+    return scenario_set.statistics, {"items": num_scenarios, "unit": "scenarios"}, lambda: None
+
+
+def bench_aggregation(num_results: int, num_tables: int) -> Case:
+    root = tempfile.mkdtemp(prefix="anx-bench-")
+    store = LocalStore(root)
+    rng = np.random.default_rng(0)
+    per_table = num_results // num_tables
+    for shard in range(num_tables):
+        write_table(store, f"output/results-shard-{shard:05d}-of-{num_tables:05d}.cols", {
+            "portfolio_value": 25 * (1 + rng.normal(0, 0.02, per_table)),
+            "var_95": 1.25 * rng.uniform(0.8, 1.2, per_table),
+            "cvar_95": 1.75 * rng.uniform(0.8, 1.2, per_table)
+        }, "scenario_results")
+
+    def run():
+        ResultAggregator(store, ["portfolio_value", "var_95", "cvar_95"], max_workers=8).aggregate("output/")
+
+    return run, {"items": per_table * num_tables, "unit": "results"}, lambda: shutil.rmtree(root, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "evaluate_strategy": bench_evaluate_strategy,
+    "generate_scenarios": bench_generate_scenarios,
+    "scenario_statistics": bench_scenario_statistics,
+    "aggregation": bench_aggregation
+}
+
+
+def suite(quick: bool = False) -> List[Tuple[str, Dict]]:
+    """(benchmark, params) cases; `quick` drops the largest sizes"""
+    paths = [1000, 10000] if quick else [1000, 10000, 100000]
+    scenario_counts = [1000, 100000] if quick else [1000, 10000, 100000, 1000000]
+    cases = [("evaluate_strategy", {"num_paths": n, "horizon_years": 5, "lookback_months": 12}) for n in paths]
+    cases += [("evaluate_strategy", {"num_paths": 10000, "horizon_years": h, "lookback_months": 12}) for h in (1, 10)]
+    cases += [("evaluate_strategy", {"num_paths": 10000, "horizon_years": 5, "lookback_months": m}) for m in (6, 24)]
+    cases += [("generate_scenarios", {"num_scenarios": n}) for n in scenario_counts]
+    cases += [("scenario_statistics", {"num_scenarios": n}) for n in scenario_counts]
+    cases += [("aggregation", {"num_results": n, "num_tables": 20})
+              for n in ([100000] if quick else [100000, 1000000])]
+    return cases
+
+
+def case_name(benchmark: str, params: Dict) -> str:
+    return f"{benchmark}[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, KiB on Linux
+
+
+def _measure(benchmark: str, params: Dict, repeat: int) -> Dict:
+    """Run one case `repeat` times (after setup) in the current, fresh process"""
+    run, counts, cleanup = BENCHMARKS[benchmark](**params)
+    try:
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - started)
+    finally:
+        cleanup()
+
+    best = min(times)
+    result = {
+        "name": case_name(benchmark, params),
+        "benchmark": benchmark,
+        "params": params,
+        "repeat": repeat,
+        "seconds": best,
+        "mean_seconds": sum(times) / len(times),
+        "throughput": counts["items"] / best,
+        "throughput_unit": f"{counts['unit']}/s",
+        "peak_rss_mb": _peak_rss_mb()
+    }
+    if "path_steps" in counts:
+        result["path_steps_per_sec"] = counts["path_steps"] / best
+    return result
+
+
+def run_suite(cases: List[Tuple[str, Dict]], repeat: int) -> List[Dict]:
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for benchmark, params in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(_measure, benchmark, params, repeat).result()
+        extra = f"  {result['path_steps_per_sec']:,.0f} path-steps/s" if "path_steps_per_sec" in result else ""
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "n/a"
+        print(f"{result['name']:<75} {result['seconds']:8.3f}s  {result['throughput']:>14,.0f} "
+              f"{result['throughput_unit']:<13} peak RSS {rss}{extra}")
+        results.append(result)
+    return results
+
+
+def compare(results: List[Dict], baseline: Dict, time_tolerance: float, memory_tolerance: float,
+            min_seconds: float = 0.01) -> List[str]:
+    """
+    Regression messages for cases slower or larger than the baseline beyond the
+    tolerances; slowdowns under `min_seconds` are timer noise and ignored.
+    """
+    reference = {entry["name"]: entry for entry in baseline["results"]}
+    regressions = []
+    for result in results:
+        base = reference.get(result["name"])
+        if base is None:
+            continue
+        if result["seconds"] > base["seconds"] * (1 + time_tolerance) and \
+                result["seconds"] - base["seconds"] > min_seconds:
+            regressions.append(f"{result['name']}: {result['seconds']:.3f}s vs baseline {base['seconds']:.3f}s "
+                               f"({result['seconds'] / base['seconds'] - 1:+.0%})")
+        if result.get("peak_rss_mb") and base.get("peak_rss_mb") and \
+                result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + memory_tolerance):
+            regressions.append(f"{result['name']}: peak RSS {result['peak_rss_mb']:.0f} MB vs baseline "
+                               f"{base['peak_rss_mb']:.0f} MB ({result['peak_rss_mb'] / base['peak_rss_mb'] - 1:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation, scenario and aggregation hot paths")
+    parser.add_argument("--quick", action="store_true", help="Smaller sweep (no 100k-path or 1M-scenario cases)")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append", help="Run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is reported)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results JSON to compare against")
+    parser.add_argument("--time-tolerance", type=float, default=0.30, help="Allowed slowdown vs baseline")
+    parser.add_argument("--memory-tolerance", type=float, default=0.20, help="Allowed peak RSS growth vs baseline")
+    parser.add_argument("--min-seconds", type=float, default=0.01, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    cases = [(benchmark, params) for benchmark, params in suite(args.quick)
+             if not args.only or benchmark in args.only]
+    print(f"Running {len(cases)} benchmark cases ({args.repeat} timed runs each)\n")
+    report = {
+        "created": datetime.now().isoformat(),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count()
+        },
+        "results": run_suite(cases, args.repeat)
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to: {args.output}")
+
+    if args.update_baseline:
+        if os.path.exists(args.baseline):
+            # Keep baseline entries for cases that were not rerun (e.g. with --quick or --only)
+            with open(args.baseline) as f:
+                previous = json.load(f)
+            names = {result["name"] for result in report["results"]}
+            report["results"] += [entry for entry in previous["results"] if entry["name"] not in names]
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        sys.exit(0)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report["results"], baseline, args.time_tolerance, args.memory_tolerance,
+                          args.min_seconds)
+    if regressions:
+        print("\n" + "!" * 80)
+        print(f"PERFORMANCE REGRESSION: {len(regressions)} case(s) exceed the baseline "
+              f"(time +{args.time_tolerance:.0%}, memory +{args.memory_tolerance:.0%})")
+        print("!" * 80)
+        for message in regressions:
+            print(f"  ❌ {message}")
+        sys.exit(1)
+    print(f"\n✅ No regressions against {args.baseline}")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()